@@ -0,0 +1,96 @@
+"""
+headline date extraction micro-benchmark on the saved OKX headlines page
+
+    python -m benchmarks.dates --copies 10000 --pages 50 --engine bs4 --engine lxml --engine selectolax
+
+compares the strptime path (locale-aware strptime per headline, the former implementation)
+with the current one (precompiled regex per row, month lookup table, memoised dates),
+first for the date stage alone, then for the whole extract_headlines_from_page of every engine
+"""
+import re
+import time
+from datetime import datetime
+
+import click
+from bs4 import BeautifulSoup
+
+from benchmarks.parsing import CORPUS_DIR
+from src.domain.parser import get_parser, OKXParser, _parse_date
+from src.dto import NewsHeadline
+from src.infrastructure.config import ENGINES
+
+_date_regex = re.compile(r'(?<=ublished\son\s)\w+ \d+, \d+')
+
+
+def with_strptime(rows: list[tuple[str, str, str]]) -> list[NewsHeadline]:
+    return [
+        NewsHeadline(
+            title=title,
+            date=datetime.strptime(_date_regex.search(details).group(0), '%b %d, %Y').date(),
+            body_url=body_url,
+        )
+        for title, body_url, details in rows
+    ]
+
+
+def load_rows(page_content: str) -> list[tuple[str, str, str]]:
+    soup = BeautifulSoup(page_content, 'html.parser')
+    return [
+        (
+            row.find('div', class_=OKXParser._article_title_class).text,
+            row.find('a').get('href'),
+            row.find('div', class_=OKXParser._article_date_class).text,
+        )
+        for row in soup.find_all('li', class_=OKXParser._article_class)
+    ]
+
+
+def measure(func, pages: int) -> float:
+    """:return: seconds per page"""
+    started = time.perf_counter()
+    for _ in range(pages):
+        func()
+    return (time.perf_counter() - started) / pages
+
+
+def _cold(parser, rows):
+    _parse_date.cache_clear()
+    return parser._make_headlines(rows)
+
+
+@click.command()
+@click.option('--copies', default=10000, help='How many times the dates of the saved page are parsed')
+@click.option('--pages', default=50, help='How many times the whole saved page is parsed by every engine')
+@click.option('--engine', 'engines', multiple=True, default=['bs4'], type=click.Choice(ENGINES))
+def main(copies, pages, engines):
+    page_content = (CORPUS_DIR / 'test_headlines_data.html').read_text()
+    rows = load_rows(page_content)
+    parser = OKXParser()
+    if parser._make_headlines(rows) != with_strptime(rows):
+        raise AssertionError('lookup table result differs from the strptime one')
+
+    baseline = measure(lambda: with_strptime(rows), copies)
+    click.echo(f'date stage, {len(rows)} headlines per page, us per page:')
+    click.echo(f'{"strptime":>24} {baseline * 1e6:8.1f}')
+    for name, func in (
+        ('lookup, cold memo', lambda: _cold(parser, rows)),
+        ('lookup, warm memo', lambda: parser._make_headlines(rows)),
+    ):
+        seconds = measure(func, copies)
+        click.echo(f'{name:>24} {seconds * 1e6:8.1f}  x{baseline / seconds:.2f}')
+
+    click.echo('extract_headlines_from_page, us per page:')
+    for engine in engines:
+        lookup_parser = get_parser(engine)
+        strptime_parser = get_parser(engine)
+        strptime_parser._make_headlines = with_strptime
+        strptime_seconds = measure(lambda: strptime_parser.extract_headlines_from_page(page_content), pages)
+        seconds = measure(lambda: lookup_parser.extract_headlines_from_page(page_content), pages)
+        click.echo(
+            f'{engine:>10}: strptime {strptime_seconds * 1e6:8.1f}, lookup {seconds * 1e6:8.1f}  '
+            f'x{strptime_seconds / seconds:.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+parsing backends benchmark on saved OKX pages
+
+    python -m benchmarks.parsing --copies 50 --workers 4 --engine bs4 --engine lxml
+
+every backend parses the same corpus concurrently while a heartbeat coroutine measures
+how long the event loop is blocked (the time network I/O would be stalled)
+"""
+import asyncio
+import time
+from pathlib import Path
+
+import click
+
+from src.domain.parser import get_parser
+from src.domain.parsing_backend import ParsingBackend
+from src.infrastructure.config import ENGINES, BACKENDS
+
+CORPUS_DIR = Path(__file__).parent.parent / 'tests' / 'domain'
+
+
+def load_corpus(copies: int) -> list[tuple[str, str]]:
+    headlines_page = (CORPUS_DIR / 'test_headlines_data.html').read_text()
+    body_page = (CORPUS_DIR / 'test_body.html').read_text()
+    return [('headlines', headlines_page), ('body', body_page)] * copies
+
+
+async def _heartbeat(stop: asyncio.Event, interval: float = .001) -> float:
+    max_stall = 0.
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        max_stall = max(max_stall, time.perf_counter() - started - interval)
+    return max_stall
+
+
+async def run_backend(engine: str, kind: str, corpus: list[tuple[str, str]], workers: int | None) -> dict:
+    backend = ParsingBackend(get_parser(engine), kind=kind, workers=workers)
+    # warm up worker processes so their start-up is not measured
+    await asyncio.gather(*[backend.get_pages_qty(corpus[0][1]) for _ in range(workers or 1)])
+
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        backend.extract_headlines_from_page(page) if page_type == 'headlines'
+        else backend.extract_news_body_from_page(page)
+        for page_type, page in corpus
+    ])
+    elapsed = time.perf_counter() - started
+    stop.set()
+    max_stall = await heartbeat
+    backend.close()
+    return {
+        'engine': engine,
+        'backend': kind,
+        'pages': len(corpus),
+        'seconds': elapsed,
+        'pages_per_sec': len(corpus) / elapsed,
+        'max_loop_stall_ms': max_stall * 1000,
+    }
+
+
+@click.command()
+@click.option('--copies', default=20, help='How many times the saved pages are repeated')
+@click.option('--workers', default=None, type=int, help='Executor workers, cpu count by default')
+@click.option('--engine', 'engines', multiple=True, default=['bs4'], type=click.Choice(ENGINES))
+def main(copies, workers, engines):
+    corpus = load_corpus(copies)
+    results = [
+        asyncio.run(run_backend(engine, kind, corpus, workers))
+        for engine in engines
+        for kind in BACKENDS
+    ]
+    baseline = results[0]['seconds']
+    for r in results:
+        click.echo(
+            f"{r['engine']:>10} {r['backend']:>8}: {r['pages']} pages in {r['seconds']:.2f}s "
+            f"({r['pages_per_sec']:.1f} pages/s, x{baseline / r['seconds']:.2f}), "
+            f"max event loop stall {r['max_loop_stall_ms']:.1f}ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
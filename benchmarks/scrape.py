@@ -0,0 +1,183 @@
+"""
+end-to-end scrape benchmark against the local OKX stand-in
+
+    python -m benchmarks.scrape --pages 200 --days 1 --days 7 --days 30 --rounds 3 --latency 0.02
+
+every round streams OKXScrapingService.iter_news_by_period with a fresh provider and reports
+pages/s, articles/s, requests issued (the headline pages count shows the cost of the period
+boundaries search), opened connections and peak traced memory, like pytest-benchmark min / mean columns;
+--keepalive-timeout 0 closes every connection after its response to compare with the pooled transport;
+--stream-cutoff stops reading pages after the needed elements to compare with whole pages, the sent MB column counts page bytes
+written by the stand-in (with --bandwidth a stopped read saves the rest of the page)
+"""
+import asyncio
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import click
+
+from benchmarks.stand_in import StandInSite, serve
+from src.common.rate_limiter import AdaptiveRateLimiter
+from src.domain.page_provider import OKXPageProvider
+from src.domain.parser import get_parser
+from src.domain.parsing_backend import ParsingBackend
+from src.dto import NewsRequest
+from src.infrastructure.config import config, ENGINES, BACKENDS
+from src.infrastructure.page_index import PageDateIndex
+from src.service import OKXScrapingService
+
+
+@dataclass
+class RoundResult:
+    seconds: float
+    headline_pages: int
+    articles: int
+    records: int
+    connections: int
+    sent_bytes: int
+    peak_memory: int
+    correct: bool
+
+    @property
+    def pages_per_sec(self) -> float:
+        return self.headline_pages / self.seconds
+
+    @property
+    def articles_per_sec(self) -> float:
+        return self.articles / self.seconds
+
+
+async def run_round(
+    site: StandInSite,
+    request: NewsRequest,
+    engine: str,
+    backend: str,
+    rate: float,
+    page_index: PageDateIndex | None,
+    timeout: float,
+    stream_cutoff: bool = False,
+) -> RoundResult | None:
+    """:return: None if the scrape does not finish in timeout seconds"""
+    headline_pages, articles, sent_bytes = site.stats.headline_pages, site.stats.articles, site.stats.sent_bytes
+    parser = ParsingBackend(get_parser(engine), kind=backend)
+    provider = OKXPageProvider(rate_limiter=AdaptiveRateLimiter(
+        rate=rate, max_rate=rate, window=config.LIMIT_RPS, max_window=config.LIMIT_RPS,
+    ), stream_cutoff=stream_cutoff)
+    service = OKXScrapingService(page_provider=provider, parser=parser, page_index=page_index)
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        # records are streamed like the cli does, only their keys are kept for the correctness check
+        keys = await asyncio.wait_for(_scrape_keys(service, request), timeout)
+    except TimeoutError:
+        return None
+    finally:
+        elapsed = time.perf_counter() - started
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        parser.close()
+        await provider.close()
+    expected = {(title, d) for title, _, d in site.headlines_between(request.start_date, request.end_date)}
+    return RoundResult(
+        seconds=elapsed,
+        headline_pages=site.stats.headline_pages - headline_pages,
+        articles=site.stats.articles - articles,
+        records=len(keys),
+        connections=provider.transport_stats.connections_opened,
+        sent_bytes=site.stats.sent_bytes - sent_bytes,
+        peak_memory=peak_memory,
+        correct=set(keys) == expected,
+    )
+
+
+async def _scrape_keys(service: OKXScrapingService, request: NewsRequest) -> list[tuple[str, date]]:
+    return [(r.title, r.date) async for r in service.iter_news_by_period(request)]
+
+
+async def run_suite(
+    site: StandInSite,
+    days: list[int],
+    rounds: int,
+    engine: str,
+    backend: str,
+    rate: float,
+    with_index: bool,
+    timeout: float,
+    full_history: bool = False,
+    stream_cutoff: bool = False,
+) -> list[tuple[NewsRequest, list[RoundResult | None]]]:
+    results = []
+    async with serve(site) as base_url:
+        config.OKX_URL = base_url
+        # the period ends in the middle of the archive, so both boundaries have to be searched
+        end_date = site.newest - timedelta(days=site.pages_qty * site.page_size // site.per_day // 3)
+        requests = [
+            NewsRequest(start_date=end_date - timedelta(days=period - 1), end_date=end_date) for period in days
+        ]
+        if full_history:
+            oldest_date = site.headline(site.pages_qty * site.page_size - 1)[2]
+            requests.append(NewsRequest(start_date=oldest_date, end_date=site.newest))
+        for request in requests:
+            page_index = PageDateIndex() if with_index else None
+            results.append((request, [
+                await run_round(site, request, engine, backend, rate, page_index, timeout, stream_cutoff)
+                for _ in range(rounds)
+            ]))
+    return results
+
+
+def _describe(values: list[float], fmt: str) -> str:
+    return f'{min(values):{fmt}} / {statistics.mean(values):{fmt}}'
+
+
+@click.command()
+@click.option('--pages', default=100, help='Number of announcement list pages of the stand-in')
+@click.option('--days', 'days', multiple=True, type=int, default=[1, 7, 30], help='Period lengths in days')
+@click.option('--rounds', default=3)
+@click.option('--latency', default=0., help='Stand-in response delay, seconds')
+@click.option('--error-rate', default=0., help='Share of stand-in responses answered with 503')
+@click.option('--engine', default='bs4', type=click.Choice(ENGINES))
+@click.option('--backend', default='inline', type=click.Choice(BACKENDS))
+@click.option('--rate', default=1000., help='Requests per second allowed by the rate limiter')
+@click.option('--with-index', is_flag=True, help='Locate period boundaries with a page index kept between rounds')
+@click.option('--timeout', default=60., help='Round timeout, seconds')
+@click.option('--full-history', is_flag=True, help='Also export the whole archive, peak memory must not grow with it')
+@click.option('--keepalive-timeout', default=config.HTTP_KEEPALIVE_TIMEOUT,
+              help='Idle connections keep-alive, seconds, 0 opens a connection per request')
+@click.option('--compress', is_flag=True, help='Stand-in compresses pages as negotiated by Accept-Encoding')
+@click.option('--bandwidth', default=0., help='Stand-in bytes per second per response, 0 sends pages at once')
+@click.option('--stream-cutoff', is_flag=True, help='Stop reading pages after the needed elements')
+def main(pages, days, rounds, latency, error_rate, engine, backend, rate, with_index, timeout, full_history,
+         keepalive_timeout, compress, bandwidth, stream_cutoff):
+    config.HTTP_KEEPALIVE_TIMEOUT = keepalive_timeout
+    site = StandInSite(
+        pages_qty=pages, latency=latency, error_rate=error_rate, compress=compress, bandwidth=bandwidth
+    )
+    results = asyncio.run(run_suite(
+        site, list(days), rounds, engine, backend, rate, with_index, timeout, full_history, stream_cutoff
+    ))
+    click.echo(f'{"period":>24} {"seconds min/mean":>18} {"pages/s":>16} {"articles/s":>16} '
+               f'{"list pages":>10} {"articles":>8} {"conns":>6} {"sent MB":>8} {"peak MB":>8}')
+    for request, round_results in results:
+        period = f'{request.start_date} - {request.end_date}'
+        finished = [r for r in round_results if r is not None]
+        if not finished:
+            click.echo(f'{period:>24} timed out after {timeout}s')
+            continue
+        click.echo(
+            f'{period:>24} {_describe([r.seconds for r in finished], ".3f"):>18} '
+            f'{_describe([r.pages_per_sec for r in finished], ".1f"):>16} '
+            f'{_describe([r.articles_per_sec for r in finished], ".1f"):>16} '
+            f'{max(r.headline_pages for r in finished):>10} {max(r.articles for r in finished):>8} '
+            f'{max(r.connections for r in finished):>6} {max(r.sent_bytes for r in finished) / 2 ** 20:>8.1f} '
+            f'{max(r.peak_memory for r in finished) / 2 ** 20:>8.1f}'
+            + ('' if all(r.correct for r in finished) else '  INCORRECT RESULT')
+            + ('' if len(finished) == len(round_results) else f'  {len(round_results) - len(finished)} timed out')
+        )
+
+
+if __name__ == '__main__':
+    main()
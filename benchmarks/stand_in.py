@@ -0,0 +1,181 @@
+"""
+local OKX stand-in server built from the recorded pages
+
+    python -m benchmarks.stand_in --pages 200 --latency 0.05 --error-rate 0.01 --compress --bandwidth 1000000
+
+serves generated announcement list pages (recorded markup, synthetic headlines)
+and the recorded article page for every article url, so the scraper can be run
+and measured offline: OKX_URL=http://127.0.0.1:<port>/
+"""
+import asyncio
+import random
+import re
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import AsyncIterator
+
+import click
+from aiohttp import web
+
+from src.domain.page_provider import HEADLINES_PATH
+
+CORPUS_DIR = Path(__file__).parent.parent / 'tests' / 'domain'
+
+_ARTICLE_RE = re.compile(r'<li class="index_articleItem_.*?</li>', re.S)
+_PAGES_QTY_RE = re.compile(r'(okui-pagination-item-link[^>]*>)\d+(</a>)')
+_CHUNK_SIZE = 8 * 1024
+
+
+@dataclass
+class StandInStats:
+    headline_pages: int = 0
+    articles: int = 0
+    errors: int = 0
+    # page bytes written before compression, a client stopping early reduces them with a bandwidth limit
+    sent_bytes: int = 0
+
+    @property
+    def requests(self) -> int:
+        return self.headline_pages + self.articles
+
+
+@dataclass
+class StandInSite:
+    """
+    pages_qty list pages of page_size headlines, per_day headlines are published every day
+    back from the newest date; every response is delayed by latency seconds
+    and error_rate of them are answered with 503;
+    pages are compressed as negotiated by Accept-Encoding if compress is set
+    and sent in chunks at bandwidth bytes per second per response if it is set
+    """
+    pages_qty: int = 100
+    page_size: int = 15
+    per_day: int = 3
+    newest: date = date(2025, 4, 17)
+    latency: float = 0.
+    error_rate: float = 0.
+    compress: bool = False
+    bandwidth: float = 0.
+    seed: int = 0
+    stats: StandInStats = field(default_factory=StandInStats)
+
+    def __post_init__(self):
+        headlines_page = (CORPUS_DIR / 'test_headlines_data.html').read_text()
+        articles = list(_ARTICLE_RE.finditer(headlines_page))
+        self._list_head = headlines_page[:articles[0].start()]
+        self._list_tail = headlines_page[articles[-1].end():]
+        self._article_item = articles[0].group(0)
+        self._article_page = (CORPUS_DIR / 'test_body.html').read_text()
+        self._random = random.Random(self.seed)
+
+    def headline(self, position: int) -> tuple[str, str, date]:
+        """:return: title, body url and date of the headline at position (0 is the newest)"""
+        return (
+            f'Stand-in announcement {position}',
+            f'/help/stand-in-announcement-{position}',
+            self.newest - timedelta(days=position // self.per_day),
+        )
+
+    def headlines_between(self, start_date: date, end_date: date) -> list[tuple[str, str, date]]:
+        return [
+            h for h in map(self.headline, range(self.pages_qty * self.page_size))
+            if start_date <= h[2] <= end_date
+        ]
+
+    def render_page(self, page_num: int) -> str:
+        first = (page_num - 1) * self.page_size
+        last = min(first + self.page_size, self.pages_qty * self.page_size)
+        items = ''.join(self._render_item(*self.headline(i)) for i in range(first, last))
+        tail = _replace_last(_PAGES_QTY_RE, self._list_tail, rf'\g<1>{self.pages_qty}\g<2>')
+        return self._list_head + items + tail
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(f'/{HEADLINES_PATH}', self._headlines_page)
+        app.router.add_get(f'/{HEADLINES_PATH}/page/{{page_num:\\d+}}', self._headlines_page)
+        app.router.add_get('/help/{slug}', self._article)
+        return app
+
+    async def _headlines_page(self, request: web.Request) -> web.Response:
+        self.stats.headline_pages += 1
+        await self._simulate_network()
+        page_num = int(request.match_info.get('page_num', 1))
+        return await self._send(request, self.render_page(page_num))
+
+    async def _article(self, request: web.Request) -> web.StreamResponse:
+        self.stats.articles += 1
+        await self._simulate_network()
+        return await self._send(request, self._article_page)
+
+    async def _send(self, request: web.Request, page: str) -> web.StreamResponse:
+        response = web.StreamResponse(headers={'Content-Type': 'text/html; charset=utf-8'})
+        if self.compress:
+            response.enable_compression()
+        await response.prepare(request)
+        body = page.encode()
+        try:
+            for start in range(0, len(body), _CHUNK_SIZE):
+                if request.transport is None or request.transport.is_closing():
+                    # the client has read what it needed and closed the connection
+                    return response
+                chunk = body[start:start + _CHUNK_SIZE]
+                await response.write(chunk)
+                self.stats.sent_bytes += len(chunk)
+                if self.bandwidth:
+                    await asyncio.sleep(len(chunk) / self.bandwidth)
+            await response.write_eof()
+        except ConnectionResetError:
+            pass
+        return response
+
+    async def _simulate_network(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self._random.random() < self.error_rate:
+            self.stats.errors += 1
+            raise web.HTTPServiceUnavailable()
+
+    def _render_item(self, title: str, body_url: str, news_date: date) -> str:
+        item = re.sub(r'href="[^"]*"', f'href="{body_url}"', self._article_item, count=1)
+        item = re.sub(r'(index_articleTitle_[^"]*">).*?(</div>)', rf'\g<1>{title}\g<2>', item, count=1, flags=re.S)
+        published = f'Published on {news_date.strftime("%b")} {news_date.day}, {news_date.year}'
+        return re.sub(r'Published on \w+ \d+, \d+', published, item, count=1)
+
+
+def _replace_last(pattern: re.Pattern, text: str, replacement: str) -> str:
+    *_, match = pattern.finditer(text)
+    return text[:match.start()] + match.expand(replacement) + text[match.end():]
+
+
+@asynccontextmanager
+async def serve(site: StandInSite, host: str = '127.0.0.1', port: int = 0) -> AsyncIterator[str]:
+    """:return: base url of the running stand-in"""
+    runner = web.AppRunner(site.make_app(), access_log=None)
+    await runner.setup()
+    tcp_site = web.TCPSite(runner, host, port)
+    await tcp_site.start()
+    try:
+        bound_port = runner.addresses[0][1]
+        yield f'http://{host}:{bound_port}/'
+    finally:
+        await runner.cleanup()
+
+
+@click.command()
+@click.option('--port', default=8080)
+@click.option('--pages', default=100, help='Number of announcement list pages')
+@click.option('--latency', default=0., help='Response delay, seconds')
+@click.option('--error-rate', default=0., help='Share of requests answered with 503')
+@click.option('--compress', is_flag=True, help='Compress pages as negotiated by Accept-Encoding')
+@click.option('--bandwidth', default=0., help='Bytes per second per response, 0 sends pages at once')
+def main(port, pages, latency, error_rate, compress, bandwidth):
+    site = StandInSite(
+        pages_qty=pages, latency=latency, error_rate=error_rate, compress=compress, bandwidth=bandwidth
+    )
+    web.run_app(site.make_app(), host='127.0.0.1', port=port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+sharded backfill of long periods
+
+    python -m src.api.backfill run --start-date 2019-01-01 --end-date 2024-12-31 --folder tmp \
+        --storage storage/news.db --queue storage/queue.db --workers 4
+
+or on several nodes sharing the queue and the storage files:
+
+    python -m src.api.backfill plan --start-date ... --end-date ... --storage ... --queue ...
+    python -m src.api.backfill work --storage ... --queue ...        # on every node, any number of times
+    python -m src.api.backfill export --start-date ... --end-date ... --folder ... --storage ... --queue ...
+
+every command may be restarted: a planned period is not planned again,
+shards of crashed workers are claimed again after their lease expires
+"""
+import asyncio
+import multiprocessing
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Iterable
+
+import click
+
+from src.api.factory import build_service
+from src.backfill import ShardedBackfill
+from src.domain.result_saver import FileToFolderSaver, FORMATS
+from src.dto import NewsRequest, NewsRecord
+from src.infrastructure.config import config
+from src.infrastructure.logger import logger, setup_logger
+from src.infrastructure.work_queue import SQLiteWorkQueue
+
+_dates = [
+    click.option('--start-date', required=True, help='Start date in ISO format (YYYY-MM-DD)'),
+    click.option('--end-date', required=True, help='End date in ISO format (YYYY-MM-DD)'),
+]
+_paths = [
+    click.option('--storage', required=True, default=config.STORAGE_PATH,
+                 type=click.Path(dir_okay=False, writable=True), help='News storage (SQLite) path shared by workers'),
+    click.option('--queue', required=True, default=config.WORK_QUEUE_PATH,
+                 type=click.Path(dir_okay=False, writable=True), help='Work queue (SQLite) path shared by workers'),
+]
+
+
+def _with(options):
+    def decorator(f):
+        for option in reversed(options):
+            f = option(f)
+        return f
+    return decorator
+
+
+@click.group()
+def main():
+    """sharded backfill of long periods"""
+    setup_logger()
+
+
+@main.command()
+@_with(_dates + _paths)
+@click.option('--shard-pages', default=config.SHARD_PAGES, help='Headline pages per shard')
+def plan(start_date, end_date, storage, queue, shard_pages):
+    """split the period into shards of the dates of --shard-pages headline pages"""
+    asyncio.run(_plan(_request(start_date, end_date), storage, queue, shard_pages))
+
+
+@main.command()
+@_with(_paths)
+def work(storage, queue):
+    """scrape shards until the queue is drained"""
+    asyncio.run(_work(storage, queue))
+
+
+@main.command()
+@_with(_dates + _paths)
+@click.option('--folder', required=True, type=click.Path(file_okay=False, writable=True), help='Output folder path')
+@click.option('--format', 'fmt', default='json', type=click.Choice(FORMATS))
+def export(start_date, end_date, storage, queue, folder, fmt):
+    """save merged results of a finished backfill"""
+    asyncio.run(_export(_request(start_date, end_date), storage, queue, folder, fmt))
+
+
+@main.command()
+@_with(_dates + _paths)
+@click.option('--folder', required=True, type=click.Path(file_okay=False, writable=True), help='Output folder path')
+@click.option('--format', 'fmt', default='json', type=click.Choice(FORMATS))
+@click.option('--shard-pages', default=config.SHARD_PAGES, help='Headline pages per shard')
+@click.option('--workers', default=4, help='Worker processes, each one has its own connection pool and parser')
+def run(start_date, end_date, storage, queue, folder, fmt, shard_pages, workers):
+    """plan, scrape with local worker processes and export"""
+    request = _request(start_date, end_date)
+    asyncio.run(_plan(request, storage, queue, shard_pages))
+    # spawn: workers must not inherit the event loop, sessions and SQLite connections of the parent
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=_work_process, args=(storage, queue)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    asyncio.run(_export(request, storage, queue, folder, fmt))
+
+
+def _request(start_date: str, end_date: str) -> NewsRequest:
+    start = datetime.fromisoformat(start_date).date()
+    end = datetime.fromisoformat(end_date).date()
+    if start > end:
+        raise click.BadParameter('Start date cannot be after end date')
+    return NewsRequest(start_date=start, end_date=end)
+
+
+def _work_process(storage: str, queue: str) -> None:
+    asyncio.run(_work(storage, queue))
+
+
+async def _plan(request: NewsRequest, storage: str, queue: str, shard_pages: int) -> None:
+    service = build_service(storage=storage)
+    work_queue = _work_queue(queue)
+    try:
+        await ShardedBackfill(service, work_queue).plan(request, shard_pages)
+    finally:
+        await service.close()
+        work_queue.close()
+
+
+async def _work(storage: str, queue: str) -> None:
+    service = build_service(storage=storage)
+    work_queue = _work_queue(queue)
+    try:
+        backfill = ShardedBackfill(service, work_queue)
+        completed = await backfill.work()
+        logger.info(f'{backfill.worker} completed {completed} shards')
+    finally:
+        await service.close()
+        work_queue.close()
+
+
+async def _export(request: NewsRequest, storage: str, queue: str, folder: str, fmt: str) -> None:
+    service = build_service(storage=storage)
+    work_queue = _work_queue(queue)
+    try:
+        records = ShardedBackfill(service, work_queue).iter_results(request)
+        filename = str(Path(config.FILENAME).with_suffix(f'.{fmt}'))
+        await FileToFolderSaver().save_records_stream(_aiter(records), folder, filename=filename, fmt=fmt)
+        click.echo(f'Results {filename} saved in {folder}')
+    finally:
+        await service.close()
+        work_queue.close()
+
+
+def _work_queue(path: str) -> SQLiteWorkQueue:
+    return SQLiteWorkQueue(path, lease=config.SHARD_LEASE, max_attempts=config.SHARD_MAX_ATTEMPTS)
+
+
+async def _aiter(records: Iterable[NewsRecord]) -> AsyncIterator[NewsRecord]:
+    for record in records:
+        yield record
+
+
+if __name__ == '__main__':
+    main()
@@ -1,45 +1,286 @@
-import asyncio
+import json
 import click
-from datetime import datetime
+from datetime import date, datetime
+from pathlib import Path
 
-from src.infrastructure.config import config
-from src.infrastructure.logger import logger
-from src.service import OKXScrapingService
+from src.infrastructure.config import config, ENGINES, BACKENDS
+from src.infrastructure.logger import logger, setup_logger
+from src.infrastructure.metrics import metrics
 from src.dto import NewsRequest
-from src.domain.result_saver import FileToFolderSaver
+from src.infrastructure.checkpoint import ScrapeCheckpoint
+from src.infrastructure.dead_letters import DeadLetterQueue
+from src.domain.partitioned_saver import PartitionedSaver, PARTITION_FORMATS, COMPRESSIONS
+from src.domain.result_saver import FileToFolderSaver, FORMATS
+from src.infrastructure.news_storage import SQLiteNewsStorage
+
+
+def _parse_date(ctx, param, value: str | None) -> date | None:
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        raise click.BadParameter(f'{value!r}, expected ISO format (YYYY-MM-DD)')
+
+
+def _parse_periods(ctx, param, values: tuple[str, ...]) -> list[NewsRequest]:
+    periods = []
+    for value in values:
+        try:
+            start_date, end_date = value.split(':')
+            period = NewsRequest(
+                start_date=datetime.fromisoformat(start_date).date(),
+                end_date=datetime.fromisoformat(end_date).date(),
+            )
+        except ValueError:
+            raise click.BadParameter(f'{value!r}, expected START:END in ISO format (YYYY-MM-DD:YYYY-MM-DD)')
+        if period.start_date > period.end_date:
+            raise click.BadParameter(f'{value!r}, start date cannot be after end date')
+        periods.append(period)
+    return periods
 
 
 @click.command()
-@click.option('--start-date', required=True, help='Start date in ISO format (YYYY-MM-DD)')
-@click.option('--end-date', required=True, help='End date in ISO format (YYYY-MM-DD)')
+@click.option('--start-date', callback=_parse_date, help='Start date in ISO format (YYYY-MM-DD)')
+@click.option('--end-date', callback=_parse_date, help='End date in ISO format (YYYY-MM-DD)')
+@click.option('--period', 'periods', multiple=True, callback=_parse_periods,
+              help='Period START:END instead of --start-date/--end-date, may be repeated: every period is saved '
+                   'to its own results.START_END.<format>, pages and articles shared by periods are loaded once')
 @click.option('--folder', required=True, type=click.Path(file_okay=False, writable=True),
               help='Output folder path')
-def main(start_date, end_date, folder):
-    asyncio.run(_main(start_date, end_date, folder))
+@click.option('--storage', default=config.STORAGE_PATH, type=click.Path(dir_okay=False, writable=True),
+              help='Local news storage (SQLite) path, enables incremental sync')
+@click.option('--page-index', default=config.PAGE_INDEX_PATH, type=click.Path(dir_okay=False, writable=True),
+              help='Persisted date to page index path, replaces the binary search of period boundaries')
+@click.option('--http-cache', default=config.HTTP_CACHE_PATH, type=click.Path(file_okay=False, writable=True),
+              help='On-disk HTTP cache folder, pages are revalidated with conditional requests')
+@click.option('--parser-engine', default=config.PARSER_ENGINE, type=click.Choice(ENGINES),
+              help='HTML parser engine, lxml and selectolax require optional dependencies')
+@click.option('--parser-backend', default=config.PARSER_BACKEND, type=click.Choice(BACKENDS),
+              help='Where HTML parsing runs: in the event loop, in a thread pool or in a process pool')
+@click.option('--format', 'fmt', type=click.Choice(sorted({*FORMATS, *PARTITION_FORMATS})),
+              help='Output format: JSON array or one JSON record per line, parquet for partitioned output only; '
+                   'json by default, ndjson with --partitioned')
+@click.option('--partitioned', is_flag=True,
+              help='Write records to per-day partitions folder/YYYY/MM/DD.<format> with a manifest.json, '
+                   'only the changed days are rewritten')
+@click.option('--compression', default='none', type=click.Choice(COMPRESSIONS),
+              help='Compression of the partitions, zstd and parquet require optional dependencies')
+@click.option('--metrics', 'metrics_path', default=config.METRICS_PATH, type=click.Path(dir_okay=False, writable=True),
+              help='Write JSON run summary of requests, latencies, cache and parsing metrics')
+@click.option('--prometheus', 'prometheus_path', default=config.PROMETHEUS_PATH,
+              type=click.Path(dir_okay=False, writable=True),
+              help='Write the metrics in Prometheus text format (e.g. for node_exporter textfile collector)')
+@click.option('--http2', is_flag=True, default=config.HTTP2,
+              help='Multiplex the requests over a few HTTP/2 connections, requires the optional httpx[http2]')
+@click.option('--stream-cutoff', is_flag=True, default=config.HTTP_STREAM_CUTOFF,
+              help='Stop reading a page once the needed elements are closed, pays off on slow links: '
+                   'the cut connection is not reused')
+@click.option('--resume', is_flag=True,
+              help='Continue an interrupted scrape from the checkpoint journal in the output folder, '
+                   'not supported for --period without --storage')
+@click.option('--updated-only', is_flag=True,
+              help='With --storage, walk the headline pages of the period again and save only new and changed '
+                   'articles to results.updated.<format>, articles with unchanged headlines are not loaded')
+def main(
+    start_date, end_date, periods, folder, storage, page_index, http_cache, parser_engine, parser_backend, fmt,
+    partitioned, compression, metrics_path, prometheus_path, resume, http2, stream_cutoff, updated_only,
+):
+    setup_logger()
+    if periods and (start_date or end_date) or not periods and not (start_date and end_date):
+        raise click.UsageError('Either --start-date and --end-date or --period options are required')
+    if start_date and start_date > end_date:
+        raise click.BadParameter('start date cannot be after end date', param_hint='--start-date')
+    if resume and periods and not storage:
+        raise click.UsageError('--resume continues a --start-date/--end-date scrape, a batch of --period is '
+                               'resumed with --storage only')
+    if updated_only and (not storage or periods):
+        raise click.UsageError('--updated-only requires --storage and --start-date/--end-date')
+    if fmt is None:
+        fmt = 'ndjson' if partitioned else 'json'
+    if partitioned and fmt not in PARTITION_FORMATS:
+        raise click.BadParameter(f'partitions are written in one of {PARTITION_FORMATS}', param_hint='--format')
+    if not partitioned and (fmt not in FORMATS or compression != 'none'):
+        raise click.BadParameter('parquet and compression require --partitioned', param_hint='--format')
+    # a period covered by the storage is served without importing asyncio, the network and the parsing stacks
+    if storage and not periods and not updated_only and _serve_from_storage(
+        start_date, end_date, folder, storage, fmt, partitioned, compression
+    ):
+        _write_metrics(metrics_path, prometheus_path)
+        return
+    import asyncio
+    asyncio.run(_main(
+        start_date, end_date, folder, storage, page_index, http_cache, parser_engine, parser_backend, fmt,
+        metrics_path, prometheus_path, resume, partitioned, compression, periods, http2, updated_only, stream_cutoff,
+    ))
 
 
-async def _main(start_date, end_date, folder):
-    try:
-        start = datetime.fromisoformat(start_date).date()
-        end = datetime.fromisoformat(end_date).date()
+async def _main(
+    start_date: date | None,
+    end_date: date | None,
+    folder,
+    storage=None,
+    page_index=None,
+    http_cache=None,
+    parser_engine=config.PARSER_ENGINE,
+    parser_backend=config.PARSER_BACKEND,
+    fmt='json',
+    metrics_path=None,
+    prometheus_path=None,
+    resume=False,
+    partitioned=False,
+    compression='none',
+    periods=(),
+    http2=config.HTTP2,
+    updated_only=False,
+    stream_cutoff=config.HTTP_STREAM_CUTOFF,
+):
+    from src.api.factory import build_service
 
-        if start > end:
-            raise ValueError("Start date cannot be after end date")
+    try:
+        request = None if periods else NewsRequest(start_date=start_date, end_date=end_date)
 
-        request = NewsRequest(
-            start_date=start,
-            end_date=end,
+        filename = str(Path(config.FILENAME).with_suffix(f'.updated.{fmt}' if updated_only else f'.{fmt}'))
+        saver = PartitionedSaver(fmt, compression) if partitioned else None
+        # the news storage keeps the progress itself, otherwise completed work is journaled next to the results
+        # a batch is resumed by the storage only
+        checkpoint = None if storage or periods else ScrapeCheckpoint(
+            str(Path(folder) / Path(config.FILENAME).with_suffix('.checkpoint.ndjson')), request, resume=resume
         )
+        # articles failed after all retries do not abort the scrape, python -m src.api.retry loads them again
+        dead_letters = DeadLetterQueue(dead_letters_path(folder), resume=resume)
+        service = build_service(
+            storage, page_index, http_cache, parser_engine, parser_backend, checkpoint, dead_letters, http2,
+            stream_cutoff,
+        )
+        if updated_only:
+            records = service.refresh_storage(request)
+        elif periods:
+            records = service.iter_news_by_periods(periods)
+        else:
+            records = service.iter_news_by_period(request)
+        try:
+            if saver is not None:
+                changed = await saver.save_records_stream(records, folder)
+                saved = f'{len(changed)} changed partitions'
+            elif periods:
+                filenames = {period: period_filename(period, fmt) for period in periods}
+                await FileToFolderSaver().save_records_by_periods(records, folder, filenames, fmt=fmt)
+                saved = ', '.join(filenames.values())
+            else:
+                saved = filename
+                await FileToFolderSaver().save_records_stream(records, folder, filename=filename, fmt=fmt)
+        except Exception:
+            if checkpoint is not None:
+                checkpoint.close()
+                if checkpoint.records_qty:
+                    await _save_partial_results(checkpoint, folder, fmt, saver)
+            raise
+        else:
+            if checkpoint is not None:
+                checkpoint.remove()
+                (Path(folder) / _partial_filename(fmt)).unlink(missing_ok=True)
+        finally:
+            await service.close()
+            dead_letters.save()
+            _write_metrics(metrics_path, prometheus_path)
+        click.echo(f'Results {saved} saved in {folder}')
+        if dead_letters:
+            logger.warning(
+                f'{len(dead_letters)} articles failed and are missing in the results, they are listed in '
+                f'{dead_letters.path}, load them with: python -m src.api.retry --folder {folder}'
+            )
+        logger.info(f'rate limiter and cache stats: {metrics.summary()["gauges"]}')
 
-        records = await OKXScrapingService().get_news_by_period(request)
-        FileToFolderSaver().save_records_to_file(records, folder, filename=config.FILENAME)
-        click.echo(f'Results {config.FILENAME} saved in {folder}')
+    # the dates are validated by click, errors of the scrape pipeline arrive wrapped in an ExceptionGroup
+    except* ValueError as group:
+        for e in _leaf_errors(group):
+            logger.error(
+                f"Error: invalid data. {e}", exc_info=e
+            )
+    except* Exception as group:
+        for e in _leaf_errors(group):
+            logger.error(
+                f"Unexpected error. {e}", exc_info=e
+            )
 
-    except ValueError as e:
-        logger.error(
-            f"Error: Invalid date format. Please use ISO format (YYYY-MM-DD). {e}", exc_info=e
-        )
-    except Exception as e:
-        logger.error(
-            f"Unexpected error. {e}", exc_info=e
+
+def _serve_from_storage(
+    start: date,
+    end: date,
+    folder: str,
+    storage: str,
+    fmt: str,
+    partitioned: bool,
+    compression: str,
+) -> bool:
+    """:return: False if the period is not covered by the storage"""
+    if start > end or not Path(storage).exists():
+        return False
+    news_storage = SQLiteNewsStorage(storage)
+    try:
+        if not news_storage.is_period_covered(start, end):
+            return False
+        records = news_storage.iter_records_by_period(start, end)
+        if partitioned:
+            saved = f'{len(PartitionedSaver(fmt, compression).save_records(records, folder))} changed partitions'
+        else:
+            saved = str(Path(config.FILENAME).with_suffix(f'.{fmt}'))
+            FileToFolderSaver().save_records(records, folder, filename=saved, fmt=fmt)
+    finally:
+        news_storage.close()
+    click.echo(f'Results {saved} saved in {folder}')
+    return True
+
+
+def _leaf_errors(group: BaseExceptionGroup) -> list[BaseException]:
+    return [
+        leaf
+        for e in group.exceptions
+        for leaf in (_leaf_errors(e) if isinstance(e, BaseExceptionGroup) else [e])
+    ]
+
+
+def _write_metrics(metrics_path: str | None, prometheus_path: str | None) -> None:
+    if metrics_path:
+        Path(metrics_path).write_text(json.dumps(metrics.summary(), indent=2))
+    if prometheus_path:
+        Path(prometheus_path).write_text(metrics.prometheus())
+
+
+async def _save_partial_results(
+    checkpoint: ScrapeCheckpoint,
+    folder: str,
+    fmt: str,
+    saver: PartitionedSaver | None,
+) -> None:
+    if saver is not None:
+        # partitions are append-only, the resumed run adds the rest of the records to them
+        await saver.save_records_stream(_aiter(checkpoint.iter_records()), folder)
+        saved_to = f'partitions of {folder}'
+    else:
+        saved_to = f'{folder}/{_partial_filename(fmt)}'
+        await FileToFolderSaver().save_records_stream(
+            _aiter(checkpoint.iter_records()), folder, _partial_filename(fmt), fmt=fmt
         )
+    logger.warning(
+        f'scrape is interrupted, {checkpoint.records_qty} scraped records are saved to {saved_to}, '
+        f'rerun with --resume to continue from {checkpoint.path}'
+    )
+
+
+def period_filename(period: NewsRequest, fmt: str) -> str:
+    return str(Path(config.FILENAME).with_suffix(f'.{period.start_date}_{period.end_date}.{fmt}'))
+
+
+def dead_letters_path(folder: str) -> str:
+    return str(Path(folder) / Path(config.FILENAME).with_suffix('.dead_letters.ndjson'))
+
+
+def _partial_filename(fmt: str) -> str:
+    return str(Path(config.FILENAME).with_suffix(f'.partial.{fmt}'))
+
+
+async def _aiter(records):
+    for record in records:
+        yield record
@@ -0,0 +1,33 @@
+from src.domain.page_provider import OKXPageProvider
+from src.domain.parser import get_parser
+from src.domain.parsing_backend import ParsingBackend
+from src.infrastructure.checkpoint import ScrapeCheckpoint
+from src.infrastructure.config import config
+from src.infrastructure.dead_letters import DeadLetterQueue
+from src.infrastructure.http_cache import FileHTTPCache
+from src.infrastructure.news_storage import SQLiteNewsStorage
+from src.infrastructure.page_index import PageDateIndex
+from src.service import OKXScrapingService
+
+
+def build_service(
+    storage: str | None = None,
+    page_index: str | None = None,
+    http_cache: str | None = None,
+    parser_engine: str = config.PARSER_ENGINE,
+    parser_backend: str = config.PARSER_BACKEND,
+    checkpoint: ScrapeCheckpoint | None = None,
+    dead_letters: DeadLetterQueue | None = None,
+    http2: bool = config.HTTP2,
+    stream_cutoff: bool = config.HTTP_STREAM_CUTOFF,
+) -> OKXScrapingService:
+    """service with the optional components enabled by their paths, shared by the cli and the server"""
+    cache = FileHTTPCache(http_cache, max_size=config.HTTP_CACHE_MAX_SIZE) if http_cache else None
+    return OKXScrapingService(
+        storage=SQLiteNewsStorage(storage) if storage else None,
+        page_provider=OKXPageProvider(http_cache=cache, http2=http2, stream_cutoff=stream_cutoff),
+        parser=ParsingBackend(get_parser(parser_engine), kind=parser_backend, workers=config.PARSER_WORKERS),
+        page_index=PageDateIndex(page_index) if page_index else None,
+        checkpoint=checkpoint,
+        dead_letters=dead_letters,
+    )
@@ -0,0 +1,56 @@
+"""
+load again the articles which failed after all retries during a scrape
+
+    python -m src.api.retry --folder tmp
+
+the dead letters of the scrape in the folder are loaded only, recovered records are saved to
+results.recovered.<format> (and to the news storage if given), still failing articles stay in the dead letters
+"""
+import asyncio
+from pathlib import Path
+
+import click
+
+from src.api.cli import dead_letters_path
+from src.api.factory import build_service
+from src.domain.result_saver import FileToFolderSaver, FORMATS
+from src.infrastructure.config import config
+from src.infrastructure.dead_letters import DeadLetterQueue
+from src.infrastructure.logger import logger, setup_logger
+
+
+@click.command()
+@click.option('--folder', required=True, type=click.Path(file_okay=False, writable=True),
+              help='Output folder of the scrape')
+@click.option('--storage', default=config.STORAGE_PATH, type=click.Path(dir_okay=False, writable=True),
+              help='Local news storage (SQLite) path, recovered records are stored there too')
+@click.option('--http-cache', default=config.HTTP_CACHE_PATH, type=click.Path(file_okay=False, writable=True),
+              help='On-disk HTTP cache folder')
+@click.option('--format', 'fmt', default='json', type=click.Choice(FORMATS))
+def main(folder, storage, http_cache, fmt):
+    setup_logger()
+    asyncio.run(_main(folder, storage, http_cache, fmt))
+
+
+async def _main(folder: str, storage: str | None = None, http_cache: str | None = None, fmt: str = 'json') -> None:
+    path = dead_letters_path(folder)
+    if not Path(path).exists():
+        click.echo(f'No dead letters in {folder}')
+        return
+    dead_letters = DeadLetterQueue(path)
+    service = build_service(storage=storage, http_cache=http_cache, dead_letters=dead_letters)
+    filename = str(Path(config.FILENAME).with_suffix(f'.recovered.{fmt}'))
+    try:
+        qty = len(dead_letters)
+        recovered = await FileToFolderSaver().save_records_stream(
+            service.retry_dead_letters(), folder, filename=filename, fmt=fmt
+        )
+    finally:
+        await service.close()
+    click.echo(f'{recovered} of {qty} articles recovered to {filename} in {folder}')
+    if dead_letters:
+        logger.warning(f'{len(dead_letters)} articles still fail, they are kept in {path}')
+
+
+if __name__ == '__main__':
+    main()
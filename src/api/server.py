@@ -0,0 +1,107 @@
+"""
+long-running HTTP/JSON API over one scraping service
+
+    python -m src.api.server --port 8000 --page-index storage/index.json
+
+    GET /news?start=2025-04-01&end=2025-04-07
+    GET /metrics
+
+the connection pool, page caches, page index and storage live as long as the process,
+so consumers do not pay for start-up and cold caches on every request
+"""
+import asyncio
+from datetime import date
+
+import click
+from aiohttp import web
+
+from src.api.factory import build_service
+from src.dto import NewsRequest, NewsRecord
+from src.infrastructure.config import config, ENGINES, BACKENDS
+from src.infrastructure.logger import logger, setup_logger
+from src.infrastructure.metrics import metrics
+from src.service import OKXScrapingService
+
+
+class NewsAPI:
+    """
+    concurrent requests of the same period share one scrape;
+    overlapping periods share in-flight page fetches through the provider caches
+    """
+
+    def __init__(self, service: OKXScrapingService):
+        self._service = service
+        self._in_flight: dict[tuple[date, date], asyncio.Task[list[NewsRecord]]] = {}
+
+    async def get_news(self, request: web.Request) -> web.Response:
+        try:
+            news_request = NewsRequest(
+                start_date=date.fromisoformat(request.query['start']),
+                end_date=date.fromisoformat(request.query['end']),
+            )
+        except KeyError as e:
+            raise web.HTTPBadRequest(text=f'{e.args[0]} query parameter is required')
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=f'Invalid date format, use ISO format (YYYY-MM-DD). {e}')
+        if news_request.start_date > news_request.end_date:
+            raise web.HTTPBadRequest(text='Start date cannot be after end date')
+
+        key = (news_request.start_date, news_request.end_date)
+        scrape = self._in_flight.get(key)
+        if scrape is None:
+            scrape = asyncio.create_task(self._scrape(news_request))
+            self._in_flight[key] = scrape
+            scrape.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            metrics.inc('okx_api_coalesced_requests_total')
+        # a disconnected client must not cancel the scrape shared with others
+        records = await asyncio.shield(scrape)
+        return web.json_response([r.dump_dict() for r in records])
+
+    async def get_metrics(self, request: web.Request) -> web.Response:
+        self._service.collect_metrics()
+        return web.Response(text=metrics.prometheus(), content_type='text/plain', charset='utf-8')
+
+    async def _scrape(self, news_request: NewsRequest) -> list[NewsRecord]:
+        with metrics.timer('okx_api_request_seconds'):
+            return list(await self._service.get_news_by_period(news_request))
+
+
+def make_app(service: OKXScrapingService) -> web.Application:
+    api = NewsAPI(service)
+    app = web.Application()
+    app.router.add_get('/news', api.get_news)
+    app.router.add_get('/metrics', api.get_metrics)
+
+    async def close_service(_: web.Application) -> None:
+        await service.close()
+
+    app.on_cleanup.append(close_service)
+    return app
+
+
+@click.command()
+@click.option('--host', default=config.SERVER_HOST)
+@click.option('--port', default=config.SERVER_PORT, type=int)
+@click.option('--storage', default=config.STORAGE_PATH, type=click.Path(dir_okay=False, writable=True),
+              help='Local news storage (SQLite) path, enables incremental sync')
+@click.option('--page-index', default=config.PAGE_INDEX_PATH, type=click.Path(dir_okay=False, writable=True),
+              help='Persisted date to page index path, replaces the binary search of period boundaries')
+@click.option('--http-cache', default=config.HTTP_CACHE_PATH, type=click.Path(file_okay=False, writable=True),
+              help='On-disk HTTP cache folder, pages are revalidated with conditional requests')
+@click.option('--parser-engine', default=config.PARSER_ENGINE, type=click.Choice(ENGINES),
+              help='HTML parser engine, lxml and selectolax require optional dependencies')
+@click.option('--parser-backend', default=config.PARSER_BACKEND, type=click.Choice(BACKENDS),
+              help='Where HTML parsing runs: in the event loop, in a thread pool or in a process pool')
+def main(host, port, storage, page_index, http_cache, parser_engine, parser_backend):
+    setup_logger()
+    async def app_factory() -> web.Application:
+        # the service owns an aiohttp session, so it is created inside the running loop
+        return make_app(build_service(storage, page_index, http_cache, parser_engine, parser_backend))
+
+    logger.info(f'serving on http://{host}:{port}/news')
+    web.run_app(app_factory(), host=host, port=port, print=None)
+
+
+if __name__ == '__main__':
+    main()
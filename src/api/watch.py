@@ -0,0 +1,63 @@
+"""
+live tail of OKX announcements
+
+    python -m src.api.watch --output news.ndjson --min-interval 5 --max-interval 60
+
+every new announcement is printed (or appended to the output file) as one JSON line as soon as it is published;
+only the first headlines page is polled with conditional requests
+"""
+import asyncio
+import json
+
+import click
+
+from src.domain.page_provider import OKXPageProvider
+from src.domain.parser import get_parser
+from src.domain.parsing_backend import ParsingBackend
+from src.dto import NewsRecord
+from src.infrastructure.config import config, ENGINES
+from src.infrastructure.http_cache import MemoryHTTPCache
+from src.infrastructure.logger import logger, setup_logger
+from src.watcher import NewsWatcher
+
+
+@click.command()
+@click.option('--output', type=click.Path(dir_okay=False, writable=True),
+              help='Append news to this NDJSON file instead of stdout')
+@click.option('--min-interval', default=config.WATCH_MIN_INTERVAL, help='Poll interval after new news, seconds')
+@click.option('--max-interval', default=config.WATCH_MAX_INTERVAL,
+              help='Upper bound of the poll interval growing while nothing is published, seconds')
+@click.option('--parser-engine', default=config.PARSER_ENGINE, type=click.Choice(ENGINES),
+              help='HTML parser engine, lxml and selectolax require optional dependencies')
+def main(output, min_interval, max_interval, parser_engine):
+    setup_logger()
+    try:
+        asyncio.run(_main(output, min_interval, max_interval, parser_engine))
+    except KeyboardInterrupt:
+        logger.info('watch stopped')
+
+
+async def _main(output: str | None, min_interval: float, max_interval: float, parser_engine: str) -> None:
+    parser = ParsingBackend(get_parser(parser_engine))
+    file = open(output, 'a') if output else None
+
+    def emit(record: NewsRecord) -> None:
+        line = json.dumps(record.dump_dict())
+        if file is None:
+            click.echo(line)
+        else:
+            file.write(line + '\n')
+            file.flush()
+
+    try:
+        async with OKXPageProvider(http_cache=MemoryHTTPCache()) as page_provider:
+            watcher = NewsWatcher(page_provider, parser, min_interval=min_interval, max_interval=max_interval)
+            await watcher.run(emit)
+    finally:
+        if file is not None:
+            file.close()
+        parser.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from src.dto import NewsRequest, NewsRecord
+from src.infrastructure.config import config
+from src.infrastructure.logger import logger
+from src.infrastructure.metrics import metrics
+from src.infrastructure.work_queue import SQLiteWorkQueue, PageShard, DONE
+from src.service import OKXScrapingService
+
+
+class ShardedBackfill:
+    """
+    scrape of a long period split into shards of about shard_pages headline pages
+
+    shards are planned once into a SQLite work queue, any number of worker processes or nodes
+    sharing the queue and the news storage claim and scrape them;
+    a shard is kept as the dates of its pages and its pages are located again when it is claimed,
+    so headlines pushed down by new announcements between the planning and the claim are not lost;
+    records are upserted by (date, title), so the storage merges and deduplicates shard results
+    and a restarted shard loads only the articles it has not stored yet
+    """
+
+    def __init__(self, service: OKXScrapingService, queue: SQLiteWorkQueue, worker: str | None = None):
+        if service.storage is None:
+            raise ValueError('Sharded backfill requires the news storage')
+        self._service = service
+        self._storage = service.storage
+        self._queue = queue
+        self.worker = worker or f'{socket.gethostname()}-{os.getpid()}'
+
+    async def plan(self, request: NewsRequest, shard_pages: int = config.SHARD_PAGES) -> int:
+        """:return: number of planned shards, 0 if the period is already planned (the backfill is resumed)"""
+        if self._queue.is_planned(request):
+            logger.info(f'backfill {request} is already planned: {self._queue.progress(request)}')
+            return 0
+        newest_page, oldest_page = await self._service.locate_pages(request)
+        periods = []
+        end_date = request.end_date
+        for first_page in range(newest_page, oldest_page + 1, shard_pages):
+            last_page = min(first_page + shard_pages - 1, oldest_page)
+            start_date = request.start_date
+            if last_page < oldest_page:
+                page_dates = [h.date for h in (await self._service.get_headline_page(last_page)).records]
+                start_date = min(max(min(page_dates, default=end_date), request.start_date), end_date)
+            if periods and periods[-1].start_date == start_date:
+                # a day spanning several shards is scraped by one of them
+                continue
+            periods.append(NewsRequest(start_date=start_date, end_date=end_date))
+            # the oldest day of a shard may span the next one too, it is the newest day of the next shard
+            end_date = start_date
+        self._queue.enqueue(request, periods)
+        logger.info(f'backfill {request} planned: {len(periods)} shards of pages {newest_page}-{oldest_page}')
+        return len(periods)
+
+    async def work(self) -> int:
+        """claim and scrape shards until the queue is drained, :return: number of completed shards"""
+        completed = 0
+        while (shard := self._queue.claim(self.worker)) is not None:
+            try:
+                await self._run_shard(shard)
+            except Exception as e:
+                logger.error(f'shard {shard} failed: {e!r}', exc_info=e)
+                metrics.inc('okx_backfill_shards_total', status='failed')
+                self._queue.fail(shard, self.worker, repr(e))
+                continue
+            self._queue.complete(shard, self.worker)
+            metrics.inc('okx_backfill_shards_total', status='done')
+            completed += 1
+        return completed
+
+    def is_done(self, request: NewsRequest) -> bool:
+        progress = self._queue.progress(request)
+        return bool(progress) and set(progress) == {DONE}
+
+    def iter_results(self, request: NewsRequest) -> Iterator[NewsRecord]:
+        """merged results in date order, available when every shard is done"""
+        if not self.is_done(request):
+            raise RuntimeError(f'Backfill {request} is not finished: {self._queue.progress(request)}')
+        # the current day is never complete
+        last_complete_date = datetime.now().date() - timedelta(days=1)
+        self._storage.mark_covered(request.start_date, min(request.end_date, last_complete_date))
+        return self._storage.iter_records_by_period(request.start_date, request.end_date)
+
+    async def _run_shard(self, shard: PageShard) -> None:
+        logger.info(f'{self.worker} scrapes shard {shard}')
+        renewal = asyncio.create_task(self._renew_lease(shard))
+        try:
+            first_page, last_page = await self._service.locate_pages(shard.period)
+            async for record in self._service.iter_news_by_pages(
+                shard.period, first_page, last_page, skip=self._storage.has_record
+            ):
+                self._storage.save_record(record)
+        finally:
+            renewal.cancel()
+
+    async def _renew_lease(self, shard: PageShard) -> None:
+        while True:
+            await asyncio.sleep(config.SHARD_LEASE / 3)
+            if not self._queue.renew(shard, self.worker):
+                # another worker took the shard over, the results are merged by the storage anyway
+                logger.warning(f'{self.worker} lost the lease of shard {shard}')
+                return
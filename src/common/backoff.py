@@ -1,20 +1,60 @@
 import asyncio
+import random
 from functools import wraps
+from typing import Callable
 
 
-def backoff(retry_count: int, exceptions: tuple[type[Exception], ...], timeout: float = 1):
+def backoff(
+    retry_count: int,
+    exceptions: tuple[type[Exception], ...],
+    timeout: float = 1,
+    factor: float = 1,
+    max_timeout: float | None = None,
+    jitter: bool = False,
+    on_retry: Callable[[Exception], None] | None = None,
+):
+    """
+    :param timeout: delay before the first retry
+    :param factor: delay multiplier for every next retry, 1 keeps the delay fixed
+    :param max_timeout: upper bound of the delay
+    :param jitter: sleep a random time up to the delay ("full jitter"), so concurrent retries do not synchronize
+    :param on_retry: hook called with the exception before every retry
+
+    an exception with `retry_after` attribute (e.g. from Retry-After header) delays the retry at least by it
+    """
     def wrapper(f):
         @wraps(f)
         async def _wrapped(*args, **kwargs):
             for attempt in range(retry_count):
                 try:
                     return await f(*args, **kwargs)
-                except exceptions:
+                except exceptions as e:
                     if attempt < retry_count - 1:
-                        await asyncio.sleep(timeout)
+                        if on_retry is not None:
+                            on_retry(e)
+                        await asyncio.sleep(_get_delay(attempt, e, timeout, factor, max_timeout, jitter))
                         continue
                     raise
             raise NotImplemented
 
         return _wrapped
     return wrapper
+
+
+def _get_delay(
+    attempt: int,
+    exc: Exception,
+    timeout: float,
+    factor: float,
+    max_timeout: float | None,
+    jitter: bool,
+) -> float:
+    delay = timeout * factor ** attempt
+    if max_timeout is not None:
+        delay = min(delay, max_timeout)
+    if jitter:
+        delay = random.uniform(0, delay)
+    retry_after = getattr(exc, 'retry_after', None)
+    if retry_after:
+        delay = max(delay, retry_after)
+    return delay
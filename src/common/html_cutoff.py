@@ -0,0 +1,44 @@
+import re
+
+
+class ElementEnd:
+    """
+    incremental search of the end of the first `tag` element whose opening tag contains `marker` (e.g. a class prefix)
+
+    the text is fed in chunks as it is decoded from the socket, only the unscanned tail of the last chunk is kept;
+    nested elements of the same tag are counted, so the element ends at its matching closing tag
+    """
+
+    def __init__(self, marker: str, tag: str = 'div'):
+        self._marker = marker
+        self._tag_re = re.compile(rf'<(/?){tag}\b[^>]*>', re.I)
+        self._buffer = ''
+        # position of the buffer start in the whole text
+        self._offset = 0
+        # None until the opening tag is found
+        self._depth: int | None = None
+
+    def feed(self, text: str) -> int | None:
+        """:return: position right after the element in the whole text fed so far, None while it is not closed"""
+        buffer = self._buffer + text
+        position = 0
+        if self._depth is None:
+            found = buffer.find(self._marker)
+            if found < 0:
+                # the marker may be in an opening tag cut by the chunk
+                return self._keep(buffer, buffer.rfind('<'))
+            position = buffer.rfind('<', 0, found)
+            self._depth = 0
+        for match in self._tag_re.finditer(buffer, position):
+            self._depth += -1 if match.group(1) else 1
+            position = match.end()
+            if self._depth == 0:
+                return self._offset + position
+        return self._keep(buffer, buffer.rfind('<', position))
+
+    def _keep(self, buffer: str, start: int) -> None:
+        """keep the buffer from the last tag start, the tag may be cut by the chunk"""
+        if start < 0:
+            start = len(buffer)
+        self._offset += start
+        self._buffer = buffer[start:]
@@ -0,0 +1,130 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+
+@dataclass
+class RateLimiterStats:
+    requests: int = 0
+    overloads: int = 0
+    slowdowns: int = 0
+    throttled_seconds: float = 0.
+
+
+class AdaptiveRateLimiter:
+    """
+    token bucket limiting requests per second
+    and AIMD (additive increase, multiplicative decrease) window of concurrent requests
+
+    every successful response increases the window by 1/window (about +1 per window of responses)
+    and the rate by rate_step; overload signals (429, 5xx, latency growing over latency_factor
+    of the best seen latency) halve both, at most once per cooldown seconds
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        max_rate: float,
+        window: int,
+        max_window: int,
+        min_rate: float = 1.,
+        rate_step: float = .5,
+        latency_factor: float = 2.,
+        cooldown: float = 1.,
+    ):
+        self.rate = rate
+        self.window = float(window)
+        self.stats = RateLimiterStats()
+        self._min_rate = min_rate
+        self._max_rate = max_rate
+        self._max_window = max_window
+        self._rate_step = rate_step
+        self._latency_factor = latency_factor
+        self._cooldown = cooldown
+        self._tokens = 1.
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.
+        self._decreased_at = float('-inf')
+        self._latency: float | None = None
+        self._best_latency: float | None = None
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < max(int(self.window), 1))
+            self._in_flight += 1
+        try:
+            await self._take_token()
+        except BaseException:
+            await self.release()
+            raise
+
+    async def release(self) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        self._latency = latency if self._latency is None else .8 * self._latency + .2 * latency
+        # the best latency slowly drifts up, so a permanently slower server is not treated as overloaded forever
+        self._best_latency = min((self._best_latency or self._latency) * 1.01, self._latency)
+        if self._latency > self._best_latency * self._latency_factor:
+            if self._decrease():
+                self.stats.slowdowns += 1
+            return
+        self.window = min(self.window + 1 / self.window, self._max_window)
+        self.rate = min(self.rate + self._rate_step, self._max_rate)
+
+    def on_overload(self, retry_after: float | None = None) -> None:
+        self.stats.overloads += 1
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        self._decrease()
+
+    def metrics(self) -> dict:
+        return {
+            'rate': round(self.rate, 2),
+            'window': round(self.window, 2),
+            'in_flight': self._in_flight,
+            'requests': self.stats.requests,
+            'overloads': self.stats.overloads,
+            'slowdowns': self.stats.slowdowns,
+            'throttled_seconds': round(self.stats.throttled_seconds, 3),
+        }
+
+    def _decrease(self) -> bool:
+        now = time.monotonic()
+        if now - self._decreased_at < self._cooldown:
+            return False
+        self._decreased_at = now
+        self.window = max(self.window / 2, 1.)
+        self.rate = max(self.rate / 2, self._min_rate)
+        return True
+
+    async def _take_token(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            delay = self._paused_until - now
+            if delay <= 0 and self._tokens >= 1:
+                self._tokens -= 1
+                self.stats.requests += 1
+                return
+            delay = max(delay, (1 - self._tokens) / self.rate)
+            self.stats.throttled_seconds += delay
+            await asyncio.sleep(delay)
+
+    def _refill(self, now: float) -> None:
+        # burst is limited by the concurrency window
+        self._tokens = min(self._tokens + (now - self._refilled_at) * self.rate, max(self.window, 1.))
+        self._refilled_at = now
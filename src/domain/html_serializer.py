@@ -0,0 +1,47 @@
+"""
+serialization of HTML fragments in the same form as BeautifulSoup.decode_contents()
+with the default (minimal) formatter, so every parser engine returns identical bodies
+"""
+from typing import Iterable
+
+VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen',
+    'link', 'menuitem', 'meta', 'param', 'source', 'spacer', 'track', 'wbr',
+})
+# bs4 treats these attributes as whitespace separated lists
+MULTI_VALUED_ATTRIBUTES = frozenset({'class', 'rel', 'rev', 'accept-charset', 'headers', 'accesskey', 'dropzone'})
+
+
+def escape_text(text: str) -> str:
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _quote_attribute_value(value: str) -> str:
+    value = escape_text(value)
+    if '"' not in value:
+        return f'"{value}"'
+    if "'" not in value:
+        return f"'{value}'"
+    return '"{}"'.format(value.replace('"', '&quot;'))
+
+
+def start_tag(name: str, attributes: Iterable[tuple[str, str | None]]) -> str:
+    parts = [name]
+    for key, value in sorted(attributes):
+        value = value or ''
+        if key in MULTI_VALUED_ATTRIBUTES:
+            value = ' '.join(value.split())
+        parts.append(f'{key}={_quote_attribute_value(value)}')
+    if name in VOID_ELEMENTS:
+        return '<{}/>'.format(' '.join(parts))
+    return '<{}>'.format(' '.join(parts))
+
+
+def end_tag(name: str) -> str:
+    if name in VOID_ELEMENTS:
+        return ''
+    return f'</{name}>'
+
+
+def comment(text: str) -> str:
+    return f'<!--{text}-->'
@@ -0,0 +1,53 @@
+import lxml.html
+from lxml import etree
+
+from src.domain.html_serializer import start_tag, end_tag, escape_text, comment
+from src.domain.parser import AbstractOKXParser
+from src.dto import NewsHeadline
+
+
+def _has_class_prefix(prefix: str) -> str:
+    return f'contains(concat(" ", normalize-space(@class)), " {prefix}")'
+
+
+class LxmlOKXParser(AbstractOKXParser):
+    _pagination_links = etree.XPath(
+        '//a[contains(concat(" ", normalize-space(@class), " "), " okui-pagination-item ")]'
+    )
+    _articles = etree.XPath(f'//li[{_has_class_prefix("index_articleItem_")}]')
+    _article_title = etree.XPath(f'.//div[{_has_class_prefix("index_articleTitle_")}]')
+    _article_date = etree.XPath(f'.//div[{_has_class_prefix("index_detailsRow_")}]')
+    _article_link = etree.XPath('.//a')
+    _article_body = etree.XPath(f'//div[{_has_class_prefix("index_richTextContent_")}]')
+
+    def get_pages_qty(self, page_content: str) -> int:
+        links = self._pagination_links(lxml.html.document_fromstring(page_content))
+        return int(links[-1].text_content())
+
+    def extract_headlines_from_page(self, page_content: str) -> list[NewsHeadline]:
+        return self._make_headlines([
+            (
+                self._article_title(row)[0].text_content(),
+                self._article_link(row)[0].get('href'),
+                self._article_date(row)[0].text_content(),
+            )
+            for row in self._articles(lxml.html.document_fromstring(page_content))
+        ])
+
+    def extract_news_body_from_page(self, page_content: str) -> str:
+        news_body = self._article_body(lxml.html.document_fromstring(page_content))[0]
+        return ''.join(_serialize_contents(news_body))
+
+
+def _serialize_contents(element: etree.ElementBase):
+    if element.text:
+        yield escape_text(element.text)
+    for child in element:
+        if child.tag is etree.Comment:
+            yield comment(child.text or '')
+        elif isinstance(child.tag, str):
+            yield start_tag(child.tag, child.attrib.items())
+            yield from _serialize_contents(child)
+            yield end_tag(child.tag)
+        if child.tail:
+            yield escape_text(child.tail)
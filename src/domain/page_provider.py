@@ -1,52 +1,205 @@
+import codecs
+import time
 import urllib.parse
 from asyncio import TimeoutError
-from aiohttp import ClientSession, TCPConnector, ClientError
-from async_lru import alru_cache
+from dataclasses import asdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from aiohttp import ClientError
 
 from src.common.backoff import backoff
+from src.common.html_cutoff import ElementEnd
+from src.common.rate_limiter import AdaptiveRateLimiter
+from src.common.single_flight import SingleFlight
 from src.infrastructure.config import config
+from src.infrastructure.http_cache import FileHTTPCache, MemoryHTTPCache
 from src.infrastructure.logger import logger
+from src.infrastructure.metrics import metrics
+from src.infrastructure.transport import TransportStats, open_session
 
-TIMEOUT = .5
+# delays between the retries, the request timeouts are set by the transport (config.HTTP_*_TIMEOUT)
+RETRY_DELAY = .5
+MAX_RETRY_DELAY = 10
+HEADLINES_PATH = 'help/section/announcements-latest-announcements'
+HEADLINES_ENDPOINT = 'headlines_page'
+ARTICLE_ENDPOINT = 'article'
+# the parsers need a page only up to the end of these elements, the rest of it is not read from the socket
+HEADLINES_END_MARKER = 'index_paginationWrap_'
+ARTICLE_END_MARKER = 'index_richTextContent_'
+CHUNK_SIZE = 16 * 1024
 
 
 class ServerError(Exception):
     ...
 
 
+class TooManyRequests(ServerError):
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class OKXPageProvider:
-    def __init__(self):
-        headers = {'user-agent': config.USER_AGENT}
-        self._session = ClientSession(
-            connector=TCPConnector(limit_per_host=config.LIMIT_RPS),
-            headers=headers
+    def __init__(
+        self,
+        http_cache: FileHTTPCache | MemoryHTTPCache | None = None,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        http2: bool = config.HTTP2,
+        stream_cutoff: bool = config.HTTP_STREAM_CUTOFF,
+    ):
+        # the session is opened by the first request, inside the running event loop
+        self._session = None
+        self._http2 = http2
+        self._stream_cutoff = stream_cutoff
+        self.transport_stats = TransportStats()
+        self._http_cache = http_cache
+        # raw pages are not cached here: the service caches parsed pages
+        self._single_flight = SingleFlight()
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(
+            rate=config.RATE_LIMIT_RPS,
+            max_rate=config.RATE_LIMIT_MAX_RPS,
+            window=config.CONCURRENCY_WINDOW,
+            max_window=config.LIMIT_RPS,
         )
 
-    @alru_cache(maxsize=100)
-    @backoff(3, (ClientError, TimeoutError, ServerError), timeout=TIMEOUT)
     async def get_page_by_number(self, page_number: int) -> str:
-        url = 'https://www.okx.com/help/section/announcements-latest-announcements/page/{page_num}'
-        url = url.format(page_num=page_number)
-
-        resp = await self._session.get(url=url)
-        if resp.status >= 500:
-            raise ServerError(f'External Server: {resp.content[:200]}')
-        resp.raise_for_status()
-        logger.debug(f'loaded {url}')
-        return await resp.text()
+        url = urllib.parse.urljoin(config.OKX_URL, f'{HEADLINES_PATH}/page/{page_number}')
+        return await self._single_flight.do(url, lambda: self._fetch_headlines_page(url))
 
     async def get_main_page(self):
         return await self.get_page_by_number(1)
 
-    @alru_cache(maxsize=100)
-    @backoff(3, (ClientError, TimeoutError, ServerError))
     async def get_news_page_by_url(self, url: str) -> str:
-        _url = 'https://www.okx.com/'
-        url = urllib.parse.urljoin(_url, url)
+        url = urllib.parse.urljoin(config.OKX_URL, url)
+        return await self._single_flight.do(url, lambda: self._fetch_article(url))
+
+    async def __aenter__(self) -> 'OKXPageProvider':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
 
-        resp = await self._session.get(url=url)
-        if resp.status >= 500:
-            raise ServerError(f'External Server: {resp.content[:200]}')
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def collect_metrics(self) -> None:
+        """copy deduplication, cache and rate limiter state to the metrics gauges"""
+        metrics.set('okx_deduplicated_fetches', self._single_flight.deduplicated)
+        for name, value in asdict(self.transport_stats).items():
+            metrics.set(f'okx_http_{name}', value)
+        if self._http_cache:
+            for name, value in asdict(self._http_cache.stats).items():
+                metrics.set(f'okx_http_cache_{name}', value)
+        for name, value in self.rate_limiter.metrics().items():
+            metrics.set(f'okx_rate_limiter_{name}', value)
+
+    @backoff(
+        3, (ClientError, TimeoutError, ServerError),
+        timeout=RETRY_DELAY, factor=2, max_timeout=MAX_RETRY_DELAY, jitter=True,
+        on_retry=lambda e: metrics.inc('okx_retries_total', endpoint=HEADLINES_ENDPOINT),
+    )
+    async def _fetch_headlines_page(self, url: str) -> str:
+        return await self._get_text(url, HEADLINES_ENDPOINT, HEADLINES_END_MARKER)
+
+    @backoff(
+        3, (ClientError, TimeoutError, ServerError), factor=2, max_timeout=MAX_RETRY_DELAY, jitter=True,
+        on_retry=lambda e: metrics.inc('okx_retries_total', endpoint=ARTICLE_ENDPOINT),
+    )
+    async def _fetch_article(self, url: str) -> str:
+        return await self._get_text(url, ARTICLE_ENDPOINT, ARTICLE_END_MARKER)
+
+    async def _get_text(self, url: str, endpoint: str, end_marker: str | None = None) -> str:
+        cached = self._http_cache.get(url) if self._http_cache else None
+        if self._session is None:
+            self._session = open_session({'user-agent': config.USER_AGENT}, self.transport_stats, http2=self._http2)
+        # the slot is held until the body is read: the window limits concurrent downloads
+        # and the latency fed to the rate limiter covers the transfer, not only the headers
+        async with self.rate_limiter.slot():
+            started = time.monotonic()
+            if cached is None:
+                resp = await self._session.get(url=url)
+            else:
+                resp = await self._session.get(url=url, headers=cached.conditional_headers())
+            try:
+                metrics.inc('okx_requests_total', endpoint=endpoint, status=resp.status)
+                if resp.status == 429:
+                    metrics.observe('okx_request_seconds', time.monotonic() - started, endpoint=endpoint)
+                    retry_after = _parse_retry_after(resp.headers.get('Retry-After'))
+                    self.rate_limiter.on_overload(retry_after)
+                    raise TooManyRequests(f'Too many requests: {url}', retry_after=retry_after)
+                if resp.status >= 500:
+                    metrics.observe('okx_request_seconds', time.monotonic() - started, endpoint=endpoint)
+                    self.rate_limiter.on_overload()
+                    raise ServerError(f'External Server: {resp.status} {resp.reason}')
+                not_modified = resp.status == 304 and cached is not None
+                text = None
+                if not not_modified and resp.status < 400:
+                    if end_marker is None or not self._stream_cutoff:
+                        body = await resp.read()
+                        size = len(body)
+                        text = body.decode(resp.get_encoding())
+                    else:
+                        text, size = await self._read_until(resp, ElementEnd(end_marker), endpoint)
+            finally:
+                # a response not read to the end (errors, 304) gives its connection back to the pool here
+                resp.release()
+            latency = time.monotonic() - started
+            metrics.observe('okx_request_seconds', latency, endpoint=endpoint)
+            # a client error says nothing about the server capacity, so it does not raise the rate
+            if resp.status < 300 or resp.status == 304:
+                self.rate_limiter.on_success(latency)
+        if not_modified:
+            self._http_cache.mark_not_modified()
+            logger.debug(f'not modified {url}')
+            return cached.body
         resp.raise_for_status()
         logger.debug(f'loaded {url}')
-        return await resp.text()
+        metrics.inc('okx_downloaded_bytes_total', size, endpoint=endpoint)
+        if self._http_cache:
+            self._http_cache.put(
+                url, text, etag=resp.headers.get('ETag'), last_modified=resp.headers.get('Last-Modified')
+            )
+        return text
+
+    @staticmethod
+    async def _read_until(resp, end: ElementEnd, endpoint: str) -> tuple[str, int]:
+        """
+        the body is decoded as it arrives (decompressed by the session, br / gzip are negotiated by Accept-Encoding),
+        reading stops when the element is closed: the rest of the page is not downloaded, the connection is dropped
+        :return: text up to the end of the element and number of the body bytes read
+        """
+        decoder = codecs.getincrementaldecoder(resp.charset or 'utf-8')()
+        parts = []
+        read = 0
+        size = 0
+        async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+            size += len(chunk)
+            text = decoder.decode(chunk)
+            position = end.feed(text)
+            if position is not None:
+                parts.append(text[:position - read])
+                if not resp.content.at_eof():
+                    resp.close()
+                    metrics.inc('okx_stream_cutoffs_total', endpoint=endpoint)
+                return ''.join(parts), size
+            parts.append(text)
+            read += len(text)
+        # the element is not found, e.g. a page beyond the last one
+        parts.append(decoder.decode(b'', final=True))
+        return ''.join(parts), size
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Retry-After is either delay in seconds or HTTP date"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.)
+    except (TypeError, ValueError):
+        return None
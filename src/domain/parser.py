@@ -1,41 +1,109 @@
 import re
+from abc import ABC, abstractmethod
 from datetime import date, datetime
+from functools import lru_cache
 
 from bs4 import BeautifulSoup
 
 from src.dto import NewsHeadline
+from src.infrastructure.config import ENGINES
 
+# fixed english names: strptime %b depends on the locale and is slow
+_MONTHS = {
+    name.lower(): num
+    for num, names in enumerate(zip(
+        ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'),
+        ('January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October',
+         'November', 'December'),
+    ), start=1)
+    for name in names
+}
 
-class OKXParser:
+
+class AbstractOKXParser(ABC):
+    _date_regext = re.compile(r'(?<=ublished\son\s)\w+ \d+, \d+')
+
+    @abstractmethod
+    def get_pages_qty(self, page_content: str) -> int:
+        ...
+
+    @abstractmethod
+    def extract_headlines_from_page(self, page_content: str) -> list[NewsHeadline]:
+        ...
+
+    @abstractmethod
+    def extract_news_body_from_page(self, page_content: str) -> str:
+        ...
+
+    def _make_headline(self, title: str, body_url: str, details: str) -> NewsHeadline:
+        match = self._date_regext.search(details)
+        if match is None:
+            raise ValueError(f'No publication date in the details {details!r} of headline {title!r}')
+        return NewsHeadline(title=title, date=_parse_date(match.group(0)), body_url=body_url)
+
+    def _make_headlines(self, rows: list[tuple[str, str, str]]) -> list[NewsHeadline]:
+        """:param rows: title, body url and details text of every headline of a page"""
+        # the date is searched in the details of its own row, so a broken row never shifts the dates of the others
+        return [self._make_headline(*row) for row in rows]
+
+
+class OKXParser(AbstractOKXParser):
     _article_class = re.compile(r'\bindex_articleItem_')
     _article_title_class = re.compile(r'\bindex_articleTitle_')
     _article_date_class = re.compile(r'\bindex_detailsRow_')
-    _date_regext = re.compile(r'(?<=ublished\son\s).*$')
     _article_body_class = re.compile(r'\bindex_richTextContent_')
 
 
     def get_pages_qty(self, page_content: str) -> int:
-        soup = BeautifulSoup(page_content, 'html.parser')
+        soup = _soup(page_content)
         links = soup.find_all('a', class_='okui-pagination-item')
         return int(links[-1].text)
 
     def extract_headlines_from_page(self, page_content: str) -> list[NewsHeadline]:
-        result = []
-        soup = BeautifulSoup(page_content, 'html.parser')
+        soup = _soup(page_content)
         news_list = soup.find_all('li', class_=self._article_class)
-        for row in news_list:
-            title = row.find('div', class_=self._article_title_class).text
-            url = row.find('a').get('href')
-            news_date = row.find('div', class_=self._article_date_class).text
-            news_date = self._date_regext.search(news_date).group(0)
-            result.append(NewsHeadline(title=title, date=_parse_date(news_date), body_url=url))
-        return result
+        return self._make_headlines([
+            (
+                row.find('div', class_=self._article_title_class).text,
+                row.find('a').get('href'),
+                row.find('div', class_=self._article_date_class).text,
+            )
+            for row in news_list
+        ])
 
     def extract_news_body_from_page(self, page_content: str) -> str:
-        soup = BeautifulSoup(page_content, 'html.parser')
+        soup = _soup(page_content)
         news_body = soup.find('div', class_=self._article_body_class)
         return news_body.decode_contents()
 
 
+def _soup(page_content: str) -> BeautifulSoup:
+    return BeautifulSoup(page_content, 'html.parser')
+
+
+def get_parser(engine: str) -> AbstractOKXParser:
+    """optional engines are imported on demand, so their packages are required only when selected"""
+    if engine == 'bs4':
+        return OKXParser()
+    if engine == 'lxml':
+        from src.domain.lxml_parser import LxmlOKXParser
+        return LxmlOKXParser()
+    if engine == 'selectolax':
+        from src.domain.selectolax_parser import SelectolaxOKXParser
+        return SelectolaxOKXParser()
+    raise ValueError(f'Unknown parser engine {engine!r}, expected one of {ENGINES}')
+
+
+# a page repeats a few dates and a full-history crawl a few thousands
+@lru_cache(maxsize=4096)
 def _parse_date(date_str: str) -> date:
-    return datetime.strptime(date_str, "%b %d, %Y").date()
+    """'Apr 17, 2025' by the month lookup table"""
+    parts = date_str.split()
+    if len(parts) != 3:
+        raise ValueError(f'Malformed date {date_str!r}, expected month, day and year')
+    month, day, year = parts
+    try:
+        return date(int(year), _MONTHS[month.lower()], int(day.rstrip(',')))
+    except (KeyError, ValueError):
+        # raises the usual error for a malformed date
+        return datetime.strptime(date_str, "%b %d, %Y").date()
@@ -0,0 +1,50 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from src.domain.parser import AbstractOKXParser
+from src.dto import NewsHeadline
+from src.infrastructure.config import BACKENDS
+from src.infrastructure.metrics import metrics
+
+T = TypeVar('T')
+
+
+class ParsingBackend:
+    """
+    async facade of an OKX parser engine
+
+    inline runs parsing in the event loop,
+    thread / process send parse jobs to an executor, so network I/O is not blocked while a page is parsed;
+    only compact results (DTOs, strings) are sent back from worker processes
+    """
+
+    def __init__(self, parser: AbstractOKXParser, kind: str = 'inline', workers: int | None = None):
+        if kind not in BACKENDS:
+            raise ValueError(f'Unknown parsing backend {kind!r}, expected one of {BACKENDS}')
+        self._parser = parser
+        self._executor: Executor | None = None
+        if kind == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=workers)
+        elif kind == 'process':
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+
+    async def get_pages_qty(self, page_content: str) -> int:
+        return await self._run(self._parser.get_pages_qty, page_content)
+
+    async def extract_headlines_from_page(self, page_content: str) -> list[NewsHeadline]:
+        return await self._run(self._parser.extract_headlines_from_page, page_content)
+
+    async def extract_news_body_from_page(self, page_content: str) -> str:
+        return await self._run(self._parser.extract_news_body_from_page, page_content)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    async def _run(self, func: Callable[[str], T], page_content: str) -> T:
+        # measured here rather than in the parser, so time spent in worker processes is counted too
+        with metrics.timer('okx_parse_seconds', operation=func.__name__):
+            if self._executor is None:
+                return func(page_content)
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, page_content)
@@ -0,0 +1,213 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import AsyncIterable, Iterable, Iterator
+
+from src.dto import NewsRecord
+from src.infrastructure.logger import logger
+
+PARTITION_FORMATS = ('ndjson', 'parquet')
+COMPRESSIONS = ('none', 'gzip', 'zstd')
+MANIFEST = 'manifest.json'
+
+_NDJSON_SUFFIXES = {'none': '.ndjson', 'gzip': '.ndjson.gz', 'zstd': '.ndjson.zst'}
+
+
+class PartitionedSaver:
+    """
+    records partitioned by date into folder/YYYY/MM/DD.<format> with folder/manifest.json
+
+    partitions are append-only: new records of a day are merged with its stored ones (by title, the new body wins);
+    the manifest keeps records count, content hash and update time of every partition,
+    a partition is rewritten only if its content changes, so rerunning the same export touches nothing
+    and consumers of scheduled exports reread only the partitions updated since their last read
+
+    zstd compression requires `zstandard`, parquet format requires `pyarrow` (optional dependencies)
+    """
+
+    def __init__(self, fmt: str = 'ndjson', compression: str = 'none'):
+        if fmt not in PARTITION_FORMATS:
+            raise ValueError(f'Unknown partition format {fmt!r}, expected one of {PARTITION_FORMATS}')
+        if compression not in COMPRESSIONS:
+            raise ValueError(f'Unknown compression {compression!r}, expected one of {COMPRESSIONS}')
+        self.fmt = fmt
+        self.compression = compression
+        # optional packages are imported at once, a missing one fails before the scrape
+        if fmt == 'parquet':
+            import pyarrow.parquet  # noqa: F401
+        elif compression == 'zstd':
+            import zstandard  # noqa: F401
+
+    async def save_records_stream(self, records: AsyncIterable[NewsRecord], folder: str) -> list[date]:
+        """
+        records are staged on disk as they arrive, so memory is bounded by the biggest day, not by the period
+        :return: dates of the changed partitions
+        """
+        with _staging() as staging:
+            async for record in records:
+                _stage(staging, record)
+            return self._save_staged(staging, folder)
+
+    def save_records(self, records: Iterable[NewsRecord], folder: str) -> list[date]:
+        """save_records_stream for a synchronous iterable, e.g. records served from the storage without asyncio"""
+        with _staging() as staging:
+            for record in records:
+                _stage(staging, record)
+            return self._save_staged(staging, folder)
+
+    def _save_staged(self, staging: sqlite3.Connection, folder: str) -> list[date]:
+        output_folder = Path(folder)
+        output_folder.mkdir(parents=True, exist_ok=True)
+        manifest = _load_manifest(output_folder)
+        staging.commit()
+        days = [date.fromisoformat(row[0]) for row in staging.execute('SELECT DISTINCT date FROM staged ORDER BY date')]
+        changed = []
+        try:
+            for day in days:
+                rows = staging.execute(
+                    'SELECT title, body FROM staged WHERE date = ? ORDER BY title', (day.isoformat(),)
+                )
+                day_records = [NewsRecord(title=title, date=day, body=body) for title, body in rows]
+                if self._save_partition(output_folder, manifest, day, day_records):
+                    changed.append(day)
+        finally:
+            if changed:
+                _save_manifest(output_folder, manifest)
+        logger.info(f'{len(changed)} of {len(days)} partitions changed in {folder}')
+        return changed
+
+    def partition_path(self, day: date) -> Path:
+        suffix = '.parquet' if self.fmt == 'parquet' else _NDJSON_SUFFIXES[self.compression]
+        return Path(f'{day.year:04}', f'{day.month:02}', f'{day.day:02}{suffix}')
+
+    def _save_partition(self, folder: Path, manifest: dict, day: date, records: list[NewsRecord]) -> bool:
+        """:return: True if the partition is written"""
+        entry = manifest['partitions'].get(day.isoformat())
+        if entry is not None and entry['sha256'] == _content_hash(records):
+            return False
+        # a partition written before a crash may be missing in the manifest
+        path = folder / (entry['path'] if entry is not None else self.partition_path(day))
+        merged = {r.title: r for r in read_partition(path)} if path.exists() else {}
+        merged.update((r.title, r) for r in records)
+        records = sorted(merged.values(), key=lambda r: r.title)
+        content_hash = _content_hash(records)
+        if entry is not None and entry['sha256'] == content_hash:
+            return False
+
+        new_path = folder / self.partition_path(day)
+        new_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = new_path.with_name(f'.{new_path.name}.tmp')
+        if self.fmt == 'parquet':
+            _write_parquet(tmp_path, records, self.compression)
+        else:
+            tmp_path.write_bytes(_compress(_dump_ndjson(records), self.compression))
+        os.replace(tmp_path, new_path)
+        if path != new_path:
+            # format or compression changed since the partition was written
+            path.unlink(missing_ok=True)
+        manifest['partitions'][day.isoformat()] = {
+            'path': new_path.relative_to(folder).as_posix(),
+            'records': len(records),
+            'sha256': content_hash,
+            'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        }
+        return True
+
+
+@contextmanager
+def _staging() -> Iterator[sqlite3.Connection]:
+    with tempfile.TemporaryDirectory() as staging_folder:
+        staging = sqlite3.connect(Path(staging_folder) / 'staging.db')
+        try:
+            staging.execute('CREATE TABLE staged (date TEXT, title TEXT, body TEXT, PRIMARY KEY (date, title))')
+            yield staging
+        finally:
+            staging.close()
+
+
+def _stage(staging: sqlite3.Connection, record: NewsRecord) -> None:
+    staging.execute(
+        'INSERT OR REPLACE INTO staged VALUES (?, ?, ?)', (record.date.isoformat(), record.title, record.body)
+    )
+
+
+def read_partition(path: Path) -> list[NewsRecord]:
+    if path.suffix == '.parquet':
+        return _read_parquet(path)
+    data = _decompress(path.read_bytes(), _compression_of(path))
+    return [_load_record(json.loads(line)) for line in data.splitlines() if line]
+
+
+def _load_manifest(folder: Path) -> dict:
+    path = folder / MANIFEST
+    if not path.exists():
+        return {'partitions': {}}
+    return json.loads(path.read_text())
+
+
+def _save_manifest(folder: Path, manifest: dict) -> None:
+    manifest['partitions'] = dict(sorted(manifest['partitions'].items()))
+    manifest['updated_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    tmp_path = folder / f'.{MANIFEST}.tmp'
+    tmp_path.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_path, folder / MANIFEST)
+
+
+def _content_hash(records: list[NewsRecord]) -> str:
+    """hash of the records sorted by title, independent of format and compression"""
+    return hashlib.sha256(_dump_ndjson(sorted(records, key=lambda r: r.title))).hexdigest()
+
+
+def _dump_ndjson(records: list[NewsRecord]) -> bytes:
+    return ''.join(json.dumps(r.dump_dict()) + '\n' for r in records).encode()
+
+
+def _load_record(data: dict) -> NewsRecord:
+    return NewsRecord(title=data['title'], date=date.fromisoformat(data['date']), body=data['body'])
+
+
+def _compression_of(path: Path) -> str:
+    return {'.gz': 'gzip', '.zst': 'zstd'}.get(path.suffix, 'none')
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == 'gzip':
+        # mtime=0 keeps the file bytes stable for the same content
+        return gzip.compress(data, mtime=0)
+    if compression == 'zstd':
+        import zstandard
+        return zstandard.ZstdCompressor().compress(data)
+    return data
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    if compression == 'zstd':
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def _write_parquet(path: Path, records: list[NewsRecord], compression: str) -> None:
+    import pyarrow
+    import pyarrow.parquet
+
+    table = pyarrow.table({
+        'title': [r.title for r in records],
+        'date': [r.date for r in records],
+        'body': [r.body for r in records],
+    })
+    pyarrow.parquet.write_table(table, path, compression=compression)
+
+
+def _read_parquet(path: Path) -> list[NewsRecord]:
+    import pyarrow.parquet
+
+    return [NewsRecord(**row) for row in pyarrow.parquet.read_table(path).to_pylist()]
@@ -1,22 +1,99 @@
-from typing import Iterable
-from pathlib import Path
 import json
+import os
+import tempfile
+from contextlib import contextmanager, ExitStack
+from pathlib import Path
+from typing import Iterable, AsyncIterable, Iterator, TextIO
 
-from src.dto import NewsRecord
+from src.dto import NewsRecord, NewsRequest
 from src.infrastructure.logger import logger
 
+FORMATS = ('json', 'ndjson')
+
 
 class FileToFolderSaver:
-    def save_records_to_file(
+    async def save_records_stream(
         self,
-        records: Iterable[NewsRecord],
+        records: AsyncIterable[NewsRecord],
         folder: str,
         filename: str,
-    ) -> None:
-        output_folder = Path(folder.rstrip('/'))
-        output_folder.mkdir(parents=True, exist_ok=True)
-        path = f'{folder}/{filename}'
-        with open(path, 'w') as f:
-            payload = [r.dump_dict() for r in records]
-            json.dump(payload, f)
-        logger.info(f'results saved at {path}')
+        fmt: str = 'json',
+    ) -> int:
+        """
+        write every record as soon as it arrives, so memory does not depend on the period size;
+        the file is written to a temporary one and renamed at the end, readers never see a partial result
+        :return: number of saved records
+        """
+        with _records_file(folder, filename, fmt) as writer:
+            async for record in records:
+                writer.write(record)
+        return writer.qty
+
+    def save_records(self, records: Iterable[NewsRecord], folder: str, filename: str, fmt: str = 'json') -> int:
+        """save_records_stream for a synchronous iterable, e.g. records served from the storage without asyncio"""
+        with _records_file(folder, filename, fmt) as writer:
+            for record in records:
+                writer.write(record)
+        return writer.qty
+
+    async def save_records_by_periods(
+        self,
+        records: AsyncIterable[NewsRecord],
+        folder: str,
+        filenames: dict[NewsRequest, str],
+        fmt: str = 'json',
+    ) -> dict[NewsRequest, int]:
+        """
+        stream records of several periods to a file per period, a record of overlapping periods goes to each of them
+        :return: number of saved records per period
+        """
+        with ExitStack() as stack:
+            writers = {
+                period: stack.enter_context(_records_file(folder, filename, fmt))
+                for period, filename in filenames.items()
+            }
+            async for record in records:
+                for period, writer in writers.items():
+                    if period.start_date <= record.date <= period.end_date:
+                        writer.write(record)
+        return {period: writer.qty for period, writer in writers.items()}
+
+
+class _RecordsWriter:
+    def __init__(self, file: TextIO, fmt: str):
+        self._file = file
+        self._fmt = fmt
+        self.qty = 0
+
+    def write(self, record: NewsRecord) -> None:
+        if self._fmt == 'json':
+            self._file.write(', ' if self.qty else '')
+            json.dump(record.dump_dict(), self._file)
+        else:
+            self._file.write(json.dumps(record.dump_dict()) + '\n')
+        self.qty += 1
+
+
+@contextmanager
+def _records_file(folder: str, filename: str, fmt: str) -> Iterator[_RecordsWriter]:
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown format {fmt!r}, expected one of {FORMATS}')
+    output_folder = Path(folder.rstrip('/'))
+    output_folder.mkdir(parents=True, exist_ok=True)
+    path = output_folder / filename
+    fd, tmp_path = tempfile.mkstemp(dir=output_folder, prefix=f'.{filename}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            writer = _RecordsWriter(f, fmt)
+            if fmt == 'json':
+                f.write('[')
+            yield writer
+            if fmt == 'json':
+                f.write(']')
+        # mkstemp creates the file readable only by its owner
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    logger.info(f'{writer.qty} results saved at {path}')
@@ -0,0 +1,50 @@
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+
+from src.domain.html_serializer import start_tag, end_tag, escape_text
+from src.domain.parser import AbstractOKXParser
+from src.dto import NewsHeadline
+
+
+def _has_class_prefix(tag: str, prefix: str) -> str:
+    return f'{tag}[class^="{prefix}"], {tag}[class*=" {prefix}"]'
+
+
+class SelectolaxOKXParser(AbstractOKXParser):
+    """lexbor based engine: nodes are looked up by CSS selectors in a C-level DOM without python objects per node"""
+
+    _pagination_links = 'a.okui-pagination-item'
+    _article = _has_class_prefix('li', 'index_articleItem_')
+    _article_title = _has_class_prefix('div', 'index_articleTitle_')
+    _article_date = _has_class_prefix('div', 'index_detailsRow_')
+    _article_body = _has_class_prefix('div', 'index_richTextContent_')
+
+    def get_pages_qty(self, page_content: str) -> int:
+        links = LexborHTMLParser(page_content).css(self._pagination_links)
+        return int(links[-1].text(deep=True))
+
+    def extract_headlines_from_page(self, page_content: str) -> list[NewsHeadline]:
+        return self._make_headlines([
+            (
+                row.css_first(self._article_title).text(deep=True),
+                row.css_first('a').attributes.get('href'),
+                row.css_first(self._article_date).text(deep=True),
+            )
+            for row in LexborHTMLParser(page_content).css(self._article)
+        ])
+
+    def extract_news_body_from_page(self, page_content: str) -> str:
+        news_body = LexborHTMLParser(page_content).css_first(self._article_body)
+        return ''.join(_serialize_contents(news_body))
+
+
+def _serialize_contents(node: LexborNode):
+    for child in node.iter(include_text=True):
+        if child.is_text_node:
+            yield escape_text(child.text_content)
+        elif child.is_comment_node:
+            # comment_content is stripped, the raw node keeps the original text
+            yield child.html
+        elif child.is_element_node:
+            yield start_tag(child.tag, child.attributes.items())
+            yield from _serialize_contents(child)
+            yield end_tag(child.tag)
@@ -1,15 +1,16 @@
-from dataclasses import dataclass, asdict
+import hashlib
+from dataclasses import dataclass, field
 from datetime import date
 from typing import Iterable
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NewsRequest:
     start_date: date
     end_date: date
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NewsHeadline:
     title: str
     date: date
@@ -19,22 +20,26 @@ class NewsHeadline:
         return hash((self.date, self.title))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NewsRecord:
     title: str
     date: date
     body: str
+    # the article url, known for scraped records; it is not a part of the record identity
+    body_url: str | None = field(default=None, compare=False)
 
     def __hash__(self):
         return hash((self.date, self.title))
 
     def dump_dict(self):
-        resp = asdict(self)
-        resp['date'] = self.date.isoformat()
-        return resp
+        return {'title': self.title, 'date': self.date.isoformat(), 'body': self.body}
 
 
-@dataclass
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
 class PageHeadlines:
     page_num: int
     records: Iterable[NewsHeadline]
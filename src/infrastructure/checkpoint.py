@@ -0,0 +1,144 @@
+import json
+import os
+from datetime import date
+from pathlib import Path
+from typing import Iterator
+
+from src.dto import NewsRequest, NewsHeadline, NewsRecord
+from src.infrastructure.logger import logger
+
+
+class ScrapeCheckpoint:
+    """
+    append-only NDJSON journal of a scrape: located boundary pages, parsed headline pages and scraped records
+
+    every entry is flushed as soon as it is written, so after a failure the journal holds all completed work
+    and a resumed run continues from it; journaled headline pages are reused only while the newest headline
+    is the same, otherwise page numbers have shifted and only the journaled records are reused
+    """
+
+    def __init__(self, path: str, request: NewsRequest, resume: bool = False):
+        self.path = Path(path)
+        self._request = request
+        self._top_key: list[str] | None = None
+        self._pages: tuple[int, int] | None = None
+        self._headline_pages: dict[int, list[NewsHeadline]] = {}
+        # bodies stay in the journal file only
+        self._record_keys: set[tuple[date, str]] = set()
+        # journaled pages are used only after the newest headline is compared in this run
+        self._validated = False
+        if not (resume and self.path.exists() and self._load()):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'w')
+            self._write({'request': _period(request)})
+
+    @property
+    def records_qty(self) -> int:
+        return len(self._record_keys)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def remove(self) -> None:
+        """the scrape is complete, its journal is not needed anymore"""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def validate(self, first_page: list[NewsHeadline]) -> None:
+        """compare the newest headline with the journaled one, journaled pages are valid only if it is the same"""
+        top_key = [first_page[0].date.isoformat(), first_page[0].title] if first_page else None
+        if self._top_key != top_key:
+            if self._headline_pages:
+                logger.info('new news were published since the checkpoint, headline pages are loaded again')
+            self._set_top(top_key)
+            self._write({'top': top_key})
+        self._validated = True
+
+    @property
+    def pages(self) -> tuple[int, int] | None:
+        return self._pages if self._validated else None
+
+    def save_pages(self, pages: tuple[int, int]) -> None:
+        self._pages = pages
+        self._write({'pages': list(pages)})
+
+    def get_headline_page(self, page_num: int) -> list[NewsHeadline] | None:
+        return self._headline_pages.get(page_num) if self._validated else None
+
+    def save_headline_page(self, page_num: int, headlines: list[NewsHeadline]) -> None:
+        if not self._validated:
+            return
+        self._headline_pages[page_num] = headlines
+        self._write({
+            'page': page_num,
+            'headlines': [[h.title, h.date.isoformat(), h.body_url] for h in headlines],
+        })
+
+    def has_record(self, headline: NewsHeadline) -> bool:
+        return (headline.date, headline.title) in self._record_keys
+
+    def iter_records(self) -> Iterator[NewsRecord]:
+        """records journaled by the previous runs"""
+        with open(self.path, 'r') as f:
+            for line in f:
+                entry = json.loads(line)
+                if 'record' in entry:
+                    yield _load_record(entry['record'])
+
+    def save_record(self, record: NewsRecord) -> None:
+        self._record_keys.add((record.date, record.title))
+        self._write({'record': record.dump_dict()})
+
+    def _write(self, entry: dict) -> None:
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+
+    def _set_top(self, top_key: list[str] | None) -> None:
+        self._top_key = top_key
+        self._pages = None
+        self._headline_pages = {}
+
+    def _load(self) -> bool:
+        """:return: False if the journal belongs to another period"""
+        with open(self.path, 'r') as f:
+            lines = f.readlines()
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # the last line may be cut by the crash
+                break
+        if not entries or entries[0].get('request') != _period(self._request):
+            logger.warning(f'checkpoint {self.path} belongs to another period, the scrape starts over')
+            return False
+        for entry in entries[1:]:
+            if 'top' in entry:
+                self._set_top(entry['top'])
+            elif 'pages' in entry:
+                self._pages = tuple(entry['pages'])
+            elif 'page' in entry:
+                self._headline_pages[entry['page']] = [
+                    NewsHeadline(title=title, date=date.fromisoformat(d), body_url=url)
+                    for title, d, url in entry['headlines']
+                ]
+            elif 'record' in entry:
+                self._record_keys.add((date.fromisoformat(entry['record']['date']), entry['record']['title']))
+        # rewrite the valid entries only, so the journal does not keep a cut line
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            f.writelines(json.dumps(entry) + '\n' for entry in entries)
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, 'a')
+        logger.info(
+            f'resumed from {self.path}: {len(self._headline_pages)} headline pages, {len(self._record_keys)} records'
+        )
+        return True
+
+
+def _load_record(data: dict) -> NewsRecord:
+    return NewsRecord(title=data['title'], date=date.fromisoformat(data['date']), body=data['body'])
+
+
+def _period(request: NewsRequest) -> list[str]:
+    return [request.start_date.isoformat(), request.end_date.isoformat()]
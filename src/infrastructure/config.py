@@ -1,8 +1,48 @@
+# choices of the cli options, kept here so the cli does not import the parsing stack to validate them
+ENGINES = ('bs4', 'lxml', 'selectolax')
+BACKENDS = ('inline', 'thread', 'process')
+
+
 class Config:
-    OKX_URL: str = 'https://okx.com/'
+    OKX_URL: str = 'https://www.okx.com/'
     LIMIT_RPS: int = 20
+    RATE_LIMIT_RPS: float = 5.
+    RATE_LIMIT_MAX_RPS: float = 50.
+    CONCURRENCY_WINDOW: int = 4
     USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.198 Safari/537.36 OPR/72.0.3815.465 (Edition Yx GX)'
     FILENAME = 'results.json'
+    BODY_WORKERS: int = 20
+    PIPELINE_QUEUE_SIZE: int = 100
+    STORAGE_PATH: str | None = None
+    PAGE_INDEX_PATH: str | None = None
+    HTTP_CACHE_PATH: str | None = None
+    HTTP_CACHE_MAX_SIZE: int = 256 * 1024 * 1024
+    PARSER_ENGINE: str = 'bs4'
+    PARSER_BACKEND: str = 'inline'
+    PARSER_WORKERS: int | None = None
+    METRICS_PATH: str | None = None
+    PROMETHEUS_PATH: str | None = None
+    PAGE_CACHE_SIZE: int = 100
+    PAGE_CACHE_TTL: float | None = 300.
+    SHARD_PAGES: int = 20
+    SHARD_LEASE: float = 300.
+    SHARD_MAX_ATTEMPTS: int = 3
+    WORK_QUEUE_PATH: str | None = None
+    SERVER_HOST: str = '127.0.0.1'
+    SERVER_PORT: int = 8000
+    WATCH_MIN_INTERVAL: float = 5.
+    WATCH_MAX_INTERVAL: float = 60.
+    WATCH_SEEN_SIZE: int = 1000
+    WATCH_MAX_PAGES: int = 5
+    HTTP_TOTAL_TIMEOUT: float = 60.
+    HTTP_CONNECT_TIMEOUT: float = 10.
+    HTTP_READ_TIMEOUT: float = 30.
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_KEEPALIVE_TIMEOUT: float = 30.
+    HTTP2: bool = False
+    HTTP2_CONNECTIONS: int = 2
+    # a cut read drops its keep-alive connection, a new TLS handshake usually costs more than the rest of the page
+    HTTP_STREAM_CUTOFF: bool = False
 
 
 config = Config()
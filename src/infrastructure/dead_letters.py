@@ -0,0 +1,102 @@
+import json
+import os
+from dataclasses import dataclass, asdict
+from datetime import date
+from pathlib import Path
+from typing import Iterator
+
+from src.dto import NewsHeadline
+
+
+@dataclass(frozen=True, slots=True)
+class DeadLetter:
+    url: str
+    title: str
+    date: date
+    error: str
+    attempts: int
+
+    @property
+    def headline(self) -> NewsHeadline:
+        return NewsHeadline(title=self.title, date=self.date, body_url=self.url)
+
+
+class DeadLetterQueue:
+    """
+    NDJSON file of articles which failed after all retries, with the last error and the failed attempts count
+
+    failures are appended as they happen, the last line of an url wins;
+    `save` compacts the file and drops recovered articles
+    """
+
+    def __init__(self, path: str, resume: bool = True):
+        self.path = Path(path)
+        self._letters: dict[str, DeadLetter] = {}
+        # the file is created with the first failure
+        self._file = None
+        if resume and self.path.exists():
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._letters)
+
+    def __iter__(self) -> Iterator[DeadLetter]:
+        return iter(list(self._letters.values()))
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def add(self, headline: NewsHeadline, error: Exception) -> DeadLetter:
+        previous = self._letters.get(headline.body_url)
+        letter = self._letters[headline.body_url] = DeadLetter(
+            url=headline.body_url,
+            title=headline.title,
+            date=headline.date,
+            error=repr(error),
+            attempts=previous.attempts + 1 if previous else 1,
+        )
+        self._write({**asdict(letter), 'date': letter.date.isoformat()})
+        return letter
+
+    def discard(self, headline: NewsHeadline) -> None:
+        """the article is loaded successfully"""
+        if self._letters.pop(headline.body_url, None) is not None:
+            self._write({'url': headline.body_url, 'recovered': True})
+
+    def save(self) -> None:
+        """rewrite the file with the current dead letters only, the file is removed if there are none"""
+        self.close()
+        if not self._letters:
+            self.path.unlink(missing_ok=True)
+        else:
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                f.writelines(
+                    json.dumps({**asdict(letter), 'date': letter.date.isoformat()}) + '\n'
+                    for letter in self._letters.values()
+                )
+            os.replace(tmp_path, self.path)
+
+    def _write(self, entry: dict) -> None:
+        if self._file is None:
+            self._file = open(self.path, 'a')
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+
+    def _load(self) -> None:
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # the last line may be cut by a crash
+                    break
+                if entry.get('recovered'):
+                    self._letters.pop(entry['url'], None)
+                else:
+                    self._letters[entry['url']] = DeadLetter(**{**entry, 'date': date.fromisoformat(entry['date'])})
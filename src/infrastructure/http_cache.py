@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    body: str
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+@dataclass
+class HTTPCacheStats:
+    hits: int = 0
+    misses: int = 0
+    not_modified: int = 0
+
+
+class FileHTTPCache:
+    """
+    on-disk cache of response bodies with their validators (ETag / Last-Modified)
+
+    entries are revalidated by conditional requests, the least recently used ones
+    are evicted when the folder size exceeds max_size bytes
+    """
+
+    def __init__(self, folder: str, max_size: int):
+        self._folder = Path(folder)
+        self._folder.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        self._size = sum(p.stat().st_size for p in self._folder.glob('*.json'))
+        self.stats = HTTPCacheStats()
+
+    def get(self, url: str) -> CachedResponse | None:
+        path = self._path(url)
+        try:
+            with open(path, 'r') as f:
+                entry = CachedResponse(**json.load(f))
+        except (FileNotFoundError, ValueError, TypeError):
+            self.stats.misses += 1
+            return None
+        os.utime(path)
+        self.stats.hits += 1
+        return entry
+
+    def put(self, url: str, body: str, etag: str | None, last_modified: str | None) -> None:
+        if not etag and not last_modified:
+            # nothing to revalidate with
+            return
+        path = self._path(url)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(asdict(CachedResponse(url, body, etag, last_modified)), f)
+        if path.exists():
+            self._size -= path.stat().st_size
+        os.replace(tmp_path, path)
+        self._size += path.stat().st_size
+        if self._size > self._max_size:
+            self._evict()
+
+    def mark_not_modified(self) -> None:
+        self.stats.not_modified += 1
+
+    def _path(self, url: str) -> Path:
+        return self._folder / f'{hashlib.sha1(url.encode()).hexdigest()}.json'
+
+    def _evict(self) -> None:
+        entries = [(p.stat(), p) for p in self._folder.glob('*.json')]
+        self._size = sum(s.st_size for s, _ in entries)
+        for stat, path in sorted(entries, key=lambda e: e[0].st_mtime):
+            if self._size <= self._max_size:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= stat.st_size
+
+
+class MemoryHTTPCache:
+    """
+    in-process cache of the last responses with their validators, e.g. for polling of the same pages;
+    the least recently used entries are evicted above max_entries
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._max_entries = max_entries
+        self.stats = HTTPCacheStats()
+
+    def get(self, url: str) -> CachedResponse | None:
+        entry = self._entries.get(url)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(url)
+        self.stats.hits += 1
+        return entry
+
+    def put(self, url: str, body: str, etag: str | None, last_modified: str | None) -> None:
+        if not etag and not last_modified:
+            return
+        self._entries[url] = CachedResponse(url, body, etag, last_modified)
+        self._entries.move_to_end(url)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def mark_not_modified(self) -> None:
+        self.stats.not_modified += 1
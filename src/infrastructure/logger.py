@@ -1,20 +1,24 @@
 import logging
 
+# the handler is added by the entrypoints, importing a module (or running --help) does not configure the logging
+logger: logging.Logger = logging.getLogger()
+_handler: logging.Handler | None = None
+
 
 def setup_logger():
+    global _handler
+    if _handler is not None:
+        return logger
+
     formatter = logging.Formatter(
         fmt='%(levelname)s::%(asctime)s:%(name)s.%(funcName)s\n%(message)s\n',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
 
-    handler = logging.StreamHandler()
-    handler.setFormatter(formatter)
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(formatter)
 
-    logger = logging.getLogger()
     logger.setLevel(logging.INFO)
-    logger.addHandler(handler)
+    logger.addHandler(_handler)
 
     return logger
-
-
-logger: logging.Logger = setup_logger()
@@ -0,0 +1,124 @@
+import math
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+
+LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1., 2.5, 5., 10.)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class Histogram:
+    buckets: tuple[float, ...] = LATENCY_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    sum: float = 0.
+    max: float = 0.
+
+    def __post_init__(self):
+        # the last counter is the +Inf bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def dump_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.,
+            'max': round(self.max, 6),
+        }
+
+
+class Metrics:
+    """
+    in-process counters, gauges and histograms of a scrape
+
+    hooks in the page provider, parsing backend and service update them,
+    exported as a JSON run summary or in Prometheus text format
+    """
+
+    def __init__(self):
+        self._counters: dict[str, dict[Labels, float]] = defaultdict(lambda: defaultdict(float))
+        self._gauges: dict[str, dict[Labels, float]] = defaultdict(dict)
+        self._histograms: dict[str, dict[Labels, Histogram]] = defaultdict(dict)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        self._counters[name][_labels(labels)] += value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        self._gauges[name][_labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = _labels(labels)
+        histogram = self._histograms[name].get(key)
+        if histogram is None:
+            histogram = self._histograms[name][key] = Histogram()
+        histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def reset(self) -> None:
+        self._counters.clear()
+        self._gauges.clear()
+        self._histograms.clear()
+
+    def summary(self) -> dict:
+        return {
+            'counters': _dump(self._counters, lambda v: v),
+            'gauges': _dump(self._gauges, lambda v: v),
+            'histograms': _dump(self._histograms, Histogram.dump_dict),
+        }
+
+    def prometheus(self) -> str:
+        lines = []
+        for kind, values in (('counter', self._counters), ('gauge', self._gauges)):
+            for name, series in sorted(values.items()):
+                lines.append(f'# TYPE {name} {kind}')
+                lines.extend(f'{name}{_format_labels(labels)} {value}' for labels, value in series.items())
+        for name, series in sorted(self._histograms.items()):
+            lines.append(f'# TYPE {name} histogram')
+            for labels, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip((*histogram.buckets, math.inf), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == math.inf else repr(bound)
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", le),))} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {histogram.sum}')
+                lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    escaped = (v.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, v in labels)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + '}'
+
+
+def _dump(values: dict, dump_value) -> dict:
+    return {
+        name: {','.join(f'{k}={v}' for k, v in labels): dump_value(value) for labels, value in series.items()}
+        for name, series in sorted(values.items())
+    }
+
+
+metrics = Metrics()
@@ -0,0 +1,161 @@
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from src.dto import NewsHeadline, NewsRecord, content_hash
+
+
+class SQLiteNewsStorage:
+    """
+    durable local storage of parsed news keyed by (date, title)
+
+    coverage keeps date intervals for which every published headline is stored,
+    so the period inside them can be served without any request to okx.com;
+    every body is stored with its url and content hash: a headline is stored as is only if its date, title and url
+    match, and saving a record tells if its body is new or changed
+    """
+
+    def __init__(self, path: str):
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # several backfill workers may write to the same file
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.executescript(
+            '''
+            CREATE TABLE IF NOT EXISTS news (
+                date TEXT NOT NULL,
+                title TEXT NOT NULL,
+                body_url TEXT,
+                body TEXT,
+                body_hash TEXT,
+                PRIMARY KEY (date, title)
+            );
+            CREATE TABLE IF NOT EXISTS coverage (
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL
+            );
+            '''
+        )
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """hashes of the bodies stored before they were kept"""
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(news)')}
+        with self._conn:
+            if 'body_hash' not in columns:
+                self._conn.execute('ALTER TABLE news ADD COLUMN body_hash TEXT')
+                rows = self._conn.execute('SELECT date, title, body FROM news WHERE body IS NOT NULL').fetchall()
+                self._conn.executemany(
+                    'UPDATE news SET body_hash = ? WHERE date = ? AND title = ?',
+                    [(content_hash(body), d, title) for d, title, body in rows],
+                )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS news_body_url ON news (body_url)')
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def is_empty(self) -> bool:
+        return self._conn.execute('SELECT 1 FROM news LIMIT 1').fetchone() is None
+
+    def has_record(self, headline: NewsHeadline) -> bool:
+        """the headline is stored with the same date, title and url (records saved without url match any url)"""
+        row = self._conn.execute(
+            '''
+            SELECT 1 FROM news
+            WHERE date = ? AND title = ? AND body IS NOT NULL AND (body_url IS NULL OR body_url = ?)
+            ''',
+            (headline.date.isoformat(), headline.title, headline.body_url),
+        ).fetchone()
+        return row is not None
+
+    def save_record(self, record: NewsRecord, body_url: str | None = None) -> bool:
+        """
+        the record replaces the stored ones of its url with another date or title (an edited or republished article)
+        :return: True if the record is new or its body changed
+        """
+        body_url = body_url or record.body_url
+        key = (record.date.isoformat(), record.title)
+        body_hash = content_hash(record.body)
+        row = self._conn.execute('SELECT body_hash FROM news WHERE date = ? AND title = ?', key).fetchone()
+        with self._conn:
+            if body_url is not None:
+                self._conn.execute(
+                    'DELETE FROM news WHERE body_url = ? AND NOT (date = ? AND title = ?)', (body_url, *key)
+                )
+            self._upsert([(*key, body_url, record.body, body_hash)])
+        return row is None or row[0] != body_hash
+
+    def save_records(self, records: Iterable[NewsRecord]) -> None:
+        with self._conn:
+            self._upsert([(r.date.isoformat(), r.title, r.body_url, r.body, content_hash(r.body)) for r in records])
+
+    def _upsert(self, rows: list[tuple]) -> None:
+        self._conn.executemany(
+            '''
+            INSERT INTO news (date, title, body_url, body, body_hash) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (date, title) DO UPDATE SET
+                body = excluded.body,
+                body_hash = excluded.body_hash,
+                body_url = coalesce(excluded.body_url, news.body_url)
+            ''',
+            rows,
+        )
+
+    def get_records_by_period(self, start_date: date, end_date: date) -> list[NewsRecord]:
+        return list(self.iter_records_by_period(start_date, end_date))
+
+    def iter_records_by_period(self, start_date: date, end_date: date) -> Iterator[NewsRecord]:
+        rows = self._conn.execute(
+            '''
+            SELECT title, date, body FROM news
+            WHERE date BETWEEN ? AND ? AND body IS NOT NULL
+            ORDER BY date DESC, title
+            ''',
+            (start_date.isoformat(), end_date.isoformat()),
+        )
+        for title, d, body in rows:
+            yield NewsRecord(title=title, date=date.fromisoformat(d), body=body)
+
+    def get_covered_periods(self) -> list[tuple[date, date]]:
+        rows = self._conn.execute('SELECT start_date, end_date FROM coverage ORDER BY start_date')
+        return [(date.fromisoformat(s), date.fromisoformat(e)) for s, e in rows]
+
+    def mark_covered(self, start_date: date, end_date: date) -> None:
+        """merge [start_date, end_date] with overlapping or adjacent covered intervals"""
+        if start_date > end_date:
+            return
+        intervals = []
+        for s, e in self.get_covered_periods():
+            if e + timedelta(days=1) < start_date or end_date + timedelta(days=1) < s:
+                intervals.append((s, e))
+            else:
+                start_date, end_date = min(s, start_date), max(e, end_date)
+        intervals.append((start_date, end_date))
+        with self._conn:
+            self._conn.execute('DELETE FROM coverage')
+            self._conn.executemany(
+                'INSERT INTO coverage (start_date, end_date) VALUES (?, ?)',
+                [(s.isoformat(), e.isoformat()) for s, e in intervals],
+            )
+
+    def get_uncovered_periods(self, start_date: date, end_date: date) -> list[tuple[date, date]]:
+        if start_date > end_date:
+            return []
+        gaps = []
+        cursor = start_date
+        for s, e in self.get_covered_periods():
+            if e < cursor:
+                continue
+            if s > end_date:
+                break
+            if s > cursor:
+                gaps.append((cursor, s - timedelta(days=1)))
+            cursor = e + timedelta(days=1)
+            if cursor > end_date:
+                return gaps
+        gaps.append((cursor, end_date))
+        return gaps
+
+    def is_period_covered(self, start_date: date, end_date: date) -> bool:
+        return not self.get_uncovered_periods(start_date, end_date)
@@ -0,0 +1,140 @@
+import json
+import os
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+from src.dto import NewsHeadline
+
+
+@dataclass
+class PageDateRange:
+    first_pos: int
+    last_pos: int
+    min_date: date
+    max_date: date
+
+    def dump_dict(self) -> dict:
+        return {
+            'first_pos': self.first_pos,
+            'last_pos': self.last_pos,
+            'min_date': self.min_date.isoformat(),
+            'max_date': self.max_date.isoformat(),
+        }
+
+    @classmethod
+    def load_dict(cls, data: dict) -> 'PageDateRange':
+        return cls(
+            first_pos=data['first_pos'],
+            last_pos=data['last_pos'],
+            min_date=date.fromisoformat(data['min_date']),
+            max_date=date.fromisoformat(data['max_date']),
+        )
+
+
+class PageDateIndex:
+    """
+    persisted min/max headline dates of the seen headline pages
+
+    positions are counted from the newest headline at the moment the page was indexed,
+    new announcements push older headlines to the next pages, so instead of rebuilding
+    the index only `shift` (number of headlines published since) is updated:
+    current position = stored position + shift
+    """
+
+    def __init__(self, path: str | None = None):
+        self._path = Path(path) if path else None
+        self.pages_qty = 0
+        self.page_size = 0
+        self.shift = 0
+        self._top_key: tuple[str, str] | None = None
+        self._top_pos = 0
+        self._ranges: list[PageDateRange] = []
+        if self._path and self._path.exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def align(self, first_page: list[NewsHeadline], pages_qty: int) -> None:
+        """update the shift by the position of the previously newest headline on the first page"""
+        if not first_page:
+            return
+        if self._top_key is not None:
+            keys = [(h.date.isoformat(), h.title) for h in first_page]
+            if self._top_key in keys:
+                self.shift = keys.index(self._top_key) - self._top_pos
+            else:
+                # more than a page was published, verification fetches fix the estimate
+                published_qty = max(len(first_page), (pages_qty - self.pages_qty) * self.page_size)
+                self.shift += published_qty
+        self.page_size = max(self.page_size, len(first_page))
+        self.pages_qty = pages_qty
+        self._top_key = (first_page[0].date.isoformat(), first_page[0].title)
+        self._top_pos = -self.shift
+
+    def add_page(self, page_num: int, headlines: list[NewsHeadline]) -> None:
+        if not headlines or not self.page_size:
+            return
+        first_pos = (page_num - 1) * self.page_size - self.shift
+        page_range = PageDateRange(
+            first_pos=first_pos,
+            last_pos=first_pos + len(headlines) - 1,
+            min_date=min(h.date for h in headlines),
+            max_date=max(h.date for h in headlines),
+        )
+        self._ranges = [
+            r for r in self._ranges
+            if r.last_pos < page_range.first_pos or r.first_pos > page_range.last_pos
+        ]
+        self._ranges.append(page_range)
+        self._ranges.sort(key=lambda r: r.first_pos)
+
+    def estimate_page(self, searching_date: date) -> int | None:
+        """
+        :return: estimated page of the newest headline published on searching_date or earlier,
+            None if the index is empty
+        """
+        if not self._ranges or not self.page_size:
+            return None
+        page_range = next((r for r in self._ranges if r.min_date <= searching_date), None)
+        if page_range is None:
+            position = self._ranges[-1].last_pos + 1
+        elif page_range.max_date <= searching_date:
+            position = page_range.first_pos
+        else:
+            # dates are assumed to be spread evenly over the page
+            span = (page_range.max_date - page_range.min_date).days
+            offset = (page_range.max_date - searching_date).days / span * (page_range.last_pos - page_range.first_pos)
+            position = page_range.first_pos + max(1, round(offset))
+        page = (position + self.shift) // self.page_size + 1
+        return min(max(page, 1), self.pages_qty)
+
+    def save(self) -> None:
+        if self._path is None:
+            return
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(
+                {
+                    'pages_qty': self.pages_qty,
+                    'page_size': self.page_size,
+                    'shift': self.shift,
+                    'top_key': self._top_key,
+                    'top_pos': self._top_pos,
+                    'ranges': [r.dump_dict() for r in self._ranges],
+                },
+                f,
+            )
+        os.replace(tmp_path, self._path)
+
+    def _load(self) -> None:
+        with open(self._path, 'r') as f:
+            data = json.load(f)
+        self.pages_qty = data['pages_qty']
+        self.page_size = data['page_size']
+        self.shift = data['shift']
+        self._top_key = tuple(data['top_key']) if data['top_key'] else None
+        self._top_pos = data['top_pos']
+        self._ranges = [PageDateRange.load_dict(r) for r in data['ranges']]
@@ -0,0 +1,160 @@
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Iterator
+
+from src.dto import NewsRequest
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+@dataclass(frozen=True, slots=True)
+class PageShard:
+    shard_id: int
+    # the backfill period the shard belongs to
+    backfill: NewsRequest
+    # dates of the shard within the backfill period, its pages are located when it is claimed
+    period: NewsRequest
+
+
+class SQLiteWorkQueue:
+    """
+    date shards of backfills shared by worker processes or nodes through one SQLite file
+
+    a claimed shard is leased by its worker for `lease` seconds and the lease is renewed while
+    the shard is scraped, so shards of a crashed worker are claimed again after their lease expires;
+    a shard failing max_attempts times or whose lease expires after the last attempt is left failed
+    """
+
+    def __init__(self, path: str, lease: float = 300., max_attempts: int = 3):
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lease = lease
+        self._max_attempts = max_attempts
+        # transactions are explicit: claims must be atomic between processes
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.executescript(
+            '''
+            CREATE TABLE IF NOT EXISTS shards (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                status TEXT NOT NULL,
+                worker TEXT,
+                leased_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                shard_start_date TEXT NOT NULL,
+                shard_end_date TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS shards_period ON shards (start_date, end_date);
+            '''
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def is_planned(self, request: NewsRequest) -> bool:
+        row = self._conn.execute(
+            'SELECT 1 FROM shards WHERE start_date = ? AND end_date = ? LIMIT 1', _period(request)
+        ).fetchone()
+        return row is not None
+
+    def enqueue(self, request: NewsRequest, periods: list[NewsRequest]) -> None:
+        """:param periods: dates of every shard"""
+        with self._transaction():
+            self._conn.executemany(
+                '''
+                INSERT INTO shards (start_date, end_date, status, shard_start_date, shard_end_date)
+                VALUES (?, ?, ?, ?, ?)
+                ''',
+                [(*_period(request), PENDING, *_period(period)) for period in periods],
+            )
+
+    def claim(self, worker: str) -> PageShard | None:
+        now = time.time()
+        with self._transaction():
+            self._fail_expired(now)
+            row = self._conn.execute(
+                '''
+                SELECT id, start_date, end_date, shard_start_date, shard_end_date FROM shards
+                WHERE status = ? OR (status = ? AND leased_until < ?)
+                ORDER BY id LIMIT 1
+                ''',
+                (PENDING, RUNNING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                'UPDATE shards SET status = ?, worker = ?, leased_until = ?, attempts = attempts + 1 WHERE id = ?',
+                (RUNNING, worker, now + self._lease, row[0]),
+            )
+        shard_id, start_date, end_date, shard_start_date, shard_end_date = row
+        return PageShard(
+            shard_id=shard_id,
+            backfill=_request(start_date, end_date),
+            period=_request(shard_start_date, shard_end_date),
+        )
+
+    def renew(self, shard: PageShard, worker: str) -> bool:
+        """:return: False if the lease was lost (expired and claimed by another worker)"""
+        cursor = self._conn.execute(
+            'UPDATE shards SET leased_until = ? WHERE id = ? AND worker = ? AND status = ?',
+            (time.time() + self._lease, shard.shard_id, worker, RUNNING),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, shard: PageShard, worker: str) -> None:
+        self._conn.execute(
+            'UPDATE shards SET status = ?, error = NULL WHERE id = ? AND worker = ?',
+            (DONE, shard.shard_id, worker),
+        )
+
+    def fail(self, shard: PageShard, worker: str, error: str) -> None:
+        self._conn.execute(
+            '''
+            UPDATE shards SET status = CASE WHEN attempts < ? THEN ? ELSE ? END, error = ?
+            WHERE id = ? AND worker = ?
+            ''',
+            (self._max_attempts, PENDING, FAILED, error, shard.shard_id, worker),
+        )
+
+    def progress(self, request: NewsRequest) -> dict[str, int]:
+        self._fail_expired(time.time())
+        rows = self._conn.execute(
+            'SELECT status, count(*) FROM shards WHERE start_date = ? AND end_date = ? GROUP BY status',
+            _period(request),
+        )
+        return dict(rows.fetchall())
+
+    def _fail_expired(self, now: float) -> None:
+        """a worker killed during the last attempt never fails its shard itself"""
+        self._conn.execute(
+            'UPDATE shards SET status = ?, error = ? WHERE status = ? AND leased_until < ? AND attempts >= ?',
+            (FAILED, 'lease expired', RUNNING, now, self._max_attempts),
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # BEGIN IMMEDIATE takes the write lock at once, so two workers never claim the same shard
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+
+
+def _period(request: NewsRequest) -> tuple[str, str]:
+    return request.start_date.isoformat(), request.end_date.isoformat()
+
+
+def _request(start_date: str, end_date: str) -> NewsRequest:
+    return NewsRequest(start_date=date.fromisoformat(start_date), end_date=date.fromisoformat(end_date))
@@ -1,128 +1,574 @@
 import asyncio
-from collections import defaultdict
+import math
 from datetime import datetime, timedelta, date
-from typing import Iterable
+from typing import Iterable, AsyncIterator, Callable
+
+from async_lru import alru_cache
 
 from src.domain.page_provider import OKXPageProvider
 from src.domain.parser import OKXParser
+from src.domain.parsing_backend import ParsingBackend
 from src.dto import NewsRequest, NewsHeadline, PageHeadlines, NewsRecord
+from src.infrastructure.checkpoint import ScrapeCheckpoint
+from src.infrastructure.config import config
+from src.infrastructure.dead_letters import DeadLetterQueue
 from src.infrastructure.logger import logger
+from src.infrastructure.metrics import metrics
+from src.infrastructure.news_storage import SQLiteNewsStorage
+from src.infrastructure.page_index import PageDateIndex
 
 
 class OKXScrapingService:
 
-    def __init__(self):
-        self.parser = OKXParser()
-        self.page_provider = OKXPageProvider()
-        self._headline_storage: dict[date, set[NewsHeadline]] = defaultdict(set)
-        self._record_storage: list[NewsRecord] = []
+    def __init__(
+        self,
+        storage: SQLiteNewsStorage | None = None,
+        page_provider: OKXPageProvider | None = None,
+        parser: ParsingBackend | None = None,
+        page_index: PageDateIndex | None = None,
+        checkpoint: ScrapeCheckpoint | None = None,
+        dead_letters: DeadLetterQueue | None = None,
+    ):
+        self.parser = parser or ParsingBackend(OKXParser())
+        self.page_provider = page_provider or OKXPageProvider()
+        self.storage = storage
+        self.page_index = page_index
+        self.checkpoint = checkpoint
+        # failed articles are put to the dead letters and the rest of the scrape goes on
+        self.dead_letters = dead_letters
+        self._failed_qty = 0
+        # newest headline when the cached headline pages were loaded
+        self._top_key: tuple[date, str] | None = None
+        # parsed pages are cached per service, so a page shared by boundary searches and the period scrape is parsed
+        # once and a cleared cache does not drop the pages of the other services
+        self._scrape_headline_page_by_num = alru_cache(maxsize=config.PAGE_CACHE_SIZE, ttl=config.PAGE_CACHE_TTL)(
+            self._scrape_headline_page_by_num
+        )
+
+    async def close(self) -> None:
+        """collect the final metrics and release connections, parser workers and the storage"""
+        self.collect_metrics()
+        self.parser.close()
+        await self.page_provider.close()
+        if self.storage is not None:
+            self.storage.close()
+
+    def collect_metrics(self) -> None:
+        """copy provider and parsed pages cache state to the metrics gauges"""
+        self.page_provider.collect_metrics()
+        info = self._scrape_headline_page_by_num.cache_info()
+        metrics.set('okx_page_cache_hits', info.hits, endpoint='headlines_page')
+        metrics.set('okx_page_cache_misses', info.misses, endpoint='headlines_page')
+        lookups = info.hits + info.misses
+        metrics.set('okx_page_cache_hit_ratio', info.hits / lookups if lookups else 0., endpoint='headlines_page')
 
     async def get_news_by_period(self, request: NewsRequest) -> Iterable[NewsRecord]:
-        main_page_content = await self.page_provider.get_main_page()
-        qty = self.parser.get_pages_qty(main_page_content)
-        if request.end_date == datetime.now().date:
-            newest_page = 1
-            oldest_page = await self._bsearch_date_page(start=1, end=qty, searching_date=request.start_date)
-        else:
-            oldest_page, newest_page = await asyncio.gather(
-                self._bsearch_date_page(start=1, end=qty, searching_date=request.start_date),
-                self._bsearch_date_page(start=1, end=qty, searching_date=request.end_date),
+        return [record async for record in self.iter_news_by_period(request)]
+
+    async def iter_news_by_period(self, request: NewsRequest) -> AsyncIterator[NewsRecord]:
+        if self.storage is None and self.checkpoint is not None:
+            async for record in self._scrape_news_with_checkpoint(request):
+                yield record
+            return
+        if self.storage is None:
+            async for record in self._scrape_news_by_period(request):
+                yield record
+            return
+
+        # the current day is never complete, so it is not marked as covered,
+        # but after a successful sync it is served from the storage during this run
+        last_complete_date = datetime.now().date() - timedelta(days=1)
+        end_date = request.end_date
+        if not self.storage.is_period_covered(request.start_date, end_date) and await self.sync_storage():
+            end_date = min(end_date, last_complete_date)
+        for gap_start, gap_end in self.storage.get_uncovered_periods(request.start_date, end_date):
+            logger.info(f'period {gap_start} - {gap_end} is missing in the storage')
+            failed_qty = self._failed_qty
+            # records stored by an interrupted run are not loaded again
+            async for record in self._scrape_news_by_period(
+                NewsRequest(start_date=gap_start, end_date=gap_end), skip=self.storage.has_record
+            ):
+                self.storage.save_record(record)
+            if self._failed_qty == failed_qty:
+                self.storage.mark_covered(gap_start, min(gap_end, last_complete_date))
+        for record in self.storage.iter_records_by_period(request.start_date, request.end_date):
+            yield record
+
+    async def iter_news_by_periods(self, requests: Iterable[NewsRequest]) -> AsyncIterator[NewsRecord]:
+        """
+        news of several periods in one scrape session, every record is yielded once:
+        overlapping and adjacent periods are merged, boundary pages of the merged periods are located concurrently
+        and their page ranges are merged, so a headline page or an article shared by periods is loaded once
+        """
+        periods = _merge_periods(requests)
+        if self.storage is not None:
+            for period in periods:
+                async for record in self.iter_news_by_period(period):
+                    yield record
+            return
+
+        page_ranges = _merge_page_ranges(await asyncio.gather(*[self.locate_pages(period) for period in periods]))
+        loaded = set()
+
+        def skip(headline: NewsHeadline) -> bool:
+            # news between the periods and the ones loaded from a previous page range (shifted by new news)
+            return (headline.date, headline.title) in loaded or not any(
+                period.start_date <= headline.date <= period.end_date for period in periods
             )
-        oldest_page, newest_page = await asyncio.gather(
-            self._ensure_oldest_date_page(oldest_page, pages_qty=qty, start_date=request.start_date),
-            self._ensure_newest_date_page(newest_page, end_date=request.end_date),
-        )
-        await asyncio.gather(
-            *[self._scrape_headline_page_by_num(i) for i in range(newest_page, oldest_page + 1)]
-        )
-        await asyncio.gather(
-            *[self._scrape_news_record(r)
-              for r in self._get_filtered_headlines_by_period(request.start_date, request.end_date)]
+
+        envelope = NewsRequest(start_date=periods[0].start_date, end_date=periods[-1].end_date)
+        for pages in page_ranges:
+            async for record in self._scrape_news_by_period(envelope, pages=pages, skip=skip):
+                loaded.add((record.date, record.title))
+                yield record
+
+    async def sync_storage(self) -> bool:
+        """
+        walk headline pages from the newest one and store news until the first already stored one
+        :return: True if the storage contains every news published so far
+        """
+        if self.storage is None or self.storage.is_empty():
+            return False
+        main_page_content = await self.page_provider.get_main_page()
+        self._validate_page_cache(await self.parser.extract_headlines_from_page(main_page_content))
+        qty = await self.parser.get_pages_qty(main_page_content)
+        stored_qty = 0
+        for page_num in range(1, qty + 1):
+            page_headlines = await self._scrape_headline_page_by_num(page_num)
+            new_headlines = [h for h in page_headlines.records if not self.storage.has_record(h)]
+            stored = await asyncio.gather(*[self._sync_news_record(h) for h in new_headlines])
+            stored_qty += sum(stored)
+            if not all(stored):
+                # the period with failed articles is not covered, its gap is scraped again
+                logger.warning(f'storage sync is incomplete, {stored.count(False)} articles failed')
+                return False
+            if len(new_headlines) < len(page_headlines.records):
+                # everything newer than the first known headline is stored now; older news of its day may be
+                # missing (the headline was stored by a failed sync, a refresh or a retry) unless the day is covered
+                known_date = next(h.date for h in page_headlines.records if h not in new_headlines)
+                if not self.storage.is_period_covered(known_date, known_date):
+                    known_date += timedelta(days=1)
+                self.storage.mark_covered(known_date, datetime.now().date() - timedelta(days=1))
+                logger.info(f'storage synced, {stored_qty} new records')
+                return True
+        return False
+
+    async def _sync_news_record(self, news_headline: NewsHeadline) -> bool:
+        record = await self._load_news_record(news_headline)
+        if record is not None:
+            self.storage.save_record(record, body_url=news_headline.body_url)
+        return record is not None
+
+    async def refresh_storage(self, request: NewsRequest) -> AsyncIterator[NewsRecord]:
+        """
+        walk the headline pages of the period again, even a covered one, and load only the articles whose headline
+        (date, title or url) is not stored as is: new, edited and republished ones
+        :return: new and changed records only, so the downstream work scales with the changes, not with the period
+        """
+        async for record in self._scrape_news_by_period(request, skip=self.storage.has_record):
+            changed = self.storage.save_record(record)
+            metrics.inc('okx_refreshed_records_total', result='changed' if changed else 'unchanged')
+            if changed:
+                yield record
+
+    async def retry_dead_letters(self) -> AsyncIterator[NewsRecord]:
+        """
+        load the dead letter articles only, recovered ones are dropped from the dead letters,
+        failed ones get their attempts count increased
+        """
+        semaphore = asyncio.Semaphore(config.BODY_WORKERS)
+
+        async def load(headline: NewsHeadline) -> tuple[NewsHeadline, NewsRecord | None]:
+            async with semaphore:
+                return headline, await self._load_news_record(headline)
+
+        try:
+            for loading in asyncio.as_completed([load(letter.headline) for letter in self.dead_letters]):
+                headline, record = await loading
+                if record is not None:
+                    if self.storage is not None:
+                        self.storage.save_record(record, body_url=headline.body_url)
+                    yield record
+        finally:
+            self.dead_letters.save()
+
+    async def iter_news_by_pages(
+        self,
+        request: NewsRequest,
+        first_page: int,
+        last_page: int,
+        skip: Callable[[NewsHeadline], bool] | None = None,
+    ) -> AsyncIterator[NewsRecord]:
+        """
+        scrape news of the period from the given headline pages only (e.g. a shard of a backfill)
+        :param skip: headlines for which it returns True are not loaded (e.g. already stored ones)
+        """
+        async for record in self._scrape_news_by_period(request, pages=(first_page, last_page), skip=skip):
+            yield record
+
+    async def locate_pages(self, request: NewsRequest) -> tuple[int, int]:
+        """:return: newest and oldest headline pages of the period"""
+        main_page_content = await self.page_provider.get_main_page()
+        first_page = await self.parser.extract_headlines_from_page(main_page_content)
+        self._validate_page_cache(first_page)
+        if self.checkpoint is not None:
+            self.checkpoint.validate(first_page)
+            if self.checkpoint.pages is not None:
+                return self.checkpoint.pages
+        qty = await self.parser.get_pages_qty(main_page_content)
+        pages = None
+        with metrics.timer('okx_stage_seconds', stage='locate_pages'):
+            if self.page_index is not None:
+                pages = await self._locate_pages_by_index(request, qty, first_page)
+            if pages is None:
+                pages = await self._search_pages(request, qty, first_page)
+        if self.checkpoint is not None:
+            self.checkpoint.save_pages(pages)
+        return pages
+
+    async def get_headline_page(self, num: int) -> PageHeadlines:
+        return await self._scrape_headline_page_by_num(num)
+
+    async def _scrape_news_with_checkpoint(self, request: NewsRequest) -> AsyncIterator[NewsRecord]:
+        """records journaled by an interrupted run are yielded first, only the missing ones are scraped"""
+        for record in self.checkpoint.iter_records():
+            yield record
+        async for record in self._scrape_news_by_period(request, skip=self.checkpoint.has_record):
+            self.checkpoint.save_record(record)
+            yield record
+
+    async def _scrape_news_by_period(
+        self,
+        request: NewsRequest,
+        pages: tuple[int, int] | None = None,
+        skip: Callable[[NewsHeadline], bool] | None = None,
+    ) -> AsyncIterator[NewsRecord]:
+        """
+        headline pages and article bodies are scraped as a pipeline:
+        headlines are put to a bounded queue as soon as their page is parsed,
+        body workers take them from the queue, so bodies are loaded while next pages are still in flight
+        """
+        records: asyncio.Queue[NewsRecord] = asyncio.Queue(maxsize=config.PIPELINE_QUEUE_SIZE)
+        pipeline = asyncio.create_task(self._run_pipeline(request, records, pages, skip))
+        next_record = None
+        try:
+            while True:
+                next_record = asyncio.ensure_future(records.get())
+                await asyncio.wait((next_record, pipeline), return_when=asyncio.FIRST_COMPLETED)
+                if next_record.done():
+                    yield next_record.result()
+                    continue
+                next_record.cancel()
+                break
+            while not records.empty():
+                yield records.get_nowait()
+            # raise the pipeline error if any
+            pipeline.result()
+        finally:
+            # the consumer stopped early: the pending queue read would never complete
+            if next_record is not None:
+                next_record.cancel()
+            pipeline.cancel()
+
+    async def _run_pipeline(
+        self,
+        request: NewsRequest,
+        records: asyncio.Queue[NewsRecord],
+        pages: tuple[int, int] | None,
+        skip: Callable[[NewsHeadline], bool] | None,
+    ) -> None:
+        headlines: asyncio.Queue[NewsHeadline | None] = asyncio.Queue(maxsize=config.PIPELINE_QUEUE_SIZE)
+        with metrics.timer('okx_stage_seconds', stage='scrape'):
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._produce_headlines(
+                    request, headlines, workers_qty=config.BODY_WORKERS, pages=pages, skip=skip
+                ))
+                for _ in range(config.BODY_WORKERS):
+                    tg.create_task(self._body_worker(request, headlines, records))
+
+    async def _produce_headlines(
+        self,
+        request: NewsRequest,
+        headlines: asyncio.Queue[NewsHeadline | None],
+        workers_qty: int,
+        pages: tuple[int, int] | None = None,
+        skip: Callable[[NewsHeadline], bool] | None = None,
+    ) -> None:
+        async for headline in self._iter_headlines_by_period(request, pages):
+            if skip is None or not skip(headline):
+                await headlines.put(headline)
+        for _ in range(workers_qty):
+            await headlines.put(None)
+
+    async def _body_worker(
+        self,
+        request: NewsRequest,
+        headlines: asyncio.Queue[NewsHeadline | None],
+        records: asyncio.Queue[NewsRecord],
+    ) -> None:
+        while (headline := await headlines.get()) is not None:
+            # boundary pages contain news out of the requested period
+            if request.start_date <= headline.date <= request.end_date:
+                if (record := await self._load_news_record(headline)) is not None:
+                    await records.put(record)
+
+    async def _load_news_record(self, news_headline: NewsHeadline) -> NewsRecord | None:
+        """:return: None if the article failed and is put to the dead letters"""
+        try:
+            record = await self._scrape_news_record(news_headline)
+        except Exception as e:
+            if self.dead_letters is None:
+                raise
+            letter = self.dead_letters.add(news_headline, e)
+            self._failed_qty += 1
+            metrics.inc('okx_dead_letters_total')
+            logger.warning(f'{letter.url} failed {letter.attempts} times, put to the dead letters: {letter.error}')
+            return None
+        if self.dead_letters is not None:
+            self.dead_letters.discard(news_headline)
+        return record
+
+    async def _iter_headlines_by_period(
+        self,
+        request: NewsRequest,
+        pages: tuple[int, int] | None = None,
+    ) -> AsyncIterator[NewsHeadline]:
+        if pages is None:
+            pages = await self.locate_pages(request)
+        newest_page, oldest_page = pages
+        seen = set()
+        pages = [
+            asyncio.create_task(self._scrape_headline_page_by_num(i)) for i in range(newest_page, oldest_page + 1)
+        ]
+        try:
+            for page in asyncio.as_completed(pages):
+                for headline in (await page).records:
+                    # a headline shifted to the next page while loading appears twice
+                    if (headline.date, headline.title) not in seen:
+                        seen.add((headline.date, headline.title))
+                        metrics.inc('okx_headlines_total')
+                        yield headline
+        finally:
+            # a stopped or failed iteration does not leave the rest of the page fetches running
+            for page in pages:
+                page.cancel()
+            await asyncio.gather(*pages, return_exceptions=True)
+        if self.page_index is not None:
+            self.page_index.save()
+
+    async def _search_pages(self, request: NewsRequest, qty: int, first_page: list[NewsHeadline]) -> tuple[int, int]:
+        """
+        :return: newest and oldest pages of the period, at most max_boundary_fetches(qty) pages are fetched per boundary
+        """
+        first_page = PageHeadlines(1, first_page)
+        # first page with all news older than start_date
+        searches = [self._interpolate_first_page(qty, first_page, request.start_date - timedelta(days=1), _newest_date)]
+        if request.end_date < datetime.now().date():
+            # first page with any news not newer than end_date, nothing is newer than today
+            searches.append(self._interpolate_first_page(qty, first_page, request.end_date, _oldest_date))
+        older_page, *newest_page = await asyncio.gather(*searches)
+        newest_page = newest_page[0] if newest_page else 1
+        logger.debug(f'pages {newest_page}-{older_page - 1} located by search')
+        return newest_page, older_page - 1
+
+    async def _interpolate_first_page(
+        self,
+        qty: int,
+        first_page: PageHeadlines,
+        target: date,
+        key: Callable[[PageHeadlines], date | None],
+    ) -> int:
+        """
+        :param key: date of a page, not increasing over pages, None for an empty page
+        :return: first page in 1..qty whose key is not newer than target or qty + 1 if there is no such page
+
+        the bracket of the answer is probed at the page interpolated by the dates of its ends;
+        while its older end is not probed yet, the dates per page of the pages seen so far extrapolate it;
+        a probe that does not halve the bracket is followed by a bisection, so every two fetches at least halve it
+        and max_boundary_fetches(qty) is never exceeded whatever the dates are
+        """
+        def found(page_key: date | None) -> bool:
+            return page_key is None or page_key <= target
+
+        if found(key(first_page)):
+            return 1
+        lo, lo_page = 1, first_page
+        # qty + 1 is a virtual page older than any news
+        hi, hi_key = qty + 1, None
+        bisect = False
+        fetches = 0
+        while hi - lo > 1 and fetches < max_boundary_fetches(qty):
+            fetches += 1
+            size = hi - lo
+            probe = None if bisect else _interpolate(lo, key(lo_page), hi, hi_key, target, first_page, lo_page)
+            if probe is None:
+                bisect, probe = True, (lo + hi) // 2
+            page = await self._scrape_headline_page_by_num(probe)
+            if found(page_key := key(page)):
+                hi, hi_key = probe, page_key
+            else:
+                lo, lo_page = probe, page
+            bisect = not bisect and hi - lo > (size + 1) // 2
+        metrics.inc('okx_boundary_search_fetches_total', fetches)
+        return hi
+
+    async def _locate_pages_by_index(
+        self,
+        request: NewsRequest,
+        qty: int,
+        first_page: list[NewsHeadline],
+    ) -> tuple[int, int] | None:
+        """
+        interpolate boundary pages from the index and verify them with a few page fetches
+        :return: newest and oldest pages of the period or None if the index is empty
+        """
+        # the first page is parsed apart from _scrape_headline_page_by_num: it must not be indexed before align
+        self.page_index.align(first_page, pages_qty=qty)
+        self.page_index.add_page(1, first_page)
+        newest_estimate = self.page_index.estimate_page(request.end_date)
+        older_estimate = self.page_index.estimate_page(request.start_date - timedelta(days=1))
+        if newest_estimate is None or older_estimate is None:
+            return None
+        newest_page, older_page = await asyncio.gather(
+            # first page with any news not newer than end_date
+            self._gallop_first_page(newest_estimate, qty, lambda page: not page > request.end_date),
+            # first page with all news older than start_date
+            self._gallop_first_page(older_estimate, qty, lambda page: page < request.start_date),
         )
-        return self._record_storage
+        logger.debug(f'pages {newest_page}-{older_page - 1} located by index')
+        return newest_page, older_page - 1
+
+    async def _gallop_first_page(
+        self,
+        estimate: int,
+        qty: int,
+        predicate: Callable[[PageHeadlines], bool],
+    ) -> int:
+        """
+        :param estimate: expected page
+        :param predicate: monotone over pages: False for the newest pages, True for the older ones
+        :return: first page in 1..qty matching predicate or qty + 1 if there is no such page
+
+        pages are probed from the estimate with doubling steps until the answer is bracketed,
+        then the bracket is bisected; an exact estimate costs two fetches
+        """
+        lo, hi = 0, qty + 1
+        page = min(max(estimate, 1), qty)
+        step = 1
+        if predicate(await self._scrape_headline_page_by_num(page)):
+            hi = page
+            while hi - step > lo:
+                probe = hi - step
+                if not predicate(await self._scrape_headline_page_by_num(probe)):
+                    lo = probe
+                    break
+                hi = probe
+                step *= 2
+        else:
+            lo = page
+            while lo + step < hi:
+                probe = lo + step
+                if predicate(await self._scrape_headline_page_by_num(probe)):
+                    hi = probe
+                    break
+                lo = probe
+                step *= 2
+        while hi - lo > 1:
+            middle = (lo + hi) // 2
+            if predicate(await self._scrape_headline_page_by_num(middle)):
+                hi = middle
+            else:
+                lo = middle
+        return hi
+
+    def _validate_page_cache(self, first_page: list[NewsHeadline]) -> None:
+        """
+        cached headline pages are valid only while the newest headline is the same as when they were loaded:
+        new news push older headlines to the next pages
+        """
+        top_key = (first_page[0].date, first_page[0].title) if first_page else None
+        if top_key != self._top_key:
+            if self._top_key is not None:
+                logger.info('new news were published, cached headline pages are loaded again')
+                self._scrape_headline_page_by_num.cache_clear()
+            self._top_key = top_key
 
     async def _scrape_headline_page_by_num(self, num: int) -> PageHeadlines:
+        if self.checkpoint is not None and (headlines := self.checkpoint.get_headline_page(num)) is not None:
+            return PageHeadlines(num, headlines)
         page_content = await self.page_provider.get_page_by_number(num)
-        page_records =  PageHeadlines(num, self.parser.extract_headlines_from_page(page_content))
-        self._put_to_storage(page_records)
+        page_records =  PageHeadlines(num, await self.parser.extract_headlines_from_page(page_content))
+        if self.checkpoint is not None:
+            self.checkpoint.save_headline_page(num, page_records.records)
+        if self.page_index is not None:
+            self.page_index.add_page(num, page_records.records)
         logger.debug(f'parsed headline {PageHeadlines!r}')
         return page_records
 
-    async def _scrape_news_record(self, news_headline: NewsHeadline) -> None:
+    # bodies are not cached: an article is loaded once per scrape, concurrent loads are coalesced by the provider
+    async def _scrape_news_record(self, news_headline: NewsHeadline) -> NewsRecord:
         page_content = await self.page_provider.get_news_page_by_url(news_headline.body_url)
-        news_record_body =  self.parser.extract_news_body_from_page(page_content)
-        self._record_storage.append(
-            NewsRecord(
-                date=news_headline.date,
-                title=news_headline.title,
-                body=news_record_body,
-            )
+        news_record_body =  await self.parser.extract_news_body_from_page(page_content)
+        metrics.inc('okx_records_total')
+        return NewsRecord(
+            date=news_headline.date,
+            title=news_headline.title,
+            body=news_record_body,
+            body_url=news_headline.body_url,
         )
 
-    async def _bsearch_date_page(self, start: int, end: int, searching_date: date) -> int:
-        """
-        :param start: newest articles page
-        :param end: oldest news
-        :param searching_date: desired news date
-        :return: number of page which contains searching_date or last page number if no desired date was found
 
-        to decrease loading time make aggressive binary search:
-            load pages for middle,
-            right_middle (middle of the first half),
-            right_middle (middle of the second half),
-        """
-        if end - start < 0:
-            return start
-        if end - start < 4:
-            searching_pages = range(start, end + 1)
+def max_boundary_fetches(qty: int) -> int:
+    """pages fetched by the boundary search besides the first one, two per halving of the qty pages"""
+    return 2 * math.ceil(math.log2(qty)) if qty > 1 else 0
+
+
+def _newest_date(page: PageHeadlines) -> date | None:
+    return max((r.date for r in page.records), default=None)
+
+
+def _oldest_date(page: PageHeadlines) -> date | None:
+    return min((r.date for r in page.records), default=None)
+
+
+def _interpolate(
+    lo: int,
+    lo_key: date,
+    hi: int,
+    hi_key: date | None,
+    target: date,
+    first_page: PageHeadlines,
+    lo_page: PageHeadlines,
+) -> int | None:
+    """:return: page between lo and hi expected to be the first one not newer than target, None if dates do not tell"""
+    if hi_key is not None:
+        days_per_page = (lo_key - hi_key).days / (hi - lo)
+    else:
+        # days of pages 1..lo, the first and the last ones included
+        days_per_page = ((_newest_date(first_page) - _oldest_date(lo_page)).days + 1) / lo
+    if days_per_page <= 0:
+        return None
+    return min(max(lo + math.ceil((lo_key - target).days / days_per_page), lo + 1), hi - 1)
+
+
+def _merge_periods(requests: Iterable[NewsRequest]) -> list[NewsRequest]:
+    """:return: sorted periods with the overlapping and adjacent ones merged"""
+    merged: list[NewsRequest] = []
+    for request in sorted(requests, key=lambda r: r.start_date):
+        if merged and request.start_date <= merged[-1].end_date + timedelta(days=1):
+            if request.end_date > merged[-1].end_date:
+                merged[-1] = NewsRequest(start_date=merged[-1].start_date, end_date=request.end_date)
         else:
-            # divide the range into 3 parts
-            searching_pages = [
-                round(x)
-                for x in ((end - start) / 3, (end - start) / 2, 2 * (end - start) / 3)
-            ]
-
-        page_records: list[PageHeadlines] = await asyncio.gather(
-            *[
-                self._scrape_headline_page_by_num(num) for num in searching_pages
-            ]
-        )
-        left = start
-        for page_headlines in page_records:
-            if searching_date == page_headlines:
-                return page_headlines.page_num
-            elif searching_date > page_headlines:
-                return await self._bsearch_date_page(left, page_headlines.page_num - 1, searching_date)
-            left = page_headlines.page_num
-        return await self._bsearch_date_page(left + 1, end, searching_date)
-
-    async def _ensure_oldest_date_page(self, page_num: int, pages_qty: int, start_date: date) -> int:
-        if page_num == pages_qty:
-            return page_num
-        pages_qty += 1
-        is_start_date_on_page = True
-        while is_start_date_on_page and page_num <= pages_qty:
-            records = await self._scrape_headline_page_by_num(page_num)
-            is_start_date_on_page = start_date == records
-            page_num += 1
-        return page_num
-
-    async def _ensure_newest_date_page(self, page_num: int, end_date: date) -> int:
-        if page_num <= 1:
-            return page_num
-        is_start_date_on_page = True
-        while is_start_date_on_page and page_num >= 1:
-            page_num -= 1
-            records = await self._scrape_headline_page_by_num(page_num)
-            is_start_date_on_page = end_date in records
-        return page_num + 1
-
-    def _put_to_storage(self, page_records:PageHeadlines):
-        for r in page_records.records:
-            self._headline_storage[r.date].add(r)
-
-    def _get_filtered_headlines_by_period(self, start_date: date, end_date: date) -> Iterable[NewsHeadline]:
-        results = []
-        for delta in range((end_date - start_date).days + 1):
-            results.extend(self._headline_storage[start_date + timedelta(delta)])
-        return results
+            merged.append(request)
+    return merged
+
+
+def _merge_page_ranges(page_ranges: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+    """:return: sorted page ranges with the overlapping and adjacent ones merged"""
+    merged: list[tuple[int, int]] = []
+    for first_page, last_page in sorted(page_ranges):
+        if merged and first_page <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last_page))
+        else:
+            merged.append((first_page, last_page))
+    return merged
@@ -0,0 +1,123 @@
+import asyncio
+import inspect
+from collections import OrderedDict
+from datetime import date
+from typing import AsyncIterator, Awaitable, Callable
+
+from src.domain.page_provider import OKXPageProvider
+from src.domain.parsing_backend import ParsingBackend
+from src.dto import NewsHeadline, NewsRecord
+from src.infrastructure.config import config
+from src.infrastructure.logger import logger
+from src.infrastructure.metrics import metrics
+
+
+class NewsWatcher:
+    """
+    live tail of the announcements: only the first headlines page is polled
+
+    the provider should revalidate the page with conditional requests (an http cache), an unchanged page
+    is not parsed again; only bodies of headlines missing in the bounded set of recently seen ones are loaded;
+    the poll interval grows while nothing is published and drops to min_interval on new news
+    """
+
+    def __init__(
+        self,
+        page_provider: OKXPageProvider,
+        parser: ParsingBackend,
+        min_interval: float = config.WATCH_MIN_INTERVAL,
+        max_interval: float = config.WATCH_MAX_INTERVAL,
+        seen_size: int = config.WATCH_SEEN_SIZE,
+        max_pages: int = config.WATCH_MAX_PAGES,
+    ):
+        self._page_provider = page_provider
+        self._parser = parser
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._seen_size = seen_size
+        self._max_pages = max_pages
+        self._seen: OrderedDict[tuple[date, str], None] = OrderedDict()
+        self._last_page: str | None = None
+        self.interval = min_interval
+
+    async def watch(self) -> AsyncIterator[NewsRecord]:
+        """news published after the start, oldest first"""
+        while True:
+            try:
+                records = await self.poll()
+            except Exception as e:
+                logger.error(f'poll failed: {e!r}', exc_info=e)
+                metrics.inc('okx_watch_polls_total', result='failed')
+                self.interval = self._max_interval
+            else:
+                for record in records:
+                    yield record
+                self._adapt_interval(bool(records))
+            await asyncio.sleep(self.interval)
+
+    async def run(self, callback: Callable[[NewsRecord], Awaitable[None] | None]) -> None:
+        async for record in self.watch():
+            result = callback(record)
+            if inspect.isawaitable(result):
+                await result
+
+    async def poll(self) -> list[NewsRecord]:
+        """:return: news published since the previous poll, oldest first; the first poll only remembers the page"""
+        page_content = await self._page_provider.get_page_by_number(1)
+        if page_content == self._last_page:
+            metrics.inc('okx_watch_polls_total', result='unchanged')
+            return []
+        self._last_page = page_content
+        headlines = await self._parser.extract_headlines_from_page(page_content)
+        if not self._seen:
+            self._remember(headlines[::-1])
+            metrics.inc('okx_watch_polls_total', result='started')
+            logger.info(f'watching for news newer than {headlines[0] if headlines else None}')
+            return []
+
+        new_headlines = await self._collect_new(headlines)
+        records = await asyncio.gather(*[self._load_record(h) for h in reversed(new_headlines)])
+        loaded = [record for record in records if record is not None]
+        if len(loaded) < len(records):
+            # the page is parsed again on the next poll, so the failed articles are retried
+            self._last_page = None
+        self._remember(loaded)
+        # headlines still on the first page stay the last ones evicted, oldest first as they were published
+        self._remember([h for h in reversed(headlines) if (h.date, h.title) in self._seen])
+        metrics.inc('okx_watch_polls_total', result='new' if loaded else 'changed')
+        metrics.inc('okx_watch_records_total', len(loaded))
+        return loaded
+
+    async def _collect_new(self, headlines: list[NewsHeadline]) -> list[NewsHeadline]:
+        """:return: new headlines, newest first; next pages are read while every headline of a page is new"""
+        new_headlines = []
+        page_num = 1
+        while True:
+            page_new = [h for h in headlines if (h.date, h.title) not in self._seen]
+            new_headlines.extend(page_new)
+            if len(page_new) < len(headlines) or page_num >= self._max_pages:
+                return new_headlines
+            page_num += 1
+            headlines = await self._parser.extract_headlines_from_page(
+                await self._page_provider.get_page_by_number(page_num)
+            )
+
+    async def _load_record(self, headline: NewsHeadline) -> NewsRecord | None:
+        try:
+            page_content = await self._page_provider.get_news_page_by_url(headline.body_url)
+            body = await self._parser.extract_news_body_from_page(page_content)
+        except Exception as e:
+            logger.warning(f'{headline.body_url} failed, it is retried on the next poll: {e!r}')
+            return None
+        return NewsRecord(title=headline.title, date=headline.date, body=body, body_url=headline.body_url)
+
+    def _remember(self, items: list[NewsHeadline] | list[NewsRecord]) -> None:
+        """:param items: oldest first, the oldest ones are evicted first"""
+        for item in items:
+            self._seen[(item.date, item.title)] = None
+            self._seen.move_to_end((item.date, item.title))
+        while len(self._seen) > self._seen_size:
+            self._seen.popitem(last=False)
+
+    def _adapt_interval(self, published: bool) -> None:
+        self.interval = self._min_interval if published else min(self.interval * 1.5, self._max_interval)
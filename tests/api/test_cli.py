@@ -0,0 +1,180 @@
+import json
+import logging
+import subprocess
+import sys
+from datetime import date
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+from click.testing import CliRunner
+
+from src.api import factory
+from src.api.cli import _serve_from_storage, main
+from src.domain.parsing_backend import ParsingBackend
+from src.dto import NewsRecord, NewsHeadline
+from src.infrastructure.news_storage import SQLiteNewsStorage
+from src.service import OKXScrapingService
+from tests.fake_okx import FakeParser, FakeProvider
+
+ROOT = Path(__file__).parent.parent.parent
+HEAVY_MODULES = {'asyncio', 'aiohttp', 'bs4', 'async_lru', 'lxml', 'selectolax', 'concurrent.futures'}
+
+
+def imported_modules(*args: str) -> tuple[set[str], subprocess.CompletedProcess]:
+    """:return: names of the imported modules and the finished process"""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args], cwd=ROOT, capture_output=True, text=True, timeout=60
+    )
+    modules = set()
+    for line in process.stderr.splitlines():
+        if line.startswith('import time:') and not line.endswith('package'):
+            modules.add(line.split('|')[-1].strip())
+    return modules, process
+
+
+def test_heavy_modules_are_not_imported_at_startup():
+    modules, _ = imported_modules('-c', 'import src.api.cli')
+
+    assert 'src.api.cli' in modules
+    assert not HEAVY_MODULES & modules
+
+
+def test_help_does_not_set_up_the_logger():
+    process = subprocess.run([sys.executable, '-c', (
+        'import logging\n'
+        'from src.api.cli import main\n'
+        "main(['--help'], standalone_mode=False)\n"
+        'print(len(logging.getLogger().handlers))'
+    )], cwd=ROOT, capture_output=True, text=True, timeout=60)
+
+    assert process.returncode == 0, process.stderr
+    assert process.stdout.splitlines()[-1] == '0'
+
+
+@pytest.fixture
+def storage_path(tmp_path) -> str:
+    path = str(tmp_path / 'news.db')
+    storage = SQLiteNewsStorage(path)
+    storage.save_records([
+        NewsRecord(title='news 1', date=date(2025, 4, 16), body='body 1'),
+        NewsRecord(title='news 2', date=date(2025, 4, 17), body='body 2'),
+    ])
+    storage.mark_covered(date(2025, 4, 1), date(2025, 4, 17))
+    storage.close()
+    return path
+
+
+def test_covered_period_is_served_without_network_stack(storage_path, tmp_path):
+    folder = tmp_path / 'results'
+    modules, process = imported_modules(
+        'entrypoint.py', '--start-date', '2025-04-17', '--end-date', '2025-04-17',
+        '--folder', str(folder), '--storage', storage_path,
+    )
+
+    assert process.returncode == 0, process.stderr
+    assert not HEAVY_MODULES & modules
+    assert json.loads((folder / 'results.json').read_text()) == [
+        {'title': 'news 2', 'date': '2025-04-17', 'body': 'body 2'}
+    ]
+
+
+@pytest.mark.parametrize('start_date, end_date', [
+    (date(2025, 3, 31), date(2025, 4, 17)), (date(2025, 4, 18), date(2025, 4, 17)),
+])
+def test_not_covered_period_is_scraped(storage_path, tmp_path, start_date, end_date):
+    assert not _serve_from_storage(start_date, end_date, str(tmp_path), storage_path, 'json', False, 'none')
+    assert not (tmp_path / 'results.json').exists()
+
+
+def test_updated_only_requires_storage(tmp_path):
+    result = CliRunner().invoke(main, [
+        '--start-date', '2025-04-17', '--end-date', '2025-04-17', '--folder', str(tmp_path), '--updated-only',
+    ])
+
+    assert result.exit_code == 2
+    assert '--updated-only requires --storage' in result.output
+
+
+def test_resume_of_periods_requires_storage(tmp_path):
+    result = CliRunner().invoke(main, [
+        '--period', '2025-04-16:2025-04-17', '--folder', str(tmp_path), '--resume',
+    ])
+
+    assert result.exit_code == 2
+    assert '--resume continues a --start-date/--end-date scrape' in result.output
+
+
+def test_partitioned_defaults_to_ndjson(storage_path, tmp_path):
+    folder = tmp_path / 'results'
+    result = CliRunner().invoke(main, [
+        '--start-date', '2025-04-17', '--end-date', '2025-04-17', '--folder', str(folder),
+        '--storage', storage_path, '--partitioned',
+    ])
+
+    assert result.exit_code == 0, result.output
+    assert json.loads((folder / '2025' / '04' / '17.ndjson').read_text()) == {
+        'title': 'news 2', 'date': '2025-04-17', 'body': 'body 2'
+    }
+
+
+@pytest.mark.parametrize('start_date, end_date, error', [
+    ('2025-04-18', '2025-04-17', 'start date cannot be after end date'),
+    ('2025-13-01', '2025-04-17', "'2025-13-01', expected ISO format (YYYY-MM-DD)"),
+])
+def test_invalid_period_is_rejected(tmp_path, start_date, end_date, error):
+    result = CliRunner().invoke(main, [
+        '--start-date', start_date, '--end-date', end_date, '--folder', str(tmp_path),
+    ])
+
+    assert result.exit_code == 2
+    assert error in result.output
+
+
+class MalformedPageParser(FakeParser):
+    def extract_headlines_from_page(self, page_content: str) -> list[NewsHeadline]:
+        if page_content == 'page 2':
+            raise ValueError("Malformed date 'Apr 17', expected month, day and year")
+        return super().extract_headlines_from_page(page_content)
+
+
+def test_value_error_of_the_scrape_pipeline_is_reported(tmp_path, caplog, monkeypatch):
+    service = OKXScrapingService(page_provider=FakeProvider(), parser=ParsingBackend(MalformedPageParser()))
+    monkeypatch.setattr(service, '_search_pages', AsyncMock(return_value=(1, 2)))
+    monkeypatch.setattr(service, 'close', AsyncMock())
+    monkeypatch.setattr(factory, 'build_service', lambda *args: service)
+
+    with caplog.at_level(logging.ERROR):
+        result = CliRunner().invoke(main, [
+            '--start-date', '2000-01-01', '--end-date', '2025-04-17', '--folder', str(tmp_path),
+        ])
+
+    assert result.exit_code == 0, result.output
+    assert [r.getMessage() for r in caplog.records] == [
+        "Error: invalid data. Malformed date 'Apr 17', expected month, day and year"
+    ]
+
+
+@pytest.mark.parametrize('args, expected', [([], False), (['--stream-cutoff'], True)])
+def test_stream_cutoff_is_passed_to_the_provider(tmp_path, monkeypatch, args, expected):
+    built = []
+    original_build_service = factory.build_service
+
+    def build_service(*args):
+        service = original_build_service(*args)
+        built.append(service.page_provider)
+        monkeypatch.setattr(service, 'iter_news_by_period', _no_records)
+        return service
+
+    monkeypatch.setattr(factory, 'build_service', build_service)
+    result = CliRunner().invoke(main, [
+        '--start-date', '2025-04-17', '--end-date', '2025-04-17', '--folder', str(tmp_path), *args,
+    ])
+
+    assert result.exit_code == 0, result.output
+    assert [provider._stream_cutoff for provider in built] == [expected]
+
+
+async def _no_records(request):
+    return
+    yield
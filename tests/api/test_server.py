@@ -0,0 +1,77 @@
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.api.server import make_app
+from src.dto import NewsRecord, NewsRequest
+
+
+class FakeService:
+    def __init__(self):
+        self.requests: list[NewsRequest] = []
+        self.release = asyncio.Event()
+        self.collect_metrics = MagicMock()
+        self.close = AsyncMock()
+
+    async def get_news_by_period(self, request: NewsRequest) -> list[NewsRecord]:
+        self.requests.append(request)
+        await self.release.wait()
+        return [NewsRecord(title='title', date=request.start_date, body='body')]
+
+
+@pytest.fixture
+def service():
+    return FakeService()
+
+
+def make_client(service: FakeService) -> TestClient:
+    return TestClient(TestServer(make_app(service)))
+
+
+async def test_get_news(service):
+    service.release.set()
+
+    async with make_client(service) as client:
+        resp = await client.get('/news', params={'start': '2025-04-01', 'end': '2025-04-02'})
+        assert resp.status == 200
+        assert await resp.json() == [{'title': 'title', 'date': '2025-04-01', 'body': 'body'}]
+    assert service.requests == [NewsRequest(start_date=date(2025, 4, 1), end_date=date(2025, 4, 2))]
+    service.close.assert_awaited_once()
+
+
+@pytest.mark.parametrize('params', [
+    {'start': '2025-04-01'},
+    {'start': '2025-04-01', 'end': '04/02/2025'},
+    {'start': '2025-04-02', 'end': '2025-04-01'},
+])
+async def test_bad_request(service, params):
+    async with make_client(service) as client:
+        resp = await client.get('/news', params=params)
+
+    assert resp.status == 400
+    assert service.requests == []
+
+
+async def test_same_period_is_scraped_once(service):
+    params = {'start': '2025-04-01', 'end': '2025-04-02'}
+    async with make_client(service) as client:
+        first = asyncio.create_task(client.get('/news', params=params))
+        second = asyncio.create_task(client.get('/news', params=params))
+        await asyncio.sleep(.05)
+        service.release.set()
+        responses = await asyncio.gather(first, second)
+
+    assert [r.status for r in responses] == [200, 200]
+    assert len(service.requests) == 1
+
+
+async def test_metrics(service):
+    async with make_client(service) as client:
+        resp = await client.get('/metrics')
+
+    assert resp.status == 200
+    assert resp.content_type == 'text/plain'
+    service.collect_metrics.assert_called_once()
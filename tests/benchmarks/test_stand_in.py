@@ -0,0 +1,35 @@
+from datetime import date
+
+from benchmarks.stand_in import StandInSite, serve
+from src.domain.page_provider import OKXPageProvider
+from src.domain.parser import OKXParser
+from src.dto import NewsRequest
+from src.infrastructure.config import config
+from src.infrastructure.page_index import PageDateIndex
+from src.service import OKXScrapingService
+
+
+def test_rendered_page_is_parsed():
+    site = StandInSite(pages_qty=7, page_size=15, per_day=3, newest=date(2025, 4, 17))
+    parser = OKXParser()
+
+    page = site.render_page(2)
+
+    headlines = parser.extract_headlines_from_page(page)
+    assert parser.get_pages_qty(page) == 7
+    assert [(h.title, h.body_url, h.date) for h in headlines] == [site.headline(i) for i in range(15, 30)]
+
+
+async def test_service_scrapes_stand_in(monkeypatch):
+    site = StandInSite(pages_qty=10, newest=date(2025, 4, 17))
+    request = NewsRequest(start_date=date(2025, 3, 30), end_date=date(2025, 4, 2))
+
+    async with serve(site) as base_url:
+        monkeypatch.setattr(config, 'OKX_URL', base_url)
+        service = OKXScrapingService(page_provider=OKXPageProvider(), page_index=PageDateIndex())
+        records = await service.get_news_by_period(request)
+        await service.page_provider.close()
+
+    expected = site.headlines_between(request.start_date, request.end_date)
+    assert sorted((r.title, r.date) for r in records) == sorted((title, d) for title, _, d in expected)
+    assert site.stats.articles == len(expected)
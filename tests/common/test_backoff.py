@@ -79,3 +79,65 @@ async def test_retry_all_attempts_and_fail(mock_sleep):
 
     assert call_counter == retry_attempts
     assert mock_sleep.call_count == retry_attempts - 1
+
+
+@pytest.mark.asyncio
+async def test_exponential_delays(mock_sleep):
+    @backoff(retry_count=5, exceptions=(TemporaryError,), timeout=.5, factor=2, max_timeout=3)
+    async def always_fail():
+        raise TemporaryError()
+
+    with pytest.raises(TemporaryError):
+        await always_fail()
+
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [.5, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_jitter_within_delay(mock_sleep):
+    @backoff(retry_count=4, exceptions=(TemporaryError,), timeout=1, factor=2, jitter=True)
+    async def always_fail():
+        raise TemporaryError()
+
+    with patch('random.uniform', side_effect=lambda a, b: b / 2) as mock_uniform:
+        with pytest.raises(TemporaryError):
+            await always_fail()
+
+    assert [c.args for c in mock_uniform.call_args_list] == [(0, 1), (0, 2), (0, 4)]
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [.5, 1, 2]
+
+
+class RetryAfterError(Exception):
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+
+
+@pytest.mark.asyncio
+async def test_retry_after(mock_sleep):
+    global call_counter
+
+    @backoff(retry_count=2, exceptions=(RetryAfterError,), timeout=1)
+    async def fail_once():
+        global call_counter
+        call_counter += 1
+        if call_counter == 1:
+            raise RetryAfterError(retry_after=7)
+        return "Success"
+
+    assert await fail_once() == "Success"
+    mock_sleep.assert_called_once_with(7)
+
+
+@pytest.mark.asyncio
+async def test_on_retry_hook(mock_sleep):
+    retried = []
+
+    @backoff(retry_count=3, exceptions=(TemporaryError,), on_retry=retried.append)
+    async def always_fail():
+        raise TemporaryError()
+
+    with pytest.raises(TemporaryError):
+        await always_fail()
+
+    assert len(retried) == 2
+    assert all(isinstance(e, TemporaryError) for e in retried)
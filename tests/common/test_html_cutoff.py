@@ -0,0 +1,43 @@
+import pytest
+
+from src.common.html_cutoff import ElementEnd
+
+PAGE = (
+    '<html><body><div class="header"><div>menu</div></div>'
+    '<div class="index_richTextContent_x1"><p>text</p><div class="nested"><div>deep</div></div><p>more</p></div>'
+    '<div class="footer">footer</div></body></html>'
+)
+END = PAGE.index('<div class="footer">')
+
+
+def feed_chunks(end: ElementEnd, text: str, size: int) -> int | None:
+    for start in range(0, len(text), size):
+        position = end.feed(text[start:start + size])
+        if position is not None:
+            return position
+    return None
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 16, len(PAGE)])
+def test_end_of_element_in_chunks(size):
+    assert feed_chunks(ElementEnd('index_richTextContent_'), PAGE, size) == END
+
+
+def test_element_not_found():
+    assert feed_chunks(ElementEnd('index_missing_'), PAGE, 5) is None
+
+
+def test_other_tags_are_not_counted():
+    page = '<section><ul class="list"><li><ul><li>a</li></ul></li></ul><div>tail</div>'
+
+    assert ElementEnd('list', tag='ul').feed(page) == page.index('<div>')
+
+
+def test_buffer_is_bounded():
+    end = ElementEnd('index_richTextContent_')
+    end.feed('<div class="index_richTextContent_">')
+
+    for _ in range(1000):
+        end.feed('<p>' + 'x' * 100 + '</p>')
+
+    assert len(end._buffer) < 200
@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from src.common.rate_limiter import AdaptiveRateLimiter
+
+
+@pytest.fixture
+def limiter():
+    return AdaptiveRateLimiter(rate=10, max_rate=20, window=4, max_window=8, cooldown=0)
+
+
+class TestAIMD:
+    def test_additive_increase(self, limiter):
+        for _ in range(4):
+            limiter.on_success(latency=.1)
+
+        assert limiter.window == pytest.approx(4.92, abs=.01)
+        assert limiter.rate == 12
+
+    def test_increase_is_bounded(self, limiter):
+        for _ in range(1000):
+            limiter.on_success(latency=.1)
+
+        assert limiter.window == 8
+        assert limiter.rate == 20
+
+    def test_multiplicative_decrease_on_overload(self, limiter):
+        limiter.on_overload()
+
+        assert limiter.window == 2
+        assert limiter.rate == 5
+        assert limiter.stats.overloads == 1
+
+    def test_decrease_once_per_cooldown(self):
+        limiter = AdaptiveRateLimiter(rate=10, max_rate=20, window=4, max_window=8, cooldown=60)
+
+        limiter.on_overload()
+        limiter.on_overload()
+
+        assert limiter.window == 2
+        assert limiter.stats.overloads == 2
+
+    def test_decrease_on_latency_growth(self, limiter):
+        limiter.on_success(latency=.1)
+        for _ in range(10):
+            limiter.on_success(latency=1)
+
+        assert limiter.stats.slowdowns > 0
+        assert limiter.window < 4
+
+    def test_metrics(self, limiter):
+        assert limiter.metrics() == {
+            'rate': 10,
+            'window': 4,
+            'in_flight': 0,
+            'requests': 0,
+            'overloads': 0,
+            'slowdowns': 0,
+            'throttled_seconds': 0,
+        }
+
+
+class TestAcquire:
+    async def test_window_limits_concurrency(self):
+        limiter = AdaptiveRateLimiter(rate=1000, max_rate=1000, window=2, max_window=2)
+        in_flight = 0
+        max_in_flight = 0
+
+        async def request():
+            nonlocal in_flight, max_in_flight
+            async with limiter.slot():
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                await asyncio.sleep(.01)
+                in_flight -= 1
+
+        await asyncio.gather(*[request() for _ in range(6)])
+
+        assert max_in_flight == 2
+        assert limiter.stats.requests == 6
+
+    async def test_token_bucket_limits_rate(self):
+        limiter = AdaptiveRateLimiter(rate=50, max_rate=50, window=1, max_window=1)
+        started = time.monotonic()
+
+        for _ in range(6):
+            async with limiter.slot():
+                pass
+
+        # the first token is available at once, the next five are refilled at 50 per second
+        assert time.monotonic() - started >= .09
+
+    async def test_retry_after_pauses_requests(self):
+        limiter = AdaptiveRateLimiter(rate=1000, max_rate=1000, window=4, max_window=4)
+        limiter.on_overload(retry_after=.1)
+        started = time.monotonic()
+
+        async with limiter.slot():
+            pass
+
+        assert time.monotonic() - started >= .09
+
+    async def test_cancelled_acquire_releases_slot(self):
+        limiter = AdaptiveRateLimiter(rate=1000, max_rate=1000, window=1, max_window=1)
+        limiter.on_overload(retry_after=10)
+        task = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(.01)
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert limiter.metrics()['in_flight'] == 0
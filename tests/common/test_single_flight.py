@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from src.common.single_flight import SingleFlight
+
+
+@pytest.fixture
+def single_flight():
+    return SingleFlight()
+
+
+async def test_concurrent_calls_share_one_call(single_flight):
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(.01)
+        return calls
+
+    results = await asyncio.gather(*[single_flight.do('page', fetch) for _ in range(5)])
+
+    assert results == [1] * 5
+    assert calls == 1
+    assert single_flight.deduplicated == 4
+
+
+async def test_finished_call_is_not_cached(single_flight):
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await single_flight.do('page', fetch) == 1
+    assert await single_flight.do('page', fetch) == 2
+    assert single_flight.deduplicated == 0
+
+
+async def test_error_is_shared(single_flight):
+    async def fail():
+        await asyncio.sleep(.01)
+        raise ValueError('boom')
+
+    results = await asyncio.gather(*[single_flight.do('page', fail) for _ in range(2)], return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+async def test_cancelled_caller_does_not_cancel_others(single_flight):
+    async def fetch():
+        await asyncio.sleep(.02)
+        return 'page'
+
+    first = asyncio.create_task(single_flight.do('page', fetch))
+    second = asyncio.create_task(single_flight.do('page', fetch))
+    await asyncio.sleep(.005)
+    first.cancel()
+
+    assert await second == 'page'
@@ -1,10 +1,25 @@
+import asyncio
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 from aiohttp import ClientResponse, ClientError
-from src.domain.page_provider import OKXPageProvider, ServerError
+from src.domain.page_provider import (
+    OKXPageProvider, ServerError, TooManyRequests, ARTICLE_ENDPOINT, ARTICLE_END_MARKER, _parse_retry_after
+)
+from src.infrastructure.http_cache import FileHTTPCache
+from src.infrastructure.config import config
+from src.infrastructure.metrics import metrics
+from src.domain.parser import OKXParser
+from benchmarks.stand_in import CORPUS_DIR, StandInSite, serve
 import urllib.parse
 
 
+def ok_response(content: str, headers: dict | None = None) -> AsyncMock:
+    response = AsyncMock(spec=ClientResponse, status=200, headers=headers or {})
+    response.read.return_value = content.encode()
+    response.get_encoding.return_value = 'utf-8'
+    return response
+
+
 @pytest.fixture
 def mock_session():
     return AsyncMock()
@@ -12,13 +27,9 @@ def mock_session():
 
 @pytest.fixture
 async def page_provider(mock_session):
-    session = AsyncMock()
-    session.__aenter__.return_value = mock_session
-
-    with patch('aiohttp.ClientSession', return_value=session):
-        provider = OKXPageProvider()
-        provider._session = session  # Replace the session with our mock
-        return provider
+    provider = OKXPageProvider(stream_cutoff=False)
+    provider._session = mock_session  # Replace the session with our mock
+    return provider
 
 
 class TestGetPageByNumber:
@@ -27,9 +38,7 @@ class TestGetPageByNumber:
         expected_url = f'https://www.okx.com/help/section/announcements-latest-announcements/page/{page_num}'
         expected_content = "<html>Test content</html>"
 
-        mock_response = AsyncMock(spec=ClientResponse)
-        mock_response.status = 200
-        mock_response.text.return_value = expected_content
+        mock_response = ok_response(expected_content)
         mock_session.get.return_value = mock_response
 
         result = await page_provider.get_page_by_number(page_num)
@@ -51,9 +60,7 @@ class TestGetPageByNumber:
         page_num = 4
         mock_session.get.side_effect = [ClientError("First error"), ClientError("Second error")]
 
-        mock_response = AsyncMock(spec=ClientResponse)
-        mock_response.status = 200
-        mock_response.text.return_value = "Success after retry"
+        mock_response = ok_response("Success after retry")
         mock_session.get.side_effect = [
             ClientError("First error"),
             ClientError("Second error"),
@@ -70,16 +77,15 @@ class TestGetPageByNumber:
         page_num = 5
         expected_content = "<html>Cached content</html>"
 
-        mock_response = AsyncMock(spec=ClientResponse)
-        mock_response.status = 200
-        mock_response.text.return_value = expected_content
+        mock_response = ok_response(expected_content)
         mock_session.get.return_value = mock_response
 
-        result1 = await page_provider.get_page_by_number(page_num)
+        # parsed pages are cached by the service, the provider shares the fetch of concurrent calls
+        result1, result2 = await asyncio.gather(
+            page_provider.get_page_by_number(page_num), page_provider.get_page_by_number(page_num)
+        )
 
-        result2 = await page_provider.get_page_by_number(page_num)
-
-        mock_session.get.assert_called_once()  # Only called once due to caching
+        mock_session.get.assert_called_once()
         assert result1 == expected_content
         assert result2 == expected_content
 
@@ -90,9 +96,7 @@ class TestGetNewsPageByUrl:
         full_url = urllib.parse.urljoin("https://www.okx.com/", relative_url)
         expected_content = "<html>News content</html>"
 
-        mock_response = AsyncMock(spec=ClientResponse)
-        mock_response.status = 200
-        mock_response.text.return_value = expected_content
+        mock_response = ok_response(expected_content)
         mock_session.get.return_value = mock_response
 
         result = await page_provider.get_news_page_by_url(relative_url)
@@ -104,12 +108,183 @@ class TestGetNewsPageByUrl:
         absolute_url = "https://www.okx.com/help/article/123"
         expected_content = "<html>News content</html>"
 
-        mock_response = AsyncMock(spec=ClientResponse)
-        mock_response.status = 200
-        mock_response.text.return_value = expected_content
+        mock_response = ok_response(expected_content)
         mock_session.get.return_value = mock_response
 
         result = await page_provider.get_news_page_by_url(absolute_url)
 
         mock_session.get.assert_called_once_with(url=absolute_url)
         assert result == expected_content
+
+
+class TestConditionalRequests:
+    @pytest.fixture
+    async def cached_provider(self, mock_session, tmp_path):
+        provider = OKXPageProvider(http_cache=FileHTTPCache(str(tmp_path), max_size=1024 * 1024))
+        provider._session = mock_session
+        return provider
+
+    async def test_not_modified_returns_cached_body(self, cached_provider, mock_session):
+        url = 'https://www.okx.com/help/article/304'
+        first_response = ok_response('<html>article</html>', headers={'ETag': '"v1"'})
+        not_modified_response = MagicMock(status=304, headers={})
+        mock_session.get.side_effect = [first_response]
+
+        await cached_provider._get_text(url, ARTICLE_ENDPOINT)
+        mock_session.get.side_effect = [not_modified_response]
+        actual = await cached_provider._get_text(url, ARTICLE_ENDPOINT)
+
+        mock_session.get.assert_called_with(url=url, headers={'If-None-Match': '"v1"'})
+        assert actual == '<html>article</html>'
+        assert cached_provider._http_cache.stats.not_modified == 1
+        assert cached_provider._http_cache.stats.misses == 1
+        assert cached_provider._http_cache.stats.hits == 1
+
+
+class TestOverload:
+    async def test_too_many_requests_slows_down(self, mock_session):
+        provider = OKXPageProvider()
+        provider._session = mock_session
+        window = provider.rate_limiter.window
+        mock_session.get.return_value = MagicMock(status=429, headers={'Retry-After': '0'})
+
+        with pytest.raises(TooManyRequests):
+            await provider._get_text('https://www.okx.com/help/article/429', ARTICLE_ENDPOINT)
+
+        assert provider.rate_limiter.stats.overloads == 1
+        assert provider.rate_limiter.window == window / 2
+
+    @pytest.mark.parametrize('status', [403, 404])
+    async def test_client_error_keeps_the_rate(self, page_provider, mock_session, status):
+        limiter = page_provider.rate_limiter
+        rate, window = limiter.rate, limiter.window
+        mock_session.get.return_value = MagicMock(
+            status=status, headers={}, **{'raise_for_status.side_effect': ClientError(status)}
+        )
+
+        for _ in range(5):
+            with pytest.raises(ClientError):
+                await page_provider._get_text(f'https://www.okx.com/help/article/{status}', ARTICLE_ENDPOINT)
+
+        assert (limiter.rate, limiter.window) == (rate, window)
+        assert limiter.metrics()['in_flight'] == 0
+
+    async def test_slot_is_held_while_the_body_is_read(self, page_provider, mock_session, monkeypatch):
+        in_flight = []
+        observed = []
+
+        async def slow_body():
+            in_flight.append(page_provider.rate_limiter.metrics()['in_flight'])
+            await asyncio.sleep(.05)
+            return b'body'
+
+        mock_response = ok_response('body')
+        mock_response.read.side_effect = slow_body
+        mock_session.get.return_value = mock_response
+        monkeypatch.setattr(page_provider.rate_limiter, 'on_success', observed.append)
+
+        assert await page_provider._get_text('https://www.okx.com/help/article/slow', ARTICLE_ENDPOINT) == 'body'
+
+        assert in_flight == [1]
+        assert page_provider.rate_limiter.metrics()['in_flight'] == 0
+        # the latency of the download is fed to the rate limiter
+        assert observed[0] >= .05
+
+    @pytest.mark.parametrize('value, expected', [
+        (None, None),
+        ('3', 3.),
+        ('Wed, 21 Oct 2015 07:28:00 GMT', 0.),
+        ('soon', None),
+    ])
+    def test_parse_retry_after(self, value, expected):
+        assert _parse_retry_after(value) == expected
+
+
+class TestSingleFlight:
+    async def test_concurrent_requests_share_one_fetch(self, mock_session):
+        provider = OKXPageProvider(stream_cutoff=False)
+        provider._session = mock_session
+
+        async def get(url):
+            await asyncio.sleep(.01)
+            return ok_response('<html>page</html>')
+
+        mock_session.get.side_effect = get
+
+        pages = await asyncio.gather(*[provider.get_page_by_number(5) for _ in range(3)], provider.get_main_page())
+
+        assert pages == ['<html>page</html>'] * 4
+        assert mock_session.get.call_count == 2
+        assert provider._single_flight.deduplicated == 2
+
+
+class TestStreamCutoff:
+    @pytest.mark.parametrize('compress', [False, True])
+    async def test_pages_are_read_up_to_needed_elements(self, monkeypatch, compress):
+        site = StandInSite(pages_qty=3, compress=compress, bandwidth=2 * 1024 * 1024)
+        article_page = (CORPUS_DIR / 'test_body.html').read_text()
+        headlines_page = site.render_page(2)
+        parser = OKXParser()
+
+        async with serve(site) as base_url:
+            monkeypatch.setattr(config, 'OKX_URL', base_url)
+            async with OKXPageProvider(stream_cutoff=True) as provider:
+                article = await provider.get_news_page_by_url(site.headline(0)[1])
+                headlines = await provider.get_page_by_number(2)
+
+        assert parser.extract_news_body_from_page(article) == parser.extract_news_body_from_page(article_page)
+        assert parser.extract_headlines_from_page(headlines) == parser.extract_headlines_from_page(headlines_page)
+        assert parser.get_pages_qty(headlines) == 3
+        assert len(article) < len(article_page) // 2 + 1024
+        assert len(headlines) < len(headlines_page)
+        assert site.stats.sent_bytes < len(article_page.encode()) + len(headlines_page.encode())
+
+    async def test_page_without_element_is_read_to_the_end(self, monkeypatch):
+        site = StandInSite(pages_qty=3)
+
+        async with serve(site) as base_url:
+            monkeypatch.setattr(config, 'OKX_URL', base_url)
+            async with OKXPageProvider(stream_cutoff=True) as provider:
+                page = await provider._get_text(f'{base_url}help/x', ARTICLE_ENDPOINT, 'index_missing_')
+
+        assert page == (CORPUS_DIR / 'test_body.html').read_text()
+
+
+class TestDownloadedBytes:
+    # 6 bytes in cp1251, 12 bytes when encoded back to utf-8
+    BODY = 'привет'
+
+    @staticmethod
+    def downloaded_bytes() -> float:
+        return metrics.summary()['counters'].get('okx_downloaded_bytes_total', {}).get(f'endpoint={ARTICLE_ENDPOINT}', 0)
+
+    async def test_body_bytes_are_counted(self, page_provider, mock_session):
+        mock_response = ok_response('')
+        mock_response.read.return_value = self.BODY.encode('cp1251')
+        mock_response.get_encoding.return_value = 'cp1251'
+        mock_session.get.return_value = mock_response
+        downloaded = self.downloaded_bytes()
+
+        assert await page_provider._get_text('https://www.okx.com/help/article/1', ARTICLE_ENDPOINT) == self.BODY
+
+        assert self.downloaded_bytes() - downloaded == 6
+
+    async def test_streamed_chunk_bytes_are_counted(self, mock_session):
+        provider = OKXPageProvider(stream_cutoff=True)
+        provider._session = mock_session
+        body = f'<div class="index_richTextContent_x">{self.BODY}</div>'.encode('cp1251')
+
+        async def iter_chunked(size):
+            yield body[:10]
+            yield body[10:]
+
+        mock_response = ok_response('')
+        mock_response.charset = 'cp1251'
+        mock_response.content = MagicMock(iter_chunked=iter_chunked, at_eof=MagicMock(return_value=True))
+        mock_session.get.return_value = mock_response
+        downloaded = self.downloaded_bytes()
+
+        page = await provider._get_text('https://www.okx.com/help/article/2', ARTICLE_ENDPOINT, ARTICLE_END_MARKER)
+
+        assert page == body.decode('cp1251')
+        assert self.downloaded_bytes() - downloaded == len(body)
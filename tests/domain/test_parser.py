@@ -2,13 +2,21 @@ from datetime import date
 import os
 import pytest
 
-from src.domain.parser import OKXParser
+from src.domain.parser import get_parser, OKXParser, _parse_date
 from src.dto import NewsHeadline
+from src.infrastructure.config import ENGINES
 
 
 CURRENT_DIR = os.path.dirname(__file__)
 
 
+@pytest.fixture(params=ENGINES)
+def parser(request):
+    if request.param != 'bs4':
+        pytest.importorskip(request.param)
+    return get_parser(request.param)
+
+
 @pytest.fixture
 def fake_headlines_page_content() -> str:
     with open(f'{CURRENT_DIR}/test_headlines_data.html', 'r') as f:
@@ -23,15 +31,15 @@ def fake_news_body_page_content() -> str:
 
 class TestGetPagesQty:
 
-    def test_success(self, fake_headlines_page_content):
-        actual = OKXParser().get_pages_qty(fake_headlines_page_content)
+    def test_success(self, parser, fake_headlines_page_content):
+        actual = parser.get_pages_qty(fake_headlines_page_content)
 
         assert actual == 143
 
 
 class TestExtractHeadlinesFromPage:
 
-    def test_success(self, fake_headlines_page_content):
+    def test_success(self, parser, fake_headlines_page_content):
         expected_result = [
             NewsHeadline(title='OKX to\n'
                                 '                                    adjust tick size of '
@@ -130,16 +138,83 @@ class TestExtractHeadlinesFromPage:
                          date=date(2025, 4, 9),
                          body_url='/help/okx-wallet-to-launch-cryptopedia-season-32')]
 
-        actual = OKXParser().extract_headlines_from_page(fake_headlines_page_content)
+        actual = parser.extract_headlines_from_page(fake_headlines_page_content)
 
         assert actual == expected_result
 
 
 class TestExtractNewsBodyFromPage:
 
-    def test_success(self, fake_news_body_page_content):
+    def test_success(self, parser, fake_news_body_page_content):
         expected = '<p>We are pleased to announce that USDT-margined perpetual futures for INIT will be enabled at 11:30 am UTC on April 24, 2025. The updates will cover both the web and app interfaces as well as the API. The details are as follows:</p><p><br/><b>I. Listing schedule</b></p><ul><li><p>INIT/USDT perpetual futures trading will open at 11:30 am UTC on April 24, 2025.</p></li></ul><p><br/><b>II. Perpetual futures trading</b></p><p><b>INIT perpetual futures:</b></p><p>Initia is an L1 blockchain that unites appchains to unlock their full value through interwoven infrastructure and aligned economics.</p><ul><li><p>Asset name: Initia</p></li><li><p>Ticker: INIT</p></li><li><p>Website：<a class="okui-powerLink-a11y" href="https://initia.xyz/" rel="noopener" target="_blank">https://initia.xyz/</a></p></li><li><p>Official X: <a class="okui-powerLink-a11y" href="https://x.com/initia" rel="noopener" target="_blank">https://x.com/initia</a></p></li></ul><div class="table-wrap"><table><tbody><tr><td><p><b>Features</b></p></td><td><p><b>Details</b></p></td></tr><tr><td><p>Underlying</p></td><td><p>INIT/USDT index</p></td></tr><tr><td><p>Settlement crypto</p></td><td><p>USDT</p></td></tr><tr><td><p>Face value</p></td><td><p>10</p></td></tr><tr><td><p>Price quotation</p></td><td><p>1 INIT value calculated in USDT equivalent</p></td></tr><tr><td><p>Tick size</p></td><td><p>0.0001</p></td></tr><tr><td><p>Leverage</p></td><td><p>0.01-20x</p></td></tr><tr><td><p>Funding rate</p></td><td><p>clamp [Average premium index + clamp (Interest rate – Average premium index, 0.05%, -0.05%), 1.50%, -1.50%]</p><p>For average premium index and interest rate calculations, refer to our <a class="okui-powerLink-a11y" href="/help/iv-introduction-to-perpetual-swap-funding-fee" rel="noopener">product documentation</a></p></td></tr><tr><td><p>Funding fee settlement interval</p></td><td><p>4 hours</p></td></tr><tr><td><p>Trading hours</p></td><td><p>24/7</p></td></tr></tbody></table></div><p>Note: To avoid unreasonable fees arising from significant premium fluctuations of a newly launched contract, the upper limit of the funding fee before 4:00 pm UTC on April 24, 2025 is 0.5%. After 4:00 pm UTC on April 24, 2025, the upper limit of the predicted funding fee will be adjusted back to the regular rate of 1.5%. (The funding fee for this period will be charged at 8:00 pm UTC on April 24, 2025.) <b>If there is a deviation from the contract price, the funding fee limit will be adjusted according to market conditions.</b></p><p><br/>The price limit rules of INIT USDT-margined perpetual futures trading are the same as those of other currencies. Please refer to our perpetual futures trading guides for further details.</p><p><br/>USDT-margined perpetual futures trading: <a class="okui-powerLink-a11y" href="/help/okx-perpetual-swap-trading-user-agreement" rel="noopener">OKX Perpetual Futures Trading User Agreement</a></p><p><br/>OKX team</p><p>April 24, 2025<br/></p>'
 
-        actual = OKXParser().extract_news_body_from_page(fake_news_body_page_content)
+        actual = parser.extract_news_body_from_page(fake_news_body_page_content)
 
         assert actual == expected
+
+    def test_serialization_same_as_bs4(self, parser):
+        page_content = (
+            '<html><body><div class="index_richTextContent_abc">'
+            '<div class="b  a" id=x><p title=\'say "hi"\' data-x="a&amp;b<c">t &amp; &lt;x&gt; &nbsp;é</p>'
+            '<!-- note --><p></p><img src=a alt="it\'s &quot;q&quot;"><br></div>tail'
+            '</div></body></html>'
+        )
+
+        actual = parser.extract_news_body_from_page(page_content)
+
+        assert actual == get_parser('bs4').extract_news_body_from_page(page_content)
+
+
+class TestParseDate:
+    @pytest.mark.parametrize('date_str, expected', [
+        ('Apr 17, 2025', date(2025, 4, 17)),
+        ('Sep 1, 2024', date(2024, 9, 1)),
+        ('december 31, 2023', date(2023, 12, 31)),
+    ])
+    def test_success(self, date_str, expected):
+        assert _parse_date(date_str) == expected
+
+    @pytest.mark.parametrize('date_str', ['Foo 17, 2025', 'Feb 30, 2025', 'Apr 17', 'Apr 17, 2025, 10:00'])
+    def test_malformed(self, date_str):
+        with pytest.raises(ValueError):
+            _parse_date(date_str)
+
+
+class TestMakeHeadlines:
+    def test_batch(self):
+        rows = [(f'news {i}', f'/help/{i}', f'Published on Apr {17 - i}, 2025') for i in range(3)]
+
+        actual = OKXParser()._make_headlines(rows)
+
+        assert actual == [OKXParser()._make_headline(*row) for row in rows]
+
+    def test_row_without_date(self):
+        rows = [('news 1', '/help/1', 'Published on Apr 17, 2025'), ('news 2', '/help/2', 'Published')]
+
+        with pytest.raises(ValueError, match='news 2'):
+            OKXParser()._make_headlines(rows)
+
+    def test_row_without_date_next_to_row_with_two_dates(self):
+        rows = [
+            ('news 1', '/help/1', 'Published'),
+            ('news 2', '/help/2', 'Published on Apr 17, 2025, updated. Published on Apr 16, 2025'),
+        ]
+
+        with pytest.raises(ValueError, match='news 1'):
+            OKXParser()._make_headlines(rows)
+
+    def test_date_of_every_row_is_its_own(self):
+        rows = [
+            ('news 1', '/help/1', 'Published on Apr 17, 2025, updated. Published on Apr 18, 2025'),
+            ('news 2', '/help/2', 'Published on Apr 16, 2025'),
+        ]
+
+        actual = OKXParser()._make_headlines(rows)
+
+        assert [h.date for h in actual] == [date(2025, 4, 17), date(2025, 4, 16)]
+
+
+class TestGetParser:
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            get_parser('regex')
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from src.domain.parser import OKXParser
+from src.domain.parsing_backend import ParsingBackend
+from src.infrastructure.config import BACKENDS
+
+CURRENT_DIR = os.path.dirname(__file__)
+
+
+@pytest.fixture(scope='module')
+def headlines_page_content() -> str:
+    with open(f'{CURRENT_DIR}/test_headlines_data.html', 'r') as f:
+        return f.read()
+
+
+@pytest.fixture(scope='module')
+def news_body_page_content() -> str:
+    with open(f'{CURRENT_DIR}/test_body.html', 'r') as f:
+        return f.read()
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    backend = ParsingBackend(OKXParser(), kind=request.param, workers=2)
+    yield backend
+    backend.close()
+
+
+class TestParsingBackend:
+    async def test_same_results_as_parser(self, backend, headlines_page_content, news_body_page_content):
+        parser = OKXParser()
+
+        assert await backend.get_pages_qty(headlines_page_content) == 143
+        assert (
+            await backend.extract_headlines_from_page(headlines_page_content)
+            == parser.extract_headlines_from_page(headlines_page_content)
+        )
+        assert (
+            await backend.extract_news_body_from_page(news_body_page_content)
+            == parser.extract_news_body_from_page(news_body_page_content)
+        )
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            ParsingBackend(OKXParser(), kind='gpu')
@@ -0,0 +1,87 @@
+import json
+from datetime import date
+
+import pytest
+
+from src.domain.partitioned_saver import PartitionedSaver, read_partition, MANIFEST
+from src.dto import NewsRecord
+
+
+def make_records(day: date, *titles: str, body: str = 'body') -> list[NewsRecord]:
+    return [NewsRecord(title=title, date=day, body=body) for title in titles]
+
+
+async def aiter(records):
+    for record in records:
+        yield record
+
+
+def load_manifest(folder) -> dict:
+    return json.loads((folder / MANIFEST).read_text())
+
+
+@pytest.fixture
+def records() -> list[NewsRecord]:
+    return make_records(date(2025, 4, 17), 'b', 'a') + make_records(date(2025, 4, 16), 'c')
+
+
+class TestSaveRecordsStream:
+    async def test_partitions_by_date(self, records, tmp_path):
+        changed = await PartitionedSaver().save_records_stream(aiter(records), str(tmp_path))
+
+        assert changed == [date(2025, 4, 16), date(2025, 4, 17)]
+        assert read_partition(tmp_path / '2025/04/17.ndjson') == sorted(records[:2], key=lambda r: r.title)
+        manifest = load_manifest(tmp_path)
+        assert manifest['partitions']['2025-04-17']['records'] == 2
+        assert manifest['partitions']['2025-04-16']['path'] == '2025/04/16.ndjson'
+
+    async def test_rerun_is_idempotent(self, records, tmp_path):
+        saver = PartitionedSaver(compression='gzip')
+        await saver.save_records_stream(aiter(records), str(tmp_path))
+        content = (tmp_path / '2025/04/17.ndjson.gz').read_bytes()
+        manifest = load_manifest(tmp_path)
+
+        changed = await saver.save_records_stream(aiter(reversed(records)), str(tmp_path))
+
+        assert changed == []
+        assert (tmp_path / '2025/04/17.ndjson.gz').read_bytes() == content
+        assert load_manifest(tmp_path) == manifest
+
+    async def test_new_records_are_appended(self, records, tmp_path):
+        saver = PartitionedSaver()
+        await saver.save_records_stream(aiter(records), str(tmp_path))
+
+        changed = await saver.save_records_stream(
+            aiter(make_records(date(2025, 4, 17), 'd') + records[2:]), str(tmp_path)
+        )
+
+        # only the changed day is rewritten, stored records of the day are kept
+        assert changed == [date(2025, 4, 17)]
+        assert [r.title for r in read_partition(tmp_path / '2025/04/17.ndjson')] == ['a', 'b', 'd']
+        assert load_manifest(tmp_path)['partitions']['2025-04-17']['records'] == 3
+
+    async def test_compression_change_replaces_partition(self, records, tmp_path):
+        await PartitionedSaver().save_records_stream(aiter(records), str(tmp_path))
+        await PartitionedSaver(compression='gzip').save_records_stream(
+            aiter(make_records(date(2025, 4, 16), 'd')), str(tmp_path)
+        )
+
+        assert not (tmp_path / '2025/04/16.ndjson').exists()
+        assert [r.title for r in read_partition(tmp_path / '2025/04/16.ndjson.gz')] == ['c', 'd']
+
+    async def test_zstd(self, records, tmp_path):
+        pytest.importorskip('zstandard')
+        await PartitionedSaver(compression='zstd').save_records_stream(aiter(records), str(tmp_path))
+
+        assert read_partition(tmp_path / '2025/04/16.ndjson.zst') == records[2:]
+
+    async def test_parquet(self, records, tmp_path):
+        pytest.importorskip('pyarrow')
+        await PartitionedSaver(fmt='parquet', compression='zstd').save_records_stream(aiter(records), str(tmp_path))
+
+        assert read_partition(tmp_path / '2025/04/16.parquet') == records[2:]
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        PartitionedSaver(compression='lz4')
@@ -1,6 +1,6 @@
 import pytest
-from unittest.mock import mock_open, patch
-from src.dto import NewsRecord
+from unittest.mock import patch
+from src.dto import NewsRecord, NewsRequest
 from datetime import date
 from src.domain.result_saver import FileToFolderSaver
 import json
@@ -27,13 +27,12 @@ def saver():
     return FileToFolderSaver()
 
 
-class TestSaveRecordsToFile:
+class TestSaveRecords:
     def test_creates_folder(self, saver, sample_records, tmp_path):
         folder = tmp_path / "new_folder"
         filename = "news.json"
 
-        with patch('builtins.open', mock_open()) as mocked_open:
-            saver.save_records_to_file(sample_records, str(folder), filename)
+        saver.save_records(sample_records, str(folder), filename)
 
         assert folder.exists()
         assert folder.is_dir()
@@ -43,7 +42,7 @@ class TestSaveRecordsToFile:
         filename = "data.json"
         filepath = folder / filename
 
-        saver.save_records_to_file(sample_records, str(folder), filename)
+        saver.save_records(sample_records, str(folder), filename)
 
         assert filepath.exists()
 
@@ -59,7 +58,7 @@ class TestSaveRecordsToFile:
         filename = "empty.json"
         filepath = folder / filename
 
-        saver.save_records_to_file([], str(folder), filename)
+        saver.save_records([], str(folder), filename)
 
         assert filepath.exists()
 
@@ -74,7 +73,7 @@ class TestSaveRecordsToFile:
 
         records = [NewsRecord(title="Test", date=date(2023, 1, 1), body="Test body")]
 
-        saver.save_records_to_file(records, str(folder), filename)
+        saver.save_records(records, str(folder), filename)
 
         assert (folder / filename).exists()
 
@@ -83,7 +82,7 @@ class TestSaveRecordsToFile:
         mock_mkdir.side_effect = PermissionError("No permissions")
 
         with pytest.raises(PermissionError):
-            saver.save_records_to_file(sample_records, "/protected/folder", "news.json")
+            saver.save_records(sample_records, "/protected/folder", "news.json")
 
     def test_json_serialization(self, saver, tmp_path):
         folder = tmp_path / "json_test"
@@ -93,9 +92,68 @@ class TestSaveRecordsToFile:
             NewsRecord(title="Test", date=date(2023, 1, 1), body="Body with \"quotes\"")
         ]
 
-        saver.save_records_to_file(records, str(folder), filename)
+        saver.save_records(records, str(folder), filename)
 
         with open(folder / filename, 'r') as f:
             content = json.load(f)
 
         assert content[0]["body"] == 'Body with "quotes"'
+
+
+async def _aiter(records):
+    for r in records:
+        yield r
+
+
+class TestSaveRecordsStream:
+    async def test_json_same_as_list_dump(self, saver, sample_records, tmp_path):
+        await saver.save_records_stream(_aiter(sample_records), str(tmp_path / 'stream'), 'news.json')
+
+        assert (tmp_path / 'stream' / 'news.json').read_text() == json.dumps([r.dump_dict() for r in sample_records])
+
+    async def test_ndjson(self, saver, sample_records, tmp_path):
+        qty = await saver.save_records_stream(_aiter(sample_records), str(tmp_path), 'news.ndjson', fmt='ndjson')
+
+        lines = (tmp_path / 'news.ndjson').read_text().splitlines()
+
+        assert qty == 2
+        assert [json.loads(line)['title'] for line in lines] == ['OKX Lists New Token', 'Maintenance Announcement']
+
+    async def test_empty_records(self, saver, tmp_path):
+        await saver.save_records_stream(_aiter([]), str(tmp_path), 'empty.json')
+
+        assert json.loads((tmp_path / 'empty.json').read_text()) == []
+
+    async def test_keeps_previous_file_on_error(self, saver, sample_records, tmp_path):
+        (tmp_path / 'news.json').write_text('[]')
+
+        async def failing_records():
+            yield sample_records[0]
+            raise RuntimeError('scraping failed')
+
+        with pytest.raises(RuntimeError):
+            await saver.save_records_stream(failing_records(), str(tmp_path), 'news.json')
+
+        assert (tmp_path / 'news.json').read_text() == '[]'
+        assert [p.name for p in tmp_path.iterdir()] == ['news.json']
+
+    async def test_unknown_format(self, saver, tmp_path):
+        with pytest.raises(ValueError):
+            await saver.save_records_stream(_aiter([]), str(tmp_path), 'news.csv', fmt='csv')
+
+
+class TestSaveRecordsByPeriods:
+    async def test_records_are_routed_to_their_periods(self, saver, sample_records, tmp_path):
+        async def records():
+            for record in sample_records:
+                yield record
+        first = NewsRequest(start_date=date(2023, 1, 1), end_date=date(2023, 1, 1))
+        both = NewsRequest(start_date=date(2023, 1, 1), end_date=date(2023, 1, 2))
+
+        qty = await saver.save_records_by_periods(
+            records(), str(tmp_path), {first: 'first.json', both: 'both.json'}
+        )
+
+        assert qty == {first: 1, both: 2}
+        assert [r['title'] for r in json.loads((tmp_path / 'first.json').read_text())] == ['OKX Lists New Token']
+        assert len(json.loads((tmp_path / 'both.json').read_text())) == 2
@@ -0,0 +1,52 @@
+"""okx.com stand-in for service tests: pages and articles are generated without any HTML"""
+from datetime import date, timedelta
+
+from src.dto import NewsHeadline
+
+PAGES_QTY = 100
+PAGE_SIZE = 15
+BODY_SIZE = 20 * 1024
+NEWEST_DATE = date(2025, 4, 17)
+
+
+class FakeProvider:
+    def __init__(self):
+        self.requested: list[str] = []
+
+    async def get_page_by_number(self, page_number: int) -> str:
+        self.requested.append(f'page {page_number}')
+        return f'page {page_number}'
+
+    async def get_main_page(self) -> str:
+        return await self.get_page_by_number(1)
+
+    async def get_news_page_by_url(self, url: str) -> str:
+        self.requested.append(url)
+        return url
+
+
+class FakeParser:
+    def get_pages_qty(self, page_content: str) -> int:
+        return PAGES_QTY
+
+    def extract_headlines_from_page(self, page_content: str) -> list[NewsHeadline]:
+        page_num = int(page_content.split()[-1])
+        return [
+            NewsHeadline(title=f'news {i}', date=NEWEST_DATE - timedelta(days=i // 3), body_url=f'/help/{i}')
+            for i in range((page_num - 1) * PAGE_SIZE, page_num * PAGE_SIZE)
+        ]
+
+    def extract_news_body_from_page(self, page_content: str) -> str:
+        return page_content.ljust(BODY_SIZE, '.')
+
+
+class PublishingParser(FakeParser):
+    """`published` news are announced after the first page was loaded, older headlines move to the next pages"""
+    published = 0
+
+    def extract_headlines_from_page(self, page_content: str) -> list[NewsHeadline]:
+        page_num = int(page_content.split()[-1])
+        return [
+            NewsHeadline(title=f'news {i}', date=NEWEST_DATE - timedelta(days=i // 3), body_url=f'/help/{i}')
+            for i in range((page_num - 1) * PAGE_SIZE - self.published, page_num * PAGE_SIZE - self.published)
+        ]
@@ -0,0 +1,88 @@
+from datetime import date, timedelta
+
+import pytest
+
+from src.dto import NewsRequest, NewsHeadline, NewsRecord
+from src.infrastructure.checkpoint import ScrapeCheckpoint
+
+NEWEST_DATE = date(2025, 4, 17)
+REQUEST = NewsRequest(start_date=NEWEST_DATE - timedelta(days=7), end_date=NEWEST_DATE)
+
+
+def make_headlines(page_num: int, prefix: str = 'news') -> list[NewsHeadline]:
+    return [
+        NewsHeadline(title=f'{prefix} {i}', date=NEWEST_DATE - timedelta(days=i), body_url=f'/help/{prefix}-{i}')
+        for i in range((page_num - 1) * 3, page_num * 3)
+    ]
+
+
+@pytest.fixture
+def path(tmp_path) -> str:
+    return str(tmp_path / 'results.checkpoint.ndjson')
+
+
+@pytest.fixture
+def journaled(path) -> list[NewsHeadline]:
+    checkpoint = ScrapeCheckpoint(path, REQUEST)
+    checkpoint.validate(make_headlines(1))
+    checkpoint.save_pages((1, 3))
+    checkpoint.save_headline_page(2, make_headlines(2))
+    checkpoint.save_record(NewsRecord(title='news 4', date=NEWEST_DATE - timedelta(days=4), body='body'))
+    checkpoint.close()
+    return make_headlines(2)
+
+
+class TestResume:
+    def test_roundtrip(self, path, journaled):
+        checkpoint = ScrapeCheckpoint(path, REQUEST, resume=True)
+        # nothing journaled is used before the newest headline is compared
+        assert checkpoint.pages is None
+        checkpoint.validate(make_headlines(1))
+
+        assert checkpoint.pages == (1, 3)
+        assert checkpoint.get_headline_page(2) == journaled
+        assert checkpoint.get_headline_page(3) is None
+        assert checkpoint.has_record(journaled[1])
+        assert not checkpoint.has_record(journaled[0])
+        assert list(checkpoint.iter_records()) == [
+            NewsRecord(title='news 4', date=NEWEST_DATE - timedelta(days=4), body='body')
+        ]
+
+    def test_without_resume_starts_over(self, path, journaled):
+        checkpoint = ScrapeCheckpoint(path, REQUEST)
+        checkpoint.validate(make_headlines(1))
+
+        assert checkpoint.pages is None
+        assert checkpoint.records_qty == 0
+
+    def test_other_period_starts_over(self, path, journaled):
+        request = NewsRequest(start_date=REQUEST.start_date, end_date=NEWEST_DATE + timedelta(days=1))
+        checkpoint = ScrapeCheckpoint(path, request, resume=True)
+        checkpoint.validate(make_headlines(1))
+
+        assert checkpoint.pages is None
+        assert checkpoint.records_qty == 0
+
+    def test_new_headline_drops_pages_keeps_records(self, path, journaled):
+        checkpoint = ScrapeCheckpoint(path, REQUEST, resume=True)
+        checkpoint.validate(make_headlines(1, prefix='newer'))
+
+        assert checkpoint.pages is None
+        assert checkpoint.get_headline_page(2) is None
+        assert checkpoint.records_qty == 1
+        checkpoint.save_pages((2, 4))
+        checkpoint.close()
+        # the new top is journaled, the next resume does not drop the pages again
+        checkpoint = ScrapeCheckpoint(path, REQUEST, resume=True)
+        checkpoint.validate(make_headlines(1, prefix='newer'))
+        assert checkpoint.pages == (2, 4)
+
+    def test_cut_last_line(self, path, journaled):
+        with open(path, 'a') as f:
+            f.write('{"record": {"title": "news')
+
+        checkpoint = ScrapeCheckpoint(path, REQUEST, resume=True)
+        checkpoint.validate(make_headlines(1))
+        checkpoint.save_record(NewsRecord(title='news 5', date=NEWEST_DATE - timedelta(days=5), body='body'))
+
+        assert [r.title for r in checkpoint.iter_records()] == ['news 4', 'news 5']
@@ -0,0 +1,60 @@
+from datetime import date
+
+import pytest
+
+from src.dto import NewsHeadline
+from src.infrastructure.dead_letters import DeadLetterQueue
+
+HEADLINES = [NewsHeadline(title=f'news {i}', date=date(2025, 4, 17), body_url=f'/help/{i}') for i in range(3)]
+
+
+@pytest.fixture
+def path(tmp_path) -> str:
+    return str(tmp_path / 'results.dead_letters.ndjson')
+
+
+def test_no_failures_no_file(path):
+    dead_letters = DeadLetterQueue(path)
+    dead_letters.discard(HEADLINES[0])
+    dead_letters.save()
+
+    assert not dead_letters
+    assert not dead_letters.path.exists()
+
+
+def test_attempts_are_counted_between_runs(path):
+    dead_letters = DeadLetterQueue(path)
+    dead_letters.add(HEADLINES[0], TimeoutError())
+    dead_letters.add(HEADLINES[1], TimeoutError())
+    dead_letters.close()
+
+    dead_letters = DeadLetterQueue(path)
+    letter = dead_letters.add(HEADLINES[0], ValueError('bad body'))
+    dead_letters.discard(HEADLINES[1])
+    dead_letters.close()
+
+    assert letter.attempts == 2
+    assert [(l.headline, l.attempts, l.error) for l in DeadLetterQueue(path)] == [
+        (HEADLINES[0], 2, "ValueError('bad body')")
+    ]
+
+
+def test_save_compacts_file(path):
+    dead_letters = DeadLetterQueue(path)
+    for headline in HEADLINES:
+        dead_letters.add(headline, TimeoutError())
+    dead_letters.discard(HEADLINES[0])
+    dead_letters.save()
+
+    with open(path) as f:
+        assert len(f.readlines()) == 2
+    assert len(DeadLetterQueue(path)) == 2
+
+
+def test_fresh_run_drops_old_letters(path):
+    dead_letters = DeadLetterQueue(path)
+    dead_letters.add(HEADLINES[0], TimeoutError())
+    dead_letters.close()
+
+    assert not DeadLetterQueue(path, resume=False)
+    assert not DeadLetterQueue(path)
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from src.infrastructure.http_cache import FileHTTPCache, CachedResponse
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FileHTTPCache(str(tmp_path / 'cache'), max_size=10 * 1024)
+
+
+class TestFileHTTPCache:
+    def test_miss(self, cache):
+        assert cache.get('https://www.okx.com/help/1') is None
+        assert cache.stats.misses == 1
+        assert cache.stats.hits == 0
+
+    def test_put_and_get(self, cache):
+        url = 'https://www.okx.com/help/1'
+        cache.put(url, '<html></html>', etag='"abc"', last_modified='Wed, 21 Oct 2015 07:28:00 GMT')
+
+        actual = cache.get(url)
+
+        assert actual == CachedResponse(url, '<html></html>', '"abc"', 'Wed, 21 Oct 2015 07:28:00 GMT')
+        assert actual.conditional_headers() == {
+            'If-None-Match': '"abc"',
+            'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT',
+        }
+        assert cache.stats.hits == 1
+
+    def test_skips_response_without_validators(self, cache):
+        url = 'https://www.okx.com/help/1'
+        cache.put(url, '<html></html>', etag=None, last_modified=None)
+
+        assert cache.get(url) is None
+
+    def test_persisted(self, tmp_path):
+        url = 'https://www.okx.com/help/1'
+        FileHTTPCache(str(tmp_path), max_size=1024).put(url, 'body', etag='"1"', last_modified=None)
+
+        assert FileHTTPCache(str(tmp_path), max_size=1024).get(url).body == 'body'
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = FileHTTPCache(str(tmp_path), max_size=13 * 1024)
+        body = 'x' * 4 * 1024
+        for i in range(3):
+            cache.put(f'url{i}', body, etag=f'"{i}"', last_modified=None)
+            # make access order independent of the filesystem timestamp resolution
+            os.utime(cache._path(f'url{i}'), (i, i))
+        os.utime(cache._path('url0'), (10, 10))
+
+        cache.put('url3', body, etag='"3"', last_modified=None)
+
+        assert cache.get('url1') is None
+        assert cache.get('url0') is not None
+        assert cache.get('url2') is not None
+        assert cache.get('url3') is not None
@@ -0,0 +1,51 @@
+import pytest
+
+from src.infrastructure.metrics import Metrics
+
+
+@pytest.fixture
+def metrics():
+    return Metrics()
+
+
+def test_summary(metrics):
+    metrics.inc('requests_total', endpoint='article', status=200)
+    metrics.inc('requests_total', endpoint='article', status=200)
+    metrics.inc('records_total', 3)
+    metrics.set('hit_ratio', .5, endpoint='article')
+    metrics.observe('request_seconds', .2, endpoint='article')
+    metrics.observe('request_seconds', .4, endpoint='article')
+
+    assert metrics.summary() == {
+        'counters': {
+            'records_total': {'': 3},
+            'requests_total': {'endpoint=article,status=200': 2},
+        },
+        'gauges': {'hit_ratio': {'endpoint=article': .5}},
+        'histograms': {
+            'request_seconds': {'endpoint=article': {'count': 2, 'sum': .6, 'mean': .3, 'max': .4}},
+        },
+    }
+
+
+def test_prometheus(metrics):
+    metrics.inc('requests_total', endpoint='article', status=200)
+    metrics.observe('request_seconds', .3)
+    metrics.observe('request_seconds', 20)
+
+    text = metrics.prometheus()
+
+    assert '# TYPE requests_total counter\nrequests_total{endpoint="article",status="200"} 1.0\n' in text
+    assert '# TYPE request_seconds histogram\n' in text
+    assert 'request_seconds_bucket{le="0.25"} 0\n' in text
+    assert 'request_seconds_bucket{le="0.5"} 1\n' in text
+    assert 'request_seconds_bucket{le="+Inf"} 2\n' in text
+    assert 'request_seconds_sum 20.3\nrequest_seconds_count 2\n' in text
+
+
+def test_timer(metrics):
+    with pytest.raises(ValueError):
+        with metrics.timer('parse_seconds', operation='body'):
+            raise ValueError
+
+    assert metrics.summary()['histograms']['parse_seconds']['operation=body']['count'] == 1
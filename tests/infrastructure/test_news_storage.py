@@ -0,0 +1,141 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from src.dto import NewsRecord, NewsHeadline, content_hash
+from src.infrastructure import news_storage
+from src.infrastructure.news_storage import SQLiteNewsStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteNewsStorage(str(tmp_path / 'news.db'))
+    yield storage
+    storage.close()
+
+
+class TestRecords:
+    def test_empty(self, storage):
+        assert storage.is_empty()
+        assert storage.get_records_by_period(date(2025, 1, 1), date(2025, 1, 31)) == []
+
+    def test_save_and_get_by_period(self, storage):
+        storage.save_records([
+            NewsRecord(title='first', date=date(2025, 1, 1), body='body 1'),
+            NewsRecord(title='second', date=date(2025, 1, 2), body='body 2'),
+            NewsRecord(title='third', date=date(2025, 1, 3), body='body 3'),
+        ])
+
+        actual = storage.get_records_by_period(date(2025, 1, 2), date(2025, 1, 3))
+
+        assert not storage.is_empty()
+        assert [r.title for r in actual] == ['third', 'second']
+
+    def test_upsert_keeps_body_url(self, storage):
+        headline = NewsHeadline(title='first', date=date(2025, 1, 1), body_url='/help/first')
+        storage.save_record(NewsRecord(title='first', date=date(2025, 1, 1), body='old'), body_url='/help/first')
+        storage.save_records([NewsRecord(title='first', date=date(2025, 1, 1), body='new')])
+
+        actual = storage.get_records_by_period(date(2025, 1, 1), date(2025, 1, 1))
+
+        assert storage.has_record(headline)
+        assert actual == [NewsRecord(title='first', date=date(2025, 1, 1), body='new')]
+
+    def test_save_record_detects_changes(self, storage):
+        record = NewsRecord(title='first', date=date(2025, 1, 1), body='body', body_url='/help/first')
+
+        assert storage.save_record(record)
+        assert not storage.save_record(record)
+        assert storage.save_record(NewsRecord(title='first', date=date(2025, 1, 1), body='edited'))
+
+    def test_body_is_hashed_once_per_save(self, storage, monkeypatch):
+        hashed = []
+        monkeypatch.setattr(news_storage, 'content_hash', lambda text: hashed.append(text) or content_hash(text))
+
+        storage.save_record(NewsRecord(title='first', date=date(2025, 1, 1), body='body 1'))
+        storage.save_records([NewsRecord(title='second', date=date(2025, 1, 2), body='body 2')])
+
+        assert hashed == ['body 1', 'body 2']
+
+    def test_headline_with_another_url_is_not_stored(self, storage):
+        storage.save_record(NewsRecord(title='first', date=date(2025, 1, 1), body='body'), body_url='/help/first')
+
+        assert not storage.has_record(NewsHeadline(title='first', date=date(2025, 1, 1), body_url='/help/other'))
+
+    def test_edited_headline_replaces_the_old_one(self, storage):
+        storage.save_record(NewsRecord(title='first', date=date(2025, 1, 1), body='body', body_url='/help/first'))
+
+        changed = storage.save_record(
+            NewsRecord(title='first (edited)', date=date(2025, 1, 1), body='body', body_url='/help/first')
+        )
+
+        assert changed
+        assert [r.title for r in storage.get_records_by_period(date(2025, 1, 1), date(2025, 1, 1))] == [
+            'first (edited)'
+        ]
+
+    def test_hashes_of_old_storage_are_filled(self, tmp_path):
+        path = str(tmp_path / 'old.db')
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            '''
+            CREATE TABLE news (date TEXT NOT NULL, title TEXT NOT NULL, body_url TEXT, body TEXT,
+                               PRIMARY KEY (date, title));
+            INSERT INTO news VALUES ('2025-01-01', 'first', '/help/first', 'body');
+            '''
+        )
+        conn.close()
+
+        storage = SQLiteNewsStorage(path)
+
+        assert not storage.save_record(NewsRecord(title='first', date=date(2025, 1, 1), body='body'))
+        storage.close()
+
+    def test_persisted_between_connections(self, tmp_path):
+        path = str(tmp_path / 'news.db')
+        storage = SQLiteNewsStorage(path)
+        storage.save_records([NewsRecord(title='first', date=date(2025, 1, 1), body='body')])
+        storage.mark_covered(date(2025, 1, 1), date(2025, 1, 1))
+        storage.close()
+
+        storage = SQLiteNewsStorage(path)
+
+        assert storage.is_period_covered(date(2025, 1, 1), date(2025, 1, 1))
+        assert len(storage.get_records_by_period(date(2025, 1, 1), date(2025, 1, 1))) == 1
+        storage.close()
+
+
+class TestCoverage:
+    def test_merges_adjacent_and_overlapping(self, storage):
+        storage.mark_covered(date(2025, 1, 1), date(2025, 1, 5))
+        storage.mark_covered(date(2025, 1, 6), date(2025, 1, 10))
+        storage.mark_covered(date(2025, 1, 20), date(2025, 1, 25))
+        storage.mark_covered(date(2025, 1, 9), date(2025, 1, 12))
+
+        assert storage.get_covered_periods() == [
+            (date(2025, 1, 1), date(2025, 1, 12)),
+            (date(2025, 1, 20), date(2025, 1, 25)),
+        ]
+
+    def test_uncovered_periods(self, storage):
+        storage.mark_covered(date(2025, 1, 5), date(2025, 1, 10))
+        storage.mark_covered(date(2025, 1, 15), date(2025, 1, 20))
+
+        actual = storage.get_uncovered_periods(date(2025, 1, 1), date(2025, 1, 31))
+
+        assert actual == [
+            (date(2025, 1, 1), date(2025, 1, 4)),
+            (date(2025, 1, 11), date(2025, 1, 14)),
+            (date(2025, 1, 21), date(2025, 1, 31)),
+        ]
+
+    def test_period_covered(self, storage):
+        storage.mark_covered(date(2025, 1, 5), date(2025, 1, 10))
+
+        assert storage.is_period_covered(date(2025, 1, 6), date(2025, 1, 10))
+        assert not storage.is_period_covered(date(2025, 1, 6), date(2025, 1, 11))
+        assert storage.get_uncovered_periods(date(2025, 1, 6), date(2025, 1, 10)) == []
+
+    def test_empty_period_has_no_gaps(self, storage):
+        assert storage.get_uncovered_periods(date(2025, 1, 11), date(2025, 1, 10)) == []
@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+
+import pytest
+
+from src.dto import NewsHeadline
+from src.infrastructure.page_index import PageDateIndex
+
+PAGE_SIZE = 3
+NEWEST_DATE = date(2025, 4, 17)
+
+
+def make_headlines(qty: int, prefix: str = 'news') -> list[NewsHeadline]:
+    """one headline per day starting from NEWEST_DATE"""
+    return [
+        NewsHeadline(title=f'{prefix} {i}', date=NEWEST_DATE - timedelta(days=i), body_url=f'/help/{prefix}-{i}')
+        for i in range(qty)
+    ]
+
+
+def get_page(headlines: list[NewsHeadline], page_num: int) -> list[NewsHeadline]:
+    return headlines[(page_num - 1) * PAGE_SIZE:page_num * PAGE_SIZE]
+
+
+@pytest.fixture
+def headlines() -> list[NewsHeadline]:
+    return make_headlines(30)
+
+
+@pytest.fixture
+def index(headlines) -> PageDateIndex:
+    index = PageDateIndex()
+    index.align(get_page(headlines, 1), pages_qty=10)
+    for page_num in range(1, 11):
+        index.add_page(page_num, get_page(headlines, page_num))
+    return index
+
+
+class TestEstimatePage:
+    def test_empty_index(self):
+        assert PageDateIndex().estimate_page(NEWEST_DATE) is None
+
+    @pytest.mark.parametrize('days_ago, expected_page', [(0, 1), (2, 1), (3, 2), (10, 4), (11, 4), (29, 10)])
+    def test_exact_page(self, index, days_ago, expected_page):
+        actual = index.estimate_page(NEWEST_DATE - timedelta(days=days_ago))
+
+        assert actual == expected_page
+
+    def test_newer_than_indexed(self, index):
+        assert index.estimate_page(NEWEST_DATE + timedelta(days=1)) == 1
+
+    def test_older_than_indexed(self, index):
+        assert index.estimate_page(date(2000, 1, 1)) == 10
+
+
+class TestAlign:
+    def test_shift_on_published_news(self, index, headlines):
+        headlines = make_headlines(2, prefix='new') + headlines
+
+        index.align(get_page(headlines, 1), pages_qty=11)
+
+        assert index.shift == 2
+        # 10 days ago headline moved from the 4th page to the 5th one
+        assert index.estimate_page(NEWEST_DATE - timedelta(days=10)) == 5
+
+    def test_shift_accumulates(self, index, headlines):
+        headlines = make_headlines(1, prefix='first') + headlines
+        index.align(get_page(headlines, 1), pages_qty=11)
+        headlines = make_headlines(2, prefix='second') + headlines
+        index.align(get_page(headlines, 1), pages_qty=11)
+
+        assert index.shift == 3
+
+    def test_shift_estimated_when_top_is_not_on_first_page(self, index, headlines):
+        headlines = make_headlines(7, prefix='new') + headlines
+
+        index.align(get_page(headlines, 1), pages_qty=13)
+
+        assert index.shift == 9
+
+
+class TestPersistence:
+    def test_save_and_load(self, index, headlines, tmp_path):
+        path = tmp_path / 'index.json'
+        index._path = path
+        index.save()
+
+        loaded = PageDateIndex(str(path))
+
+        assert len(loaded) == len(index)
+        assert loaded.pages_qty == 10
+        assert loaded.estimate_page(NEWEST_DATE - timedelta(days=10)) == 4
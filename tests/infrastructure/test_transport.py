@@ -0,0 +1,83 @@
+from datetime import date
+
+import pytest
+from aiohttp import ClientResponseError
+
+from benchmarks.stand_in import StandInSite, serve
+from src.domain.page_provider import OKXPageProvider
+from src.infrastructure.config import config
+from src.infrastructure.transport import TransportStats, open_session
+
+
+async def test_session_settings(monkeypatch):
+    monkeypatch.setattr(config, 'HTTP_TOTAL_TIMEOUT', 7.)
+    monkeypatch.setattr(config, 'HTTP_DNS_CACHE_TTL', 60)
+
+    session = open_session({'user-agent': 'test'}, TransportStats())
+
+    assert session.timeout.total == 7.
+    assert session.timeout.connect == config.HTTP_CONNECT_TIMEOUT
+    assert session.timeout.sock_read == config.HTTP_READ_TIMEOUT
+    assert session.connector.limit_per_host == config.LIMIT_RPS
+    assert session.connector.use_dns_cache
+    assert not session.connector.force_close
+    await session.close()
+
+
+@pytest.mark.parametrize('keepalive, opened', [(30., 1), (0., 3)])
+async def test_connections_are_reused(monkeypatch, keepalive, opened):
+    monkeypatch.setattr(config, 'HTTP_KEEPALIVE_TIMEOUT', keepalive)
+    site = StandInSite(pages_qty=3, newest=date(2025, 4, 17))
+
+    async with serve(site) as base_url:
+        monkeypatch.setattr(config, 'OKX_URL', base_url)
+        async with OKXPageProvider(stream_cutoff=False) as provider:
+            for position in range(3):
+                await provider.get_news_page_by_url(site.headline(position)[1])
+
+    assert provider._session is None
+    assert provider.transport_stats == TransportStats(connections_opened=opened, connections_reused=3 - opened)
+
+
+async def test_closed_provider_reopens_session(monkeypatch):
+    site = StandInSite(pages_qty=3, newest=date(2025, 4, 17))
+
+    async with serve(site) as base_url:
+        monkeypatch.setattr(config, 'OKX_URL', base_url)
+        provider = OKXPageProvider(stream_cutoff=False)
+        await provider.get_main_page()
+        await provider.close()
+        page = await provider.get_page_by_number(2)
+        await provider.close()
+
+    assert site.render_page(2) == page
+    assert provider.transport_stats.connections_opened == 2
+
+
+class TestHTTP2Session:
+    @pytest.fixture
+    def httpx(self):
+        return pytest.importorskip('httpx')
+
+    async def test_response_facade(self, httpx, monkeypatch):
+        def handler(request):
+            if request.url.path == '/missing':
+                return httpx.Response(404)
+            return httpx.Response(200, headers={'ETag': '"v1"'}, text='<html>page</html>')
+
+        stats = TransportStats()
+        session = open_session({'user-agent': 'test'}, stats, http2=True)
+        monkeypatch.setattr(session, '_client', httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+        resp = await session.get(url='https://www.okx.com/page')
+        missing = await session.get(url='https://www.okx.com/missing', headers={'If-None-Match': '"v1"'})
+        await session.close()
+
+        assert resp.status == 200
+        assert resp.headers.get('ETag') == '"v1"'
+        assert await resp.text() == '<html>page</html>'
+        assert (await resp.read()).decode(resp.get_encoding()) == '<html>page</html>'
+        resp.raise_for_status()
+        with pytest.raises(ClientResponseError) as e:
+            missing.raise_for_status()
+        assert e.value.status == 404
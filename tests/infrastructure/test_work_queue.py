@@ -0,0 +1,78 @@
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from src.dto import NewsRequest
+from src.infrastructure.work_queue import SQLiteWorkQueue, DONE, FAILED, PENDING, RUNNING
+
+REQUEST = NewsRequest(start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+PERIODS = [
+    NewsRequest(start_date=date(2024, 7, 1), end_date=date(2024, 12, 31)),
+    NewsRequest(start_date=date(2024, 1, 1), end_date=date(2024, 7, 1)),
+]
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / 'queue.db'), lease=60, max_attempts=2)
+    queue.enqueue(REQUEST, PERIODS)
+    yield queue
+    queue.close()
+
+
+def test_claim_in_order(queue):
+    first = queue.claim('w1')
+    second = queue.claim('w2')
+
+    assert first.backfill == second.backfill == REQUEST
+    assert [first.period, second.period] == PERIODS
+    assert queue.claim('w3') is None
+    assert queue.progress(REQUEST) == {RUNNING: 2}
+
+
+def test_is_planned(queue):
+    assert queue.is_planned(REQUEST)
+    assert not queue.is_planned(NewsRequest(start_date=date(2024, 1, 1), end_date=date(2024, 1, 2)))
+
+
+def test_complete(queue):
+    shard = queue.claim('w1')
+
+    queue.complete(shard, 'w1')
+
+    assert queue.progress(REQUEST) == {DONE: 1, PENDING: 1}
+
+
+def test_failed_shard_is_retried_until_max_attempts(queue):
+    shard = queue.claim('w1')
+    queue.fail(shard, 'w1', 'boom')
+    assert queue.claim('w2').shard_id == shard.shard_id
+
+    queue.fail(shard, 'w2', 'boom')
+
+    assert queue.progress(REQUEST) == {FAILED: 1, PENDING: 1}
+    assert queue.claim('w3').shard_id != shard.shard_id
+
+
+def test_expired_lease_is_claimed_again(queue, tmp_path):
+    shard = queue.claim('crashed')
+    other_worker_queue = SQLiteWorkQueue(str(tmp_path / 'queue.db'), lease=60, max_attempts=2)
+
+    with patch('time.time', return_value=10 ** 10):
+        reclaimed = other_worker_queue.claim('w2')
+
+    assert reclaimed.shard_id == shard.shard_id
+    assert not queue.renew(shard, 'crashed')
+    assert other_worker_queue.renew(reclaimed, 'w2')
+    other_worker_queue.close()
+
+
+def test_expired_lease_of_last_attempt_fails_the_shard(queue):
+    shard = queue.claim('w1')
+    queue.fail(shard, 'w1', 'boom')
+    assert queue.claim('killed').shard_id == shard.shard_id
+
+    with patch('time.time', return_value=10 ** 10):
+        assert queue.progress(REQUEST) == {FAILED: 1, PENDING: 1}
+        assert queue.claim('w2').shard_id != shard.shard_id
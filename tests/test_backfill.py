@@ -0,0 +1,84 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from src.backfill import ShardedBackfill
+from src.domain.parsing_backend import ParsingBackend
+from src.dto import NewsRequest, NewsRecord
+from src.infrastructure.news_storage import SQLiteNewsStorage
+from src.infrastructure.work_queue import SQLiteWorkQueue
+from src.service import OKXScrapingService
+from tests.fake_okx import FakeProvider, FakeParser, PublishingParser, NEWEST_DATE
+
+# pages 3-10
+REQUEST = NewsRequest(start_date=NEWEST_DATE - timedelta(days=49), end_date=NEWEST_DATE - timedelta(days=10))
+
+
+def make_backfill(tmp_path, worker: str, parser: FakeParser | None = None) -> ShardedBackfill:
+    service = OKXScrapingService(
+        storage=SQLiteNewsStorage(str(tmp_path / 'news.db')),
+        page_provider=FakeProvider(),
+        parser=ParsingBackend(parser or FakeParser()),
+    )
+    return ShardedBackfill(service, SQLiteWorkQueue(str(tmp_path / 'queue.db')), worker=worker)
+
+
+async def test_shards_are_merged(tmp_path):
+    backfill = make_backfill(tmp_path, 'planner')
+    assert await backfill.plan(REQUEST, shard_pages=3) == 3
+
+    workers = [make_backfill(tmp_path, f'worker-{i}') for i in range(2)]
+    completed = await asyncio.gather(*[w.work() for w in workers])
+
+    records = list(backfill.iter_results(REQUEST))
+    assert sum(completed) == 3
+    assert len(records) == 40 * 3
+    assert len({(r.date, r.title) for r in records}) == len(records)
+    assert [r.date for r in records] == sorted((r.date for r in records), reverse=True)
+
+
+async def test_shards_are_located_again_after_new_announcements(tmp_path):
+    parser = PublishingParser()
+    backfill = make_backfill(tmp_path, 'planner', parser)
+    assert await backfill.plan(REQUEST, shard_pages=3) == 3
+
+    # older headlines moved down by more than two pages since the planning
+    parser.published = 40
+    assert await make_backfill(tmp_path, 'worker', parser).work() == 3
+
+    records = list(backfill.iter_results(REQUEST))
+    assert len(records) == 40 * 3
+    assert {r.date for r in records} == {NEWEST_DATE - timedelta(days=d) for d in range(10, 50)}
+    assert backfill._storage.is_period_covered(REQUEST.start_date, REQUEST.end_date)
+
+
+async def test_plan_is_not_repeated(tmp_path):
+    backfill = make_backfill(tmp_path, 'planner')
+
+    await backfill.plan(REQUEST, shard_pages=3)
+
+    assert await backfill.plan(REQUEST, shard_pages=3) == 0
+
+
+async def test_restarted_shard_loads_only_missing_articles(tmp_path):
+    backfill = make_backfill(tmp_path, 'worker')
+    await backfill.plan(REQUEST, shard_pages=10)
+    # the crashed run has stored page 5 already
+    stored = FakeParser().extract_headlines_from_page('page 5')
+    for headline in stored:
+        backfill._storage.save_record(NewsRecord(title=headline.title, date=headline.date, body='body'))
+
+    await backfill.work()
+
+    requested = set(backfill._service.page_provider.requested)
+    assert not {h.body_url for h in stored} & requested
+    assert len(list(backfill.iter_results(REQUEST))) == 40 * 3
+
+
+async def test_results_of_unfinished_backfill(tmp_path):
+    backfill = make_backfill(tmp_path, 'planner')
+    await backfill.plan(REQUEST, shard_pages=3)
+
+    with pytest.raises(RuntimeError):
+        list(backfill.iter_results(REQUEST))
@@ -0,0 +1,640 @@
+import asyncio
+import math
+import random
+import tracemalloc
+from datetime import date, datetime, timedelta
+from typing import Iterable
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.domain.parsing_backend import ParsingBackend
+from src.domain.result_saver import FileToFolderSaver
+from src.dto import NewsRequest
+from src.infrastructure.checkpoint import ScrapeCheckpoint
+from src.infrastructure.dead_letters import DeadLetterQueue
+from src.infrastructure.news_storage import SQLiteNewsStorage
+from src.infrastructure.page_index import PageDateIndex
+from src.service import (
+    OKXScrapingService, _merge_periods, _merge_page_ranges, _oldest_date, max_boundary_fetches
+)
+from src.dto import NewsHeadline, NewsRecord, PageHeadlines
+from tests.fake_okx import FakeProvider, FakeParser, PublishingParser, PAGES_QTY, PAGE_SIZE, BODY_SIZE, NEWEST_DATE
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = OKXScrapingService(page_provider=FakeProvider(), parser=ParsingBackend(FakeParser()))
+    monkeypatch.setattr(service, '_search_pages', AsyncMock(return_value=(1, PAGES_QTY)))
+    return service
+
+
+async def test_full_history_export_memory_is_bounded(service, tmp_path):
+    request = NewsRequest(start_date=date(2000, 1, 1), end_date=NEWEST_DATE)
+    exported_size = PAGES_QTY * PAGE_SIZE * BODY_SIZE
+
+    tracemalloc.start()
+    try:
+        qty = await FileToFolderSaver().save_records_stream(
+            service.iter_news_by_period(request), str(tmp_path), filename='results.json'
+        )
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert qty == PAGES_QTY * PAGE_SIZE
+    # bodies are streamed to the file, only the bounded queues and caches are kept in memory
+    assert peak_memory < exported_size / 4
+
+
+class Interrupted(Exception):
+    pass
+
+
+async def test_resume_from_checkpoint(tmp_path, monkeypatch):
+    request = NewsRequest(start_date=NEWEST_DATE - timedelta(days=14), end_date=NEWEST_DATE)
+    path = str(tmp_path / 'results.checkpoint.ndjson')
+    monkeypatch.setattr(OKXScrapingService, '_search_pages', AsyncMock(return_value=(1, 3)))
+
+    service = OKXScrapingService(
+        page_provider=FakeProvider(), parser=ParsingBackend(FakeParser()),
+        checkpoint=ScrapeCheckpoint(path, request),
+    )
+    scraped = []
+    with pytest.raises(Interrupted):
+        async for record in service.iter_news_by_period(request):
+            scraped.append(record)
+            if len(scraped) == 10:
+                raise Interrupted
+    service.checkpoint.close()
+
+    provider = FakeProvider()
+    checkpoint = ScrapeCheckpoint(path, request, resume=True)
+    service = OKXScrapingService(page_provider=provider, parser=ParsingBackend(FakeParser()), checkpoint=checkpoint)
+    records = await service.get_news_by_period(request)
+    checkpoint.close()
+
+    assert len({(r.date, r.title) for r in records}) == len(records) == 3 * PAGE_SIZE
+    assert records[:10] == scraped
+    # headline pages and records of the first run are not requested again
+    assert provider.requested.count('page 1') == 1
+    assert not {r.body.rstrip('.') for r in scraped} & set(provider.requested)
+
+
+class FailingProvider(FakeProvider):
+    def __init__(self, failing_urls: set[str]):
+        super().__init__()
+        self.failing_urls = failing_urls
+
+    async def get_news_page_by_url(self, url: str) -> str:
+        content = await super().get_news_page_by_url(url)
+        if url in self.failing_urls:
+            raise TimeoutError(url)
+        return content
+
+
+async def test_failed_articles_are_dead_lettered_and_retried(tmp_path, monkeypatch):
+    request = NewsRequest(start_date=NEWEST_DATE - timedelta(days=14), end_date=NEWEST_DATE)
+    monkeypatch.setattr(OKXScrapingService, '_search_pages', AsyncMock(return_value=(1, 3)))
+    dead_letters = DeadLetterQueue(str(tmp_path / 'results.dead_letters.ndjson'))
+    service = OKXScrapingService(
+        page_provider=FailingProvider({'/help/3', '/help/40'}), parser=ParsingBackend(FakeParser()),
+        dead_letters=dead_letters,
+    )
+
+    records = await service.get_news_by_period(request)
+
+    # the rest of the batch is finished
+    assert len(records) == 3 * PAGE_SIZE - 2
+    assert {letter.url for letter in dead_letters} == {'/help/3', '/help/40'}
+
+    provider = FailingProvider({'/help/40'})
+    service = OKXScrapingService(page_provider=provider, parser=ParsingBackend(FakeParser()), dead_letters=dead_letters)
+    recovered = [record async for record in service.retry_dead_letters()]
+
+    # only the dead letters are loaded again
+    assert sorted(provider.requested) == ['/help/3', '/help/40']
+    assert [r.title for r in recovered] == ['news 3']
+    assert [(letter.url, letter.attempts) for letter in DeadLetterQueue(str(dead_letters.path))] == [('/help/40', 2)]
+
+
+async def test_without_dead_letters_failure_aborts(service, monkeypatch):
+    service.page_provider = FailingProvider({'/help/1'})
+    with pytest.raises(ExceptionGroup):
+        await service.get_news_by_period(NewsRequest(start_date=NEWEST_DATE, end_date=NEWEST_DATE))
+
+
+class BlockingProvider(FakeProvider):
+    """page 2 is served only after an article of page 1 was requested"""
+    def __init__(self):
+        super().__init__()
+        self.article_requested = asyncio.Event()
+
+    async def get_page_by_number(self, page_number: int) -> str:
+        if page_number == 2:
+            await self.article_requested.wait()
+        return await super().get_page_by_number(page_number)
+
+    async def get_news_page_by_url(self, url: str) -> str:
+        self.article_requested.set()
+        return await super().get_news_page_by_url(url)
+
+
+async def test_bodies_are_loaded_while_headline_pages_are_in_flight(monkeypatch):
+    provider = BlockingProvider()
+    service = OKXScrapingService(page_provider=provider, parser=ParsingBackend(FakeParser()))
+    monkeypatch.setattr(service, '_search_pages', AsyncMock(return_value=(1, 2)))
+    request = NewsRequest(start_date=NEWEST_DATE - timedelta(days=9), end_date=NEWEST_DATE)
+
+    records = await asyncio.wait_for(service.get_news_by_period(request), timeout=5)
+
+    assert len(records) == 2 * PAGE_SIZE
+    assert provider.requested.index('page 2') > provider.requested.index('/help/0')
+
+
+async def test_headlines_out_of_period_are_not_loaded(monkeypatch):
+    provider = FakeProvider()
+    service = OKXScrapingService(page_provider=provider, parser=ParsingBackend(FakeParser()))
+    # page 1 holds news of days 0-4, the period covers days 1-2 only
+    monkeypatch.setattr(service, '_search_pages', AsyncMock(return_value=(1, 1)))
+    request = NewsRequest(start_date=NEWEST_DATE - timedelta(days=2), end_date=NEWEST_DATE - timedelta(days=1))
+
+    records = await service.get_news_by_period(request)
+
+    assert sorted(r.title for r in records) == [f'news {i}' for i in range(3, 9)]
+    assert sorted(r for r in provider.requested if not r.startswith('page')) == [f'/help/{i}' for i in range(3, 9)]
+
+
+class FailingPageProvider(FakeProvider):
+    async def get_page_by_number(self, page_number: int) -> str:
+        if page_number == 2:
+            raise TimeoutError(f'page {page_number}')
+        return await super().get_page_by_number(page_number)
+
+
+async def test_headline_page_failure_aborts(service):
+    service.page_provider = FailingPageProvider()
+    service._search_pages.return_value = (1, 2)
+
+    with pytest.raises(ExceptionGroup) as error:
+        await service.get_news_by_period(NewsRequest(start_date=date(2000, 1, 1), end_date=NEWEST_DATE))
+
+    assert error.group_contains(TimeoutError)
+
+
+async def test_pipeline_is_cancelled_when_consumer_stops(service):
+    tasks_before = asyncio.all_tasks()
+    records = service.iter_news_by_period(NewsRequest(start_date=date(2000, 1, 1), end_date=NEWEST_DATE))
+
+    await anext(records)
+    await records.aclose()
+
+    pipeline_tasks = asyncio.all_tasks() - tasks_before
+    await asyncio.wait(pipeline_tasks, timeout=5)
+    assert all(task.done() for task in pipeline_tasks)
+    requested_qty = len(service.page_provider.requested)
+    await asyncio.sleep(0.01)
+    assert len(service.page_provider.requested) == requested_qty
+    assert requested_qty < PAGES_QTY * PAGE_SIZE
+
+
+class HangingProvider(FakeProvider):
+    """articles are never served"""
+    async def get_news_page_by_url(self, url: str) -> str:
+        await asyncio.Event().wait()
+
+
+async def test_pipeline_is_cancelled_with_its_consumer(service):
+    service.page_provider = HangingProvider()
+    tasks_before = asyncio.all_tasks()
+
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(
+            service.get_news_by_period(NewsRequest(start_date=date(2000, 1, 1), end_date=NEWEST_DATE)), timeout=.1
+        )
+
+    pipeline_tasks = asyncio.all_tasks() - tasks_before
+    await asyncio.wait(pipeline_tasks, timeout=5)
+    assert all(task.done() for task in pipeline_tasks)
+
+
+class HangingPagesProvider(FakeProvider):
+    """only the first page is served, `pending` fetches of the other pages hang"""
+    def __init__(self):
+        super().__init__()
+        self.pending = 0
+
+    async def get_page_by_number(self, page_number: int) -> str:
+        if page_number == 1:
+            return await super().get_page_by_number(page_number)
+        self.pending += 1
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self.pending -= 1
+
+
+async def test_page_fetches_are_cancelled_with_the_headlines_stream(service):
+    service.page_provider = HangingPagesProvider()
+    first_headline = asyncio.Event()
+
+    async def consume():
+        request = NewsRequest(start_date=date(2000, 1, 1), end_date=NEWEST_DATE)
+        async for _ in service._iter_headlines_by_period(request):
+            first_headline.set()
+
+    consumer = asyncio.create_task(consume())
+    await asyncio.wait_for(first_headline.wait(), timeout=5)
+    assert service.page_provider.pending == PAGES_QTY - 1
+
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+
+    assert service.page_provider.pending == 0
+
+
+def fake_pages(request: NewsRequest) -> tuple[int, int]:
+    """boundary pages of the fake site: the i-th headline is published i // 3 days before NEWEST_DATE"""
+    newest = 3 * (NEWEST_DATE - request.end_date).days
+    oldest = 3 * (NEWEST_DATE - request.start_date).days + 2
+    return newest // PAGE_SIZE + 1, oldest // PAGE_SIZE + 1
+
+
+async def test_batch_of_periods_loads_shared_pages_once(monkeypatch):
+    provider = FakeProvider()
+    service = OKXScrapingService(page_provider=provider, parser=ParsingBackend(FakeParser()))
+    monkeypatch.setattr(service, 'locate_pages', AsyncMock(side_effect=fake_pages))
+    periods = [
+        NewsRequest(start_date=NEWEST_DATE - timedelta(days=3), end_date=NEWEST_DATE - timedelta(days=1)),
+        NewsRequest(start_date=NEWEST_DATE - timedelta(days=2), end_date=NEWEST_DATE),
+        NewsRequest(start_date=NEWEST_DATE - timedelta(days=30), end_date=NEWEST_DATE - timedelta(days=28)),
+    ]
+
+    records = [record async for record in service.iter_news_by_periods(periods)]
+
+    expected_dates = {NEWEST_DATE - timedelta(days=d) for d in [*range(0, 4), *range(28, 31)]}
+    assert {r.date for r in records} == expected_dates
+    assert len(records) == len({(r.date, r.title) for r in records}) == 3 * len(expected_dates)
+    # the first two periods are merged, pages 1 and 6-7 are loaded once each
+    assert sorted(r for r in provider.requested if r.startswith('page')) == ['page 1', 'page 6', 'page 7']
+    assert len(provider.requested) == 3 + len(records)
+
+
+async def test_cached_pages_are_dropped_when_news_are_published():
+    parser = PublishingParser()
+    service = OKXScrapingService(page_provider=FakeProvider(), parser=ParsingBackend(parser))
+    request = NewsRequest(start_date=NEWEST_DATE - timedelta(days=50), end_date=NEWEST_DATE - timedelta(days=40))
+    assert len(await service.get_news_by_period(request)) == 3 * 11
+
+    # cached pages of the first scrape are shifted by more than a page, the next period needs them and new ones
+    parser.published = 20
+    request = NewsRequest(start_date=NEWEST_DATE - timedelta(days=45), end_date=NEWEST_DATE - timedelta(days=20))
+    records = await service.get_news_by_period(request)
+
+    assert len(records) == len({(r.date, r.title) for r in records}) == 3 * 26
+
+
+async def test_dropped_pages_of_a_service_stay_cached_by_the_others():
+    request = NewsRequest(start_date=NEWEST_DATE - timedelta(days=50), end_date=NEWEST_DATE - timedelta(days=40))
+    parser = PublishingParser()
+    publishing = OKXScrapingService(page_provider=FakeProvider(), parser=ParsingBackend(parser))
+    provider = FakeProvider()
+    service = OKXScrapingService(page_provider=provider, parser=ParsingBackend(FakeParser()))
+    await service.get_news_by_period(request)
+    await publishing.get_news_by_period(request)
+    requested_pages = [r for r in provider.requested if r.startswith('page')]
+
+    parser.published = 20
+    await publishing.get_news_by_period(request)
+    await service.get_news_by_period(request)
+
+    # only the main page is loaded again to validate the cached pages
+    assert [r for r in provider.requested if r.startswith('page')] == requested_pages + ['page 1']
+
+
+class EditedParser(FakeParser):
+    """news 4 got a new title, news 7 a new date and news 10 is republished with a new article"""
+    def extract_headlines_from_page(self, page_content: str) -> list[NewsHeadline]:
+        edits = {
+            'news 4': lambda h: NewsHeadline(title='news 4 (edited)', date=h.date, body_url=h.body_url),
+            'news 7': lambda h: NewsHeadline(title=h.title, date=h.date - timedelta(days=1), body_url=h.body_url),
+            'news 10': lambda h: NewsHeadline(title=h.title, date=h.date, body_url='/help/10-republished'),
+        }
+        return [edits.get(h.title, lambda h: h)(h) for h in super().extract_headlines_from_page(page_content)]
+
+
+async def test_refresh_loads_and_yields_changed_records_only(monkeypatch):
+    request = NewsRequest(start_date=NEWEST_DATE - timedelta(days=14), end_date=NEWEST_DATE)
+    monkeypatch.setattr(OKXScrapingService, '_search_pages', AsyncMock(return_value=(1, 3)))
+    storage = SQLiteNewsStorage(':memory:')
+    service = OKXScrapingService(storage=storage, page_provider=FakeProvider(), parser=ParsingBackend(FakeParser()))
+    assert len([record async for record in service.refresh_storage(request)]) == 3 * PAGE_SIZE
+
+    provider = FakeProvider()
+    service = OKXScrapingService(storage=storage, page_provider=provider, parser=ParsingBackend(EditedParser()))
+    changed = [record async for record in service.refresh_storage(request)]
+
+    assert sorted(r for r in provider.requested if not r.startswith('page')) == [
+        '/help/10-republished', '/help/4', '/help/7'
+    ]
+    assert sorted(r.title for r in changed) == ['news 10', 'news 4 (edited)', 'news 7']
+    stored = storage.get_records_by_period(request.start_date, request.end_date)
+    # the old headlines of the edited articles are replaced
+    assert len(stored) == 3 * PAGE_SIZE
+    assert 'news 4' not in {r.title for r in stored}
+    assert [r.date for r in stored if r.title == 'news 7'] == [NEWEST_DATE - timedelta(days=3)]
+    storage.close()
+
+
+class TodayParser(FakeParser):
+    """the newest news are published today"""
+    def extract_headlines_from_page(self, page_content: str) -> list[NewsHeadline]:
+        shift = datetime.now().date() - NEWEST_DATE
+        return [
+            NewsHeadline(title=h.title, date=h.date + shift, body_url=h.body_url)
+            for h in super().extract_headlines_from_page(page_content)
+        ]
+
+
+async def test_today_is_served_from_synced_storage(monkeypatch):
+    today = datetime.now().date()
+    storage = SQLiteNewsStorage(':memory:')
+    storage.save_record(NewsRecord(title='news 5', date=today - timedelta(days=1), body='body'))
+    service = OKXScrapingService(storage=storage, page_provider=FakeProvider(), parser=ParsingBackend(TodayParser()))
+    monkeypatch.setattr(service, 'locate_pages', AsyncMock())
+
+    records = [record async for record in service.iter_news_by_period(NewsRequest(today, today))]
+
+    # the sync stores the news newer than the known one, the current day is not scraped again
+    assert sorted(r.title for r in records) == ['news 0', 'news 1', 'news 2']
+    service.locate_pages.assert_not_called()
+    storage.close()
+
+
+@pytest.mark.parametrize('known_day_covered', [False, True])
+async def test_sync_covers_the_day_of_the_known_news_only_if_it_was_covered(known_day_covered):
+    today = datetime.now().date()
+    storage = SQLiteNewsStorage(':memory:')
+    # the older news of its day were not stored with it
+    storage.save_record(NewsRecord(title='news 6', date=today - timedelta(days=2), body='body'))
+    if known_day_covered:
+        storage.mark_covered(today - timedelta(days=3), today - timedelta(days=2))
+    service = OKXScrapingService(storage=storage, page_provider=FakeProvider(), parser=ParsingBackend(TodayParser()))
+
+    assert await service.sync_storage()
+
+    first_covered = today - timedelta(days=3 if known_day_covered else 1)
+    assert storage.get_covered_periods() == [(first_covered, today - timedelta(days=1))]
+    storage.close()
+
+
+def test_merge_periods():
+    day = NEWEST_DATE
+
+    assert _merge_periods([
+        NewsRequest(start_date=day + timedelta(days=10), end_date=day + timedelta(days=12)),
+        NewsRequest(start_date=day, end_date=day + timedelta(days=3)),
+        NewsRequest(start_date=day + timedelta(days=4), end_date=day + timedelta(days=5)),
+        NewsRequest(start_date=day + timedelta(days=1), end_date=day + timedelta(days=2)),
+    ]) == [
+        NewsRequest(start_date=day, end_date=day + timedelta(days=5)),
+        NewsRequest(start_date=day + timedelta(days=10), end_date=day + timedelta(days=12)),
+    ]
+
+
+def test_merge_page_ranges():
+    assert _merge_page_ranges([(7, 9), (1, 3), (2, 4), (5, 5), (12, 12)]) == [(1, 5), (7, 9), (12, 12)]
+
+
+class SyntheticParser(FakeParser):
+    """pages of PAGE_SIZE headlines with the given dates, newest first"""
+    def __init__(self, dates: list[date]):
+        self.dates = sorted(dates, reverse=True)
+
+    def get_pages_qty(self, page_content: str) -> int:
+        return max(math.ceil(len(self.dates) / PAGE_SIZE), 1)
+
+    def extract_headlines_from_page(self, page_content: str) -> list[NewsHeadline]:
+        page_num = int(page_content.split()[-1])
+        return [
+            NewsHeadline(title=f'news {i}', date=self.dates[i], body_url=f'/help/{i}')
+            for i in range((page_num - 1) * PAGE_SIZE, min(page_num * PAGE_SIZE, len(self.dates)))
+        ]
+
+
+def _daily(counts: Iterable[int]) -> list[date]:
+    """counts of news per day, the first one is published on NEWEST_DATE"""
+    return [NEWEST_DATE - timedelta(days=day) for day, count in enumerate(counts) for _ in range(count)]
+
+
+_random = random.Random(25)
+DISTRIBUTIONS = {
+    'uniform': _daily([3] * 500),
+    'bursty': _daily(_random.choice([0, 0, 0, 1, 2, 40]) for _ in range(600)),
+    'heavy tailed': _daily(min(int(_random.paretovariate(0.8)), 400) for _ in range(500)),
+    # publications grow over the years, so old pages span much more days than the first ones
+    'growing': _daily(max(1, 30 - day // 10) if day % (1 + day // 50) == 0 else 0 for day in range(1000)),
+    'long gaps': _daily(([5] * 20 + [0] * 200) * 4),
+    'one busy day': _daily([2] * 50 + [1500] + [2] * 50),
+    'same day': _daily([300]),
+    'one page': _daily([4, 0, 3]),
+}
+
+
+def _expected_pages(dates: list[date], request: NewsRequest) -> tuple[int, int]:
+    """first page with any news not newer than end_date and the page before the first one older than start_date"""
+    pages = [dates[start:start + PAGE_SIZE] for start in range(0, len(dates), PAGE_SIZE)] or [[]]
+    newest = next((i for i, page in enumerate(pages, 1) if not page or page[-1] <= request.end_date), len(pages) + 1)
+    older = next((i for i, page in enumerate(pages, 1) if not page or page[0] < request.start_date), len(pages) + 1)
+    return newest, older - 1
+
+
+def _requests(dates: list[date]) -> list[NewsRequest]:
+    oldest, newest = min(dates), max(dates)
+    span = (newest - oldest).days
+    days = [oldest + timedelta(days=_random.randint(0, span)) for _ in range(30)]
+    requests = [NewsRequest(*sorted(_random.sample(days, 2))) for _ in range(20)]
+    requests += [NewsRequest(day, day) for day in days[:10]]
+    return requests + [
+        NewsRequest(oldest, newest),
+        NewsRequest(oldest - timedelta(days=30), oldest - timedelta(days=1)),
+        NewsRequest(newest + timedelta(days=1), newest + timedelta(days=30)),
+        NewsRequest(newest - timedelta(days=7), datetime.now().date()),
+    ]
+
+
+@pytest.mark.parametrize('distribution', DISTRIBUTIONS)
+async def test_search_pages_is_exact_within_fetch_budget(distribution):
+    parser = SyntheticParser(DISTRIBUTIONS[distribution])
+    qty = parser.get_pages_qty('page 1')
+    for request in _requests(parser.dates):
+        provider = FakeProvider()
+        service = OKXScrapingService(page_provider=provider, parser=ParsingBackend(parser))
+
+        pages = await service.locate_pages(request)
+
+        newest, oldest = _expected_pages(parser.dates, request)
+        assert pages == (newest, oldest), request
+        fetched = provider.requested[1:]
+        assert len(fetched) == len(set(fetched))
+        searched_boundaries = 1 if request.end_date >= datetime.now().date() else 2
+        assert len(fetched) <= searched_boundaries * max_boundary_fetches(qty), request
+
+
+async def test_search_pages_interpolates_uniform_dates():
+    parser = SyntheticParser(DISTRIBUTIONS['uniform'])
+    provider = FakeProvider()
+    service = OKXScrapingService(page_provider=provider, parser=ParsingBackend(parser))
+
+    pages = await service.locate_pages(
+        NewsRequest(NEWEST_DATE - timedelta(days=300), NEWEST_DATE - timedelta(days=200))
+    )
+
+    assert pages == (41, 61)
+    # a bisection would fetch about 2 * log2(100) = 14 pages
+    assert len(provider.requested[1:]) <= 6
+
+
+@pytest.mark.parametrize('qty, expected', [(1, 0), (2, 2), (3, 4), (20, 10), (100, 14), (1000, 20)])
+def test_max_boundary_fetches(qty, expected):
+    assert max_boundary_fetches(qty) == expected
+
+
+GAPS = ([5] * 20 + [0] * 200) * 2
+BUSY_DAY = [2] * 20 + [300] + [2] * 20
+
+
+@pytest.mark.parametrize('counts, days_back, expected_page, expected_fetches', [
+    # the boundary is on the first page
+    ([3] * 100, 3, 1, []),
+    # exact interpolation costs the page and the one before it
+    ([3] * 100, 50, 11, ['page 11', 'page 10']),
+    ([3] * 100, 99, 20, ['page 20', 'page 10', 'page 19']),
+    ([3] * 10, 50, 3, ['page 2']),
+    # the gaps mislead the interpolation, the bisections keep it within the budget
+    (GAPS, 50, 7, ['page 14', 'page 7', 'page 3', 'page 5', 'page 6']),
+    (BUSY_DAY, 50, 27, ['page 7', 'page 17', 'page 26']),
+])
+async def test_interpolate_first_page_fetches(counts, days_back, expected_page, expected_fetches):
+    parser = SyntheticParser(_daily(counts))
+    provider = FakeProvider()
+    service = OKXScrapingService(page_provider=provider, parser=ParsingBackend(parser))
+    qty = parser.get_pages_qty('page 1')
+    first_page = PageHeadlines(1, parser.extract_headlines_from_page('page 1'))
+
+    page = await service._interpolate_first_page(
+        qty, first_page, NEWEST_DATE - timedelta(days=days_back), _oldest_date
+    )
+
+    assert page == expected_page
+    assert provider.requested == expected_fetches
+    assert len(provider.requested) <= max_boundary_fetches(qty)
+
+
+@pytest.mark.parametrize('counts, start_back, end_back, expected_pages, expected_fetches', [
+    ([3] * 100, 50, 10, (3, 11), {'page 2', 'page 3', 'page 6', 'page 11', 'page 12'}),
+    ([3] * 10, 7, 1, (1, 2), {'page 2'}),
+    (GAPS, 230, 3, (2, 11), {'page 2', 'page 7', 'page 10', 'page 11', 'page 12', 'page 13', 'page 14'}),
+])
+async def test_search_pages_fetches(counts, start_back, end_back, expected_pages, expected_fetches):
+    parser = SyntheticParser(_daily(counts))
+    provider = FakeProvider()
+    service = OKXScrapingService(page_provider=provider, parser=ParsingBackend(parser))
+    request = NewsRequest(NEWEST_DATE - timedelta(days=start_back), NEWEST_DATE - timedelta(days=end_back))
+
+    pages = await service.locate_pages(request)
+
+    fetched = provider.requested[1:]
+    assert pages == expected_pages
+    assert len(fetched) == len(expected_fetches)
+    assert set(fetched) == expected_fetches
+
+
+class ShiftingParser(SyntheticParser):
+    """SyntheticParser whose headlines keep their titles when new news are published above them"""
+    def __init__(self, dates: list[date]):
+        super().__init__(dates)
+        self.headlines = [
+            NewsHeadline(title=f'news {i}', date=day, body_url=f'/help/{i}') for i, day in enumerate(self.dates)
+        ]
+
+    def publish(self, qty: int) -> None:
+        new = [
+            NewsHeadline(title=f'new {len(self.headlines) + i}', date=self.dates[0], body_url=f'/help/new-{i}')
+            for i in range(qty)
+        ]
+        self.headlines = new + self.headlines
+        self.dates = [h.date for h in self.headlines]
+
+    def extract_headlines_from_page(self, page_content: str) -> list[NewsHeadline]:
+        page_num = int(page_content.split()[-1])
+        return self.headlines[(page_num - 1) * PAGE_SIZE:page_num * PAGE_SIZE]
+
+
+def _index_service(parser: FakeParser, index: PageDateIndex) -> OKXScrapingService:
+    service = OKXScrapingService(page_provider=FakeProvider(), parser=ParsingBackend(parser), page_index=index)
+    service._search_pages = AsyncMock(side_effect=AssertionError('the index is not used'))
+    return service
+
+
+async def _build_index(parser: FakeParser) -> PageDateIndex:
+    """index of every headline page"""
+    index = PageDateIndex()
+    service = OKXScrapingService(page_provider=FakeProvider(), parser=ParsingBackend(parser), page_index=index)
+    await service.locate_pages(NewsRequest(NEWEST_DATE, NEWEST_DATE))
+    for page_num in range(1, parser.get_pages_qty('page 1') + 1):
+        await service.get_headline_page(page_num)
+    return index
+
+
+# news published since the index was built: none, less than a page (the old newest headline is on the first page)
+# and several pages
+@pytest.mark.parametrize('published', [0, 7, 4 * PAGE_SIZE + 2])
+async def test_locate_pages_by_stale_index(published):
+    parser = ShiftingParser(DISTRIBUTIONS['uniform'])
+    index = await _build_index(parser)
+    parser.publish(published)
+    qty = parser.get_pages_qty('page 1')
+
+    for request in _requests(parser.dates):
+        service = _index_service(parser, index)
+
+        pages = await service.locate_pages(request)
+
+        assert pages == _expected_pages(parser.dates, request), request
+        assert len(service.page_provider.requested[1:]) <= 2 * max_boundary_fetches(qty) + 2, request
+
+
+async def test_locate_pages_by_index_boundaries_on_first_and_last_pages():
+    parser = ShiftingParser(DISTRIBUTIONS['uniform'])
+    index = await _build_index(parser)
+    qty = parser.get_pages_qty('page 1')
+    oldest, newest = min(parser.dates), max(parser.dates)
+
+    for request, expected in [
+        (NewsRequest(newest, newest), (1, 1)),
+        (NewsRequest(oldest, oldest), (qty, qty)),
+        (NewsRequest(oldest, newest), (1, qty)),
+        (NewsRequest(oldest - timedelta(days=30), oldest - timedelta(days=1)), (qty + 1, qty)),
+        (NewsRequest(newest + timedelta(days=1), newest + timedelta(days=30)), (1, 0)),
+    ]:
+        assert await _index_service(parser, index).locate_pages(request) == expected, request
+
+
+@pytest.mark.parametrize('answer', [1, 2, 37, 99, 100, 101])
+@pytest.mark.parametrize('estimate', [1, 5, 36, 37, 38, 70, 100])
+async def test_gallop_first_page(answer, estimate):
+    parser = SyntheticParser(DISTRIBUTIONS['uniform'])
+    qty = parser.get_pages_qty('page 1')
+    provider = FakeProvider()
+    service = OKXScrapingService(page_provider=provider, parser=ParsingBackend(parser))
+
+    page = await service._gallop_first_page(estimate, qty, lambda page: page.page_num >= answer)
+
+    assert page == answer
+    distance = abs(min(max(estimate, 1), qty) - answer) + 1
+    assert len(provider.requested) <= 2 * math.ceil(math.log2(distance)) + 2
+    if estimate == answer and 1 < answer <= qty:
+        # an exact estimate is verified by the page and the one before it
+        assert set(provider.requested) == {f'page {answer - 1}', f'page {answer}'}
@@ -0,0 +1,127 @@
+import json
+from datetime import date
+
+import pytest
+
+from src.domain.parsing_backend import ParsingBackend
+from src.dto import NewsHeadline
+from src.watcher import NewsWatcher
+
+PAGE_SIZE = 15
+NEWEST_DATE = date(2025, 4, 17)
+
+
+class WatchedSite:
+    """announcements list whose pages are JSON, so tests publish news without HTML"""
+
+    def __init__(self, qty: int):
+        self.published = 0
+        self.headlines: list[NewsHeadline] = []
+        self.failing_urls: set[str] = set()
+        self.requested: list[str] = []
+        self.publish(qty)
+
+    def publish(self, qty: int) -> None:
+        self.headlines[:0] = [
+            NewsHeadline(title=f'news {i}', date=NEWEST_DATE, body_url=f'/help/{i}')
+            for i in reversed(range(self.published, self.published + qty))
+        ]
+        self.published += qty
+
+    async def get_page_by_number(self, page_number: int) -> str:
+        self.requested.append(f'page {page_number}')
+        page = self.headlines[(page_number - 1) * PAGE_SIZE:page_number * PAGE_SIZE]
+        return json.dumps([[h.title, h.body_url] for h in page])
+
+    async def get_news_page_by_url(self, url: str) -> str:
+        self.requested.append(url)
+        if url in self.failing_urls:
+            raise TimeoutError(url)
+        return url
+
+
+class WatchedSiteParser:
+    def __init__(self):
+        self.parsed = 0
+
+    def extract_headlines_from_page(self, page_content: str) -> list[NewsHeadline]:
+        self.parsed += 1
+        return [NewsHeadline(title=title, date=NEWEST_DATE, body_url=url) for title, url in json.loads(page_content)]
+
+    def extract_news_body_from_page(self, page_content: str) -> str:
+        return f'body of {page_content}'
+
+
+@pytest.fixture
+def site() -> WatchedSite:
+    return WatchedSite(30)
+
+
+@pytest.fixture
+def parser() -> WatchedSiteParser:
+    return WatchedSiteParser()
+
+
+@pytest.fixture
+async def watcher(site, parser) -> NewsWatcher:
+    watcher = NewsWatcher(site, ParsingBackend(parser), min_interval=1, max_interval=10)
+    assert await watcher.poll() == []
+    site.requested.clear()
+    return watcher
+
+
+async def test_unchanged_page_is_not_parsed(watcher, site, parser):
+    parsed = parser.parsed
+
+    assert await watcher.poll() == []
+    assert parser.parsed == parsed
+    assert site.requested == ['page 1']
+
+
+async def test_only_new_bodies_are_loaded(watcher, site):
+    site.publish(2)
+
+    records = await watcher.poll()
+
+    assert [r.title for r in records] == ['news 30', 'news 31']
+    assert site.requested == ['page 1', '/help/30', '/help/31']
+    assert await watcher.poll() == []
+
+
+async def test_next_pages_are_read_after_many_news(watcher, site):
+    site.publish(20)
+
+    records = await watcher.poll()
+
+    assert [r.title for r in records] == [f'news {i}' for i in range(30, 50)]
+    assert [r for r in site.requested if r.startswith('page')] == ['page 1', 'page 2']
+
+
+async def test_failed_body_is_retried(watcher, site):
+    site.publish(2)
+    site.failing_urls.add('/help/31')
+
+    assert [r.title for r in await watcher.poll()] == ['news 30']
+    site.failing_urls.clear()
+    assert [r.title for r in await watcher.poll()] == ['news 31']
+
+
+async def test_seen_set_is_bounded(site, parser):
+    watcher = NewsWatcher(site, ParsingBackend(parser), seen_size=20)
+    await watcher.poll()
+    for _ in range(5):
+        site.publish(3)
+        assert len(await watcher.poll()) == 3
+
+    assert len(watcher._seen) == 20
+
+
+def test_interval_grows_while_idle(site, parser):
+    watcher = NewsWatcher(site, ParsingBackend(parser), min_interval=1, max_interval=3)
+
+    intervals = []
+    for published in (False, False, False, False, True):
+        watcher._adapt_interval(published)
+        intervals.append(watcher.interval)
+
+    assert intervals == [1.5, 2.25, 3, 3, 1]